@@ -0,0 +1,59 @@
+import asyncio
+from typing import Any
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from database import Database
+
+
+class AsyncDatabase:
+    """Runs a Database on dedicated worker threads.
+
+    Writes are serialized on a single writer thread, reads are spread over
+    one thread per pooled reader connection so they can overlap with an
+    ongoing write. The wrapped Database must only be touched through
+    ``run``/``run_read`` (or ``run_sync`` outside of an event loop).
+    """
+    def __init__(self, db_name: str, reader_count: int = Database.READER_COUNT):
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="sqlite-writer"
+        )
+        self._read_executor = ThreadPoolExecutor(
+            max_workers=reader_count, thread_name_prefix="sqlite-reader"
+        )
+        self._database: Database = self.run_sync(
+            Database, db_name, reader_count
+        )
+
+    @property
+    def database(self) -> Database:
+        return self._database
+
+    async def run(self, func: Callable, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args))
+
+    async def run_read(self, func: Callable, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._read_executor, partial(func, *args)
+        )
+
+    def run_sync(self, func: Callable, *args) -> Any:
+        return self._executor.submit(func, *args).result()
+
+    async def execute_query(self, sql: str, params: tuple = ()):
+        return await self.run_read(self._database.execute_query, sql, params)
+
+    async def execute_single_query(self, sql: str, params: tuple = ()) -> Any:
+        return await self.run_read(
+            self._database.execute_single_query, sql, params
+        )
+
+    async def execute_command(self, sql: str, params: tuple = ()) -> int:
+        return await self.run(self._database.execute_command, sql, params)
+
+    def close(self) -> None:
+        self._read_executor.shutdown()
+        self.run_sync(self._database.close)
+        self._executor.shutdown()
@@ -0,0 +1,178 @@
+import argparse
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from database import Database
+
+
+@dataclass
+class BackupResult:
+    path: str
+    pages: int
+    duration_ms: float
+    check: str
+
+    @property
+    def ok(self) -> bool:
+        return self.check == "ok"
+
+
+class BackupService:
+    """Rotating online backups of a Database, taken on a background thread.
+
+    ``request`` only flags that a backup is due and returns at once;
+    requests arriving while a backup runs are coalesced into one more
+    backup afterwards. Every backup is written next to its final name,
+    verified with ``PRAGMA quick_check`` and only then renamed, so the
+    directory only ever holds complete, checked copies. The newest
+    ``keep`` of them are kept.
+    """
+    KEEP = 10
+    TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S-%f"
+
+    def __init__(
+        self,
+        database: Database,
+        directory: str,
+        prefix: str = "Kegelkasse",
+        keep: int = KEEP,
+        on_finished: Callable[[BackupResult], None] = None
+    ):
+        self._database = database
+        self._directory = Path(directory)
+        self._prefix = prefix
+        self._keep = keep
+        self._on_finished = on_finished
+        self._condition = threading.Condition()
+        self._due = False
+        self._running = False
+        self._closed = False
+        self._thread: threading.Thread | None = None
+        self._last_result: BackupResult | None = None
+
+    @property
+    def last_result(self) -> BackupResult | None:
+        return self._last_result
+
+    def request(self) -> None:
+        with self._condition:
+            if self._closed:
+                return
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="backup", daemon=True
+                )
+                self._thread.start()
+
+            self._due = True
+            self._condition.notify_all()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Blocks until no backup is running or due."""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._due and not self._running, timeout
+            )
+
+    def backup_now(self) -> BackupResult:
+        timestamp = datetime.now().strftime(self.TIMESTAMP_FORMAT)
+        path = self._directory / f"{self._prefix}-{timestamp}.db"
+        temporary_path = path.with_name(path.name + ".part")
+
+        start = time.perf_counter()
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            pages = self._database.backup(str(temporary_path))
+            check = self._quick_check(temporary_path)
+        except (sqlite3.Error, OSError) as error:
+            pages, check = 0, f"backup failed: {error}"
+
+        if check == "ok":
+            temporary_path.replace(path)
+            self._rotate()
+        else:
+            # Never let a broken copy push a good one out of the rotation
+            try:
+                temporary_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+        duration_ms = (time.perf_counter() - start) * 1000
+        return BackupResult(str(path), pages, duration_ms, check)
+
+    def backups(self) -> list[Path]:
+        """Completed backups, oldest first."""
+        return sorted(self._directory.glob(f"{self._prefix}-*.db"))
+
+    def close(self, wait: bool = True) -> None:
+        """Stops the worker; a backup that is due still runs if ``wait``."""
+        with self._condition:
+            self._closed = True
+            if not wait:
+                self._due = False
+            self._condition.notify_all()
+
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._due or self._closed)
+                if not self._due:
+                    return
+                self._due = False
+                self._running = True
+
+            try:
+                result = self.backup_now()
+            finally:
+                with self._condition:
+                    self._running = False
+                    self._condition.notify_all()
+
+            self._last_result = result
+            if self._on_finished is not None:
+                self._on_finished(result)
+
+    def _rotate(self) -> None:
+        backups = self.backups()
+        for path in backups[:max(len(backups) - self._keep, 0)]:
+            path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _quick_check(path: Path) -> str:
+        connection = sqlite3.connect(path)
+        try:
+            rows = connection.execute("PRAGMA quick_check").fetchall()
+        finally:
+            connection.close()
+
+        return "; ".join(row[0] for row in rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Takes a verified online backup of a Kegelkasse database."
+    )
+    parser.add_argument("database")
+    parser.add_argument("directory")
+    parser.add_argument("--keep", type=int, default=BackupService.KEEP)
+    arguments = parser.parse_args()
+
+    database = Database(arguments.database, reader_count=0)
+    try:
+        result = BackupService(
+            database, arguments.directory, keep=arguments.keep
+        ).backup_now()
+    finally:
+        database.close()
+
+    print(f"{result.path}: {result.pages} pages, {result.duration_ms:.0f} ms, "
+          f"quick_check {result.check}")
+    raise SystemExit(0 if result.ok else 1)
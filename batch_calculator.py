@@ -0,0 +1,135 @@
+from dataclasses import dataclass
+import numpy as np
+from database import Database
+from database_access import (
+    PenaltyKindTable,
+    PenaltyTable,
+    PlayerPenaltiesTable
+)
+from calculators import RangeCalculator
+from entities import Penalty
+
+
+@dataclass
+class PenaltyColumns:
+    season: np.ndarray
+    game: np.ndarray
+    player: np.ndarray
+    game_player: np.ndarray
+    penalty: np.ndarray
+    value: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: list[tuple]) -> "PenaltyColumns":
+        if not rows:
+            empty = np.empty(0, dtype=np.int64)
+            return cls(*(empty for _ in range(6)))
+
+        matrix = np.array(rows, dtype=np.int64)
+        return cls(*(matrix[:, i] for i in range(6)))
+
+
+@dataclass
+class GroupTotals:
+    ids: np.ndarray
+    totals: np.ndarray
+
+    def as_dict(self) -> dict[int, float]:
+        return dict(zip(self.ids.tolist(), self.totals.tolist()))
+
+
+@dataclass
+class PenaltyTotals:
+    per_game_player: GroupTotals
+    per_player: GroupTotals
+    per_game: GroupTotals
+    per_season: GroupTotals
+
+    def differences(
+        self,
+        stored_game_totals: dict[int, float],
+        tolerance: float = 0.005
+    ) -> dict[int, tuple[float, float]]:
+        """Compares the recomputed game totals with stored ones and returns
+        {game_id: (stored, recomputed)} for every game that does not match.
+        """
+        recomputed = self.per_game.as_dict()
+        result = {}
+
+        for game_id in recomputed.keys() | stored_game_totals.keys():
+            expected = recomputed.get(game_id, 0.0)
+            actual = stored_game_totals.get(game_id, 0.0)
+            if abs(expected - actual) > tolerance:
+                result[game_id] = (actual, expected)
+
+        return result
+
+
+class BatchPenaltyCalculator:
+    """Computes fines for many PlayerPenalties rows in one vectorized pass.
+
+    Penalty ids index directly into the rate table, so looking up the rule
+    of every row is a single gather. Range penalties reuse the segments of
+    calculators.RangeCalculator: a row is charged only if its penalty is
+    the tier charged in the segment of its value.
+    """
+    def __init__(self, penalties: list[Penalty]):
+        size = max((p.id for p in penalties), default=0) + 1
+        self._rates = np.zeros(size, dtype=np.float64)
+        self._is_range = np.zeros(size, dtype=bool)
+
+        for penalty in penalties:
+            self._rates[penalty.id] = penalty.penalty
+            if penalty.type_navigation and penalty.type_navigation.is_range:
+                self._is_range[penalty.id] = True
+
+        ranges = RangeCalculator(
+            [p for p in penalties if p.type_navigation]
+        )
+        self._boundaries = np.array(ranges.boundaries, dtype=np.int64)
+        self._segment_penalty_ids = np.array(
+            [-1 if i is None else i for i in ranges.segment_penalty_ids],
+            dtype=np.int64
+        )
+
+    def amounts(self, penalty_ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+        rates = self._rates[penalty_ids]
+        segments = np.searchsorted(self._boundaries, values, side="right")
+        charged = (
+            (values > 0)
+            & (self._segment_penalty_ids[segments] == penalty_ids)
+        )
+        return np.where(
+            self._is_range[penalty_ids],
+            np.where(charged, rates, 0.0),
+            values * rates
+        )
+
+    def calculate(self, columns: PenaltyColumns) -> PenaltyTotals:
+        amounts = self.amounts(columns.penalty, columns.value)
+
+        return PenaltyTotals(
+            self._group(columns.game_player, amounts),
+            self._group(columns.player, amounts),
+            self._group(columns.game, amounts),
+            self._group(columns.season, amounts)
+        )
+
+    @staticmethod
+    def _group(keys: np.ndarray, amounts: np.ndarray) -> GroupTotals:
+        ids, inverse = np.unique(keys, return_inverse=True)
+        totals = np.bincount(inverse, weights=amounts, minlength=len(ids))
+        return GroupTotals(ids, np.round(totals, 2))
+
+
+def recompute_penalty_totals(
+    database: Database, season_id: int = None
+) -> PenaltyTotals:
+    kinds = {k.id: k for k in PenaltyKindTable(database).get_all()}
+    penalties = PenaltyTable(database).get_all()
+    for penalty in penalties:
+        penalty.type_navigation = kinds.get(penalty.type)
+
+    calculator = BatchPenaltyCalculator(penalties)
+    rows = PlayerPenaltiesTable(database).get_penalty_columns(season_id)
+    return calculator.calculate(PenaltyColumns.from_rows(rows))
@@ -0,0 +1,296 @@
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from database import Database
+from database_access import (
+    GameTable,
+    GamePlayerTable,
+    PenaltyTable,
+    PlayerPenaltiesTable,
+    PlayerTable,
+    SumPerPlayerView,
+    ResultOfGameView,
+    SumPerGameView
+)
+from synthetic_data import SyntheticDataConfig, create_database
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    runs: int
+    min_ms: float
+    median_ms: float
+    mean_ms: float
+    max_ms: float
+
+
+@dataclass
+class MemoryResult:
+    name: str
+    items: int
+    peak_bytes: int
+    retained_bytes: int
+
+
+def measure_memory(name: str, func: Callable) -> MemoryResult:
+    """Runs ``func`` once under tracemalloc; ``retained_bytes`` is what its
+    result still holds, ``peak_bytes`` includes temporary allocations."""
+    tracemalloc.start()
+    try:
+        result = func()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return MemoryResult(name, len(result), peak, retained)
+
+
+def measure(name: str, func: Callable, repeat: int) -> BenchmarkResult:
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        func()
+        timings.append((time.perf_counter_ns() - start) / 1_000_000)
+
+    return BenchmarkResult(
+        name,
+        repeat,
+        min(timings),
+        statistics.median(timings),
+        statistics.fmean(timings),
+        max(timings)
+    )
+
+
+class BenchmarkSuite:
+    """Times the data layer and the Qt models against one database.
+
+    Every benchmark picks its games from a seeded random generator, so two
+    runs against databases built from the same config do the same work.
+    """
+    def __init__(self, path: str, repeat: int, seed: int = 1):
+        # Imported here so the data-layer benchmarks do not pay for Qt
+        from PySide6.QtCore import QCoreApplication
+        self._application = (
+            QCoreApplication.instance() or QCoreApplication([])
+        )
+
+        self._database = Database(path)
+        self._repeat = repeat
+        self._random = random.Random(seed)
+        self._game_ids = [
+            game.id for game in GameTable(self._database).project(("ID",))
+        ]
+
+    def close(self) -> None:
+        self._database.close()
+
+    def run(self) -> list[BenchmarkResult]:
+        benchmarks = [
+            *self._get_all_benchmarks(),
+            ("PlayerPenaltiesTable.project",
+             lambda: PlayerPenaltiesTable(self._database).project(
+                 ("GamePlayer", "Penalty", "Value")
+             )),
+            ("SumPerPlayerView.get_by_game_id",
+             self._per_game(SumPerPlayerView(self._database).get_by_game_id)),
+            ("ResultOfGameView.get_by_game_id",
+             self._per_game(ResultOfGameView(self._database).get_by_game_id)),
+            ("SumPerGameView.get_by_game_id",
+             self._per_game(SumPerGameView(self._database).get_by_game_id)),
+            ("MainWindowModel.get_game_snapshot", self._game_snapshot()),
+            ("AddGameDialogModel.save_game", self._save_game()),
+            ("MainWindowModel.update_game_player_with_penalties",
+             self._update_game_player()),
+            ("SumPerPlayerTablemodel.merge_rows", self._populate_table_model()),
+        ]
+
+        return [measure(name, func, self._repeat) for name, func in benchmarks]
+
+    def run_memory(self) -> list[MemoryResult]:
+        columns = ("ID", "GamePlayer", "Penalty", "Value")
+        player_penalties = PlayerPenaltiesTable(self._database)
+        game_players = GamePlayerTable(self._database)
+        benchmarks = [
+            ("PlayerPenaltiesTable.get_all", player_penalties.get_all),
+            ("PlayerPenaltiesTable.project",
+             lambda: player_penalties.project(columns)),
+            ("PlayerPenaltiesTable.project_batch",
+             lambda: player_penalties.project_batch(columns)),
+            ("GamePlayerTable.get_all", game_players.get_all),
+            ("GamePlayerTable.project_batch",
+             lambda: game_players.project_batch(game_players._columns)),
+        ]
+
+        return [measure_memory(name, func) for name, func in benchmarks]
+
+    def _get_all_benchmarks(self) -> list[tuple[str, Callable]]:
+        tables = (
+            GameTable, PlayerTable, PenaltyTable,
+            GamePlayerTable, PlayerPenaltiesTable
+        )
+        return [
+            (f"{table.__name__}.get_all", table(self._database).get_all)
+            for table in tables
+        ]
+
+    def _random_game_id(self) -> int:
+        return self._random.choice(self._game_ids)
+
+    def _per_game(self, get_by_game_id: Callable) -> Callable:
+        return lambda: get_by_game_id(self._random_game_id())
+
+    def _main_window_model(self):
+        from model import MainWindowModel
+        return MainWindowModel(self._database)
+
+    def _game_snapshot(self) -> Callable:
+        model = self._main_window_model()
+
+        def get_game_snapshot():
+            model.get_game_snapshot(self._random_game_id())
+            # Every call has to miss the cache, so this times the queries
+            model._snapshots.invalidate()
+
+        return get_game_snapshot
+
+    def _save_game(self) -> Callable:
+        from model import AddGameDialogModel
+        reference_data = self._main_window_model().reference_data
+
+        def save_game():
+            dialog_model = AddGameDialogModel(self._database, reference_data)
+            dialog_model.load()
+            for player in dialog_model.players[:6]:
+                player.is_playing = True
+            dialog_model.opponent = "Benchmark"
+            dialog_model.selected_season = dialog_model.seasons[-1].id
+            dialog_model.save_game()
+
+        return save_game
+
+    def _update_game_player(self) -> Callable:
+        model = self._main_window_model()
+
+        def update_game_player():
+            game_id = self._random_game_id()
+            players = model.get_all_sum_per_player(game_id)
+            player = self._random.choice(players)
+            game_player = model.get_game_player_with_penalties(
+                game_id, player.player_id
+            )
+            penalties = game_player.player_penalties_navigation
+            for player_penalty in penalties:
+                player_penalty.value = self._random.randint(0, 3)
+            game_player.errors = self._random.randint(0, 12)
+            model.update_game_player_with_penalties(game_player, penalties)
+
+        return update_game_player
+
+    def _populate_table_model(self) -> Callable:
+        from table_models import SumPerPlayerTablemodel
+        table_model = SumPerPlayerTablemodel()
+        view = SumPerPlayerView(self._database)
+        rows_per_game = [
+            view.get_by_game_id(game_id)
+            for game_id in self._random.sample(
+                self._game_ids, min(len(self._game_ids), 20)
+            )
+        ]
+
+        return lambda: table_model.merge_rows(
+            self._random.choice(rows_per_game)
+        )
+
+
+def run_benchmarks(config: SyntheticDataConfig, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "benchmark.db")
+        create_database(path, config)
+
+        suite = BenchmarkSuite(path, repeat, config.seed)
+        try:
+            results = suite.run()
+            memory = suite.run_memory()
+        finally:
+            suite.close()
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "config": config.as_dict(),
+        "repeat": repeat,
+        "results": [asdict(result) for result in results],
+        "memory": [asdict(result) for result in memory],
+    }
+
+
+def compare(report: dict, baseline: dict) -> list[str]:
+    baseline_results = {r["name"]: r for r in baseline["results"]}
+    lines = []
+
+    for result in report["results"]:
+        reference = baseline_results.get(result["name"])
+        if reference is None:
+            continue
+        ratio = result["median_ms"] / reference["median_ms"]
+        lines.append(
+            f"{result['name']}: {reference['median_ms']:.3f} ms -> "
+            f"{result['median_ms']:.3f} ms ({ratio:.2f}x)"
+        )
+
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the Kegelkasse data layer on synthetic data."
+    )
+    parser.add_argument("--seasons", type=int, default=3)
+    parser.add_argument("--games-per-season", type=int, default=30)
+    parser.add_argument("--players", type=int, default=12)
+    parser.add_argument("--players-per-game", type=int, default=6)
+    parser.add_argument("--penalties", type=int, default=10)
+    parser.add_argument("--range-penalties", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    arguments = parser.parse_args()
+
+    report = run_benchmarks(
+        SyntheticDataConfig(
+            arguments.seasons,
+            arguments.games_per_season,
+            arguments.players,
+            arguments.players_per_game,
+            arguments.penalties,
+            arguments.range_penalties,
+            arguments.seed
+        ),
+        arguments.repeat
+    )
+
+    if arguments.output:
+        Path(arguments.output).write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, indent=2))
+
+    if arguments.baseline:
+        baseline = json.loads(Path(arguments.baseline).read_text())
+        print("\n".join(compare(report, baseline)), file=sys.stderr)
@@ -1,4 +1,6 @@
 import abc
+from bisect import bisect_right
+from math import inf
 from entities import Penalty
 
 
@@ -20,18 +22,130 @@ class QuantityCalculator(CalculatorBase):
         return value * self.penalty.penalty
 
 
+class RangeCalculator:
+    """Resolves all range penalties of the catalog at once.
+
+    The limits of every range rule are compiled into one sorted boundary
+    list. Each gap between two boundaries is a segment that is either fully
+    inside or fully outside every rule, so a value is resolved with a single
+    binary search. Limits are inclusive, a missing limit is open and a value
+    of 0 counts as "not recorded yet".
+
+    Tiers may overlap ("unter 300", "unter 250"); only the narrowest tier
+    covering a value is charged, see ``narrowness``.
+    """
+    def __init__(self, penalties: list[Penalty]):
+        rules = [p for p in penalties if p.type_navigation.is_range]
+        boundaries = set()
+
+        for rule in rules:
+            if rule.lower_limit is not None:
+                boundaries.add(rule.lower_limit)
+            if rule.upper_limit is not None:
+                boundaries.add(rule.upper_limit + 1)
+
+        self._boundaries: list[int] = sorted(boundaries)
+        self._segment_rules: list[Penalty | None] = []
+
+        for segment in range(len(self._boundaries) + 1):
+            value = self._representative(segment)
+            self._segment_rules.append(min(
+                (rule for rule in rules if self._covers(rule, value)),
+                key=self.narrowness,
+                default=None
+            ))
+
+        self._segment_totals = [
+            rule.penalty if rule is not None else 0.0
+            for rule in self._segment_rules
+        ]
+
+    @staticmethod
+    def narrowness(rule: Penalty) -> tuple:
+        """Sort key of the tiers: the lowest upper limit first, then the
+        highest lower limit, then the lowest id. Open limits sort last.
+        """
+        upper = rule.upper_limit if rule.upper_limit is not None else inf
+        lower = -rule.lower_limit if rule.lower_limit is not None else inf
+        return upper, lower, rule.id
+
+    @property
+    def boundaries(self) -> list[int]:
+        return self._boundaries
+
+    @property
+    def segment_penalty_ids(self) -> list[int | None]:
+        """The id of the tier charged in each segment, None if there is
+        none."""
+        return [
+            rule.id if rule is not None else None
+            for rule in self._segment_rules
+        ]
+
+    def calculate(self, value: int) -> float:
+        if value <= 0:
+            return 0.0
+
+        return self._segment_totals[bisect_right(self._boundaries, value)]
+
+    def calculate_many(self, values: list[int]) -> list[float]:
+        boundaries = self._boundaries
+        totals = self._segment_totals
+        return [
+            totals[bisect_right(boundaries, v)] if v > 0 else 0.0
+            for v in values
+        ]
+
+    def calculate_penalty(self, penalty_id: int, value: int) -> float:
+        if value <= 0:
+            return 0.0
+
+        rule = self._segment_rules[bisect_right(self._boundaries, value)]
+        if rule is None or rule.id != penalty_id:
+            return 0.0
+        return rule.penalty
+
+    def _representative(self, segment: int) -> int:
+        if not self._boundaries:
+            return 0
+        if segment == 0:
+            return self._boundaries[0] - 1
+        return self._boundaries[segment - 1]
+
+    @staticmethod
+    def _covers(rule: Penalty, value: int) -> bool:
+        if rule.lower_limit is not None and value < rule.lower_limit:
+            return False
+        if rule.upper_limit is not None and value > rule.upper_limit:
+            return False
+        return True
+
+
 class PenaltyCalculator:
     def __init__(self, penalties: list[Penalty]):
         self.calculators: dict[int, CalculatorBase] = {}
+        self.range_calculator = RangeCalculator(penalties)
+        self._range_ids = {
+            p.id for p in penalties if p.type_navigation.is_range
+        }
 
         for penalty in penalties:
             if not penalty.type_navigation.is_range:
                 self.calculators[penalty.id] = QuantityCalculator(penalty)
 
+    def is_range(self, penalty_id: int) -> bool:
+        return penalty_id in self._range_ids
+
+    def calculate_penalty(self, penalty_id: int, value: int) -> float:
+        if penalty_id in self._range_ids:
+            return self.range_calculator.calculate_penalty(penalty_id, value)
+
+        return self.calculators[penalty_id].calculate(value)
+
     def calculate(self, values: dict) -> float:
         calculation_sum = 0.0
 
-        for penalty_id, value in values:
-            calculation_sum += self.calculators[penalty_id].calculate(value)
+        for penalty_id, value in values.items():
+            calculation_sum += self.calculate_penalty(penalty_id, value)
 
         return calculation_sum
@@ -0,0 +1,203 @@
+import argparse
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from database import Database
+from database_access import (
+    GameTable,
+    SeasonTable,
+    SumPerPlayerView,
+    ResultOfGameView,
+    SumPerGameView
+)
+from season_statistics import SeasonStatistics
+from clubs import CLUBS_FILE, CrossClubStatistics, load_clubs, upgrade_clubs
+
+# Only the sqlite layer may be imported here: the CLI has to start without
+# Qt, qasync or numpy so reports can run on a headless box.
+
+DEFAULT_DATABASE = "Kegelkasse.db"
+
+
+def list_games(database: Database, arguments) -> list[dict]:
+    games = GameTable(database)
+    results = ResultOfGameView(database)
+    sums = SumPerGameView(database)
+    rows = []
+
+    game = games.get_last(arguments.season)
+    while game is not None and len(rows) < arguments.limit:
+        result = results.get_by_game_id(game.id)
+        penalty_sum = sums.get_by_game_id(game.id)
+        rows.append({
+            "id": game.id,
+            "date": game.date,
+            "opponent": game.vs,
+            "gameday": game.gameday,
+            "season_id": game.season_id,
+            "result": result.totalResult if result else 0,
+            "errors": result.totalErrors if result else 0,
+            "penalty_sum": penalty_sum.penalty_sum if penalty_sum else 0.0,
+        })
+        game = games.get_previous(game, arguments.season)
+
+    return rows
+
+
+def show_game(database: Database, arguments) -> list[dict]:
+    if GameTable(database).get_by_id(arguments.game_id) is None:
+        raise LookupError(f"Game {arguments.game_id} does not exist")
+
+    return [
+        asdict(row)
+        for row in SumPerPlayerView(database).get_by_game_id(arguments.game_id)
+    ]
+
+
+def show_standings(database: Database, arguments) -> list[dict]:
+    season_id = arguments.season
+    if season_id is None:
+        season_id = _latest_season_id(database)
+
+    return [
+        asdict(row)
+        for row in SeasonStatistics(database).get_standings(season_id)
+    ]
+
+
+def show_balances(database: Database, arguments) -> list[dict]:
+    return [
+        asdict(row)
+        for row in SeasonStatistics(database).get_balances(arguments.season)
+    ]
+
+
+def list_seasons(database: Database, arguments) -> list[dict]:
+    return [asdict(season) for season in SeasonTable(database).get_all()]
+
+
+def compare_clubs(database: Database, arguments) -> list[dict]:
+    clubs = load_clubs(arguments.clubs_file, arguments.database)
+    upgrade_clubs(clubs)
+    return [
+        asdict(row)
+        for row in CrossClubStatistics(clubs).sum_per_team(arguments.season)
+    ]
+
+
+def _latest_season_id(database: Database) -> int:
+    game = GameTable(database).get_last()
+    if game is None:
+        raise LookupError("The database does not contain any games")
+    return game.season_id
+
+
+def format_table(rows: list[dict]) -> str:
+    if not rows:
+        return "Keine Einträge"
+
+    names = list(rows[0])
+    cells = [[_format_cell(row[name]) for name in names] for row in rows]
+    widths = [
+        max(len(name), *(len(line[index]) for line in cells))
+        for index, name in enumerate(names)
+    ]
+
+    lines = ["  ".join(n.ljust(w) for n, w in zip(names, widths))]
+    lines.append("  ".join("-" * width for width in widths))
+    for line in cells:
+        lines.append("  ".join(
+            cell.rjust(width) if _is_number(cell) else cell.ljust(width)
+            for cell, width in zip(line, widths)
+        ))
+
+    return "\n".join(lines)
+
+
+def _format_cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def _is_number(cell: str) -> bool:
+    return cell.replace(".", "", 1).lstrip("-").isdigit()
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="kegelkasse",
+        description="Prints Kegelkasse reports without starting the GUI."
+    )
+    parser.add_argument("--database", default=DEFAULT_DATABASE)
+    parser.add_argument(
+        "--json", action="store_true", help="print JSON instead of a table"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    games = commands.add_parser("games", help="latest games with totals")
+    games.add_argument("--season", type=int, help="season id, default: all")
+    games.add_argument("--limit", type=int, default=10)
+    games.set_defaults(handler=list_games)
+
+    game = commands.add_parser("game", help="per-player results of a game")
+    game.add_argument("game_id", type=int)
+    game.set_defaults(handler=show_game)
+
+    standings = commands.add_parser("standings", help="season standings")
+    standings.add_argument(
+        "--season", type=int, help="season id, default: latest season"
+    )
+    standings.set_defaults(handler=show_standings)
+
+    balances = commands.add_parser(
+        "balances", help="open penalty balances per player"
+    )
+    balances.add_argument("--season", type=int, help="season id, default: all")
+    balances.set_defaults(handler=show_balances)
+
+    seasons = commands.add_parser("seasons", help="all seasons")
+    seasons.set_defaults(handler=list_seasons)
+
+    clubs = commands.add_parser(
+        "clubs", help="penalty sums per team across all clubs"
+    )
+    clubs.add_argument("--clubs-file", default=CLUBS_FILE)
+    clubs.add_argument(
+        "--season", help="season description, e.g. 2024/2025, default: all"
+    )
+    clubs.set_defaults(handler=compare_clubs)
+
+    return parser
+
+
+def main(argv: list[str] = None) -> int:
+    arguments = create_parser().parse_args(argv)
+    if not Path(arguments.database).is_file():
+        # sqlite3 would silently create an empty database instead
+        print(f"Database '{arguments.database}' not found", file=sys.stderr)
+        return 1
+
+    # Reports only read; a single connection is cheaper to open than a pool
+    database = Database(arguments.database, reader_count=0)
+    try:
+        rows = arguments.handler(database, arguments)
+    except LookupError as error:
+        print(error, file=sys.stderr)
+        return 1
+    finally:
+        database.close()
+
+    if arguments.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        print(format_table(rows))
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,143 @@
+import json
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from database import Database
+from migrations import MIGRATIONS
+from view_data_classes import ClubTeamSum
+
+CLUBS_FILE = "clubs.json"
+DEFAULT_DATABASE = "Kegelkasse.db"
+
+
+@dataclass
+class Club:
+    name: str
+    path: str
+
+
+def load_clubs(
+    clubs_file: str = CLUBS_FILE,
+    default_database: str = DEFAULT_DATABASE
+) -> list[Club]:
+    """Reads the clubs from a JSON list of ``{"name": ..., "path": ...}``.
+
+    Relative paths are resolved against the clubs file. Without a clubs
+    file the default database is the only club.
+    """
+    path = Path(clubs_file)
+    if not path.is_file():
+        return [Club(Path(default_database).stem, default_database)]
+
+    entries = json.loads(path.read_text(encoding="utf-8"))
+    clubs = [
+        Club(entry["name"], str(path.parent / entry["path"]))
+        for entry in entries
+    ]
+    if not clubs:
+        raise ValueError(f"{clubs_file} does not list any club")
+
+    names = [club.name for club in clubs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"{clubs_file} lists a club name twice")
+
+    return clubs
+
+
+def upgrade_clubs(clubs: list[Club]) -> None:
+    """Brings every club database to the current schema; opening a
+    Database applies the pending migrations."""
+    for club in clubs:
+        Database(club.path, reader_count=0).close()
+
+
+class CrossClubStatistics:
+    """Aggregates over several club databases through ATTACH DATABASE.
+
+    Every club keeps its own file; for one query they are attached
+    read-only to a private in-memory connection, at most as many at a
+    time as SQLite allows, so the club databases and their connections
+    are never touched.
+    """
+    _TEAM_TOTALS_QUERY = """
+        SELECT ?, Team.ID, Team.TeamName,
+               (SELECT COUNT(*) FROM {schema}.Game
+                WHERE Game.Team = Team.ID),
+               ROUND(COALESCE(TeamTotals.PenaltySum, 0), 2)
+        FROM {schema}.Team
+        LEFT JOIN {schema}.TeamTotals ON TeamTotals.Team = Team.ID"""
+
+    # Season ids are local to a club, the description is what they share
+    _SEASON_TOTALS_QUERY = """
+        SELECT ?, Team.ID, Team.TeamName, COUNT(Game.ID),
+               ROUND(COALESCE(SUM(GameTotals.PenaltySum), 0), 2)
+        FROM {schema}.Team
+        INNER JOIN {schema}.Game ON Game.Team = Team.ID
+        INNER JOIN {schema}.Seasons ON Game.SeasonId = Seasons.Id
+        LEFT JOIN {schema}.GameTotals ON GameTotals.Game = Game.ID
+        WHERE Seasons.Description = ?
+        GROUP BY Team.ID"""
+
+    def __init__(self, clubs: list[Club]):
+        self._clubs = clubs
+
+    def sum_per_team(self, season: str = None) -> list[ClubTeamSum]:
+        """Penalty sums of every team of every club, optionally limited to
+        the season with the description ``season``."""
+        template = (
+            self._TEAM_TOTALS_QUERY if season is None
+            else self._SEASON_TOTALS_QUERY
+        )
+        rows = []
+
+        connection = sqlite3.connect(":memory:", uri=True)
+        try:
+            limit = connection.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+            for start in range(0, len(self._clubs), limit):
+                rows += self._query_chunk(
+                    connection, self._clubs[start:start + limit],
+                    template, season
+                )
+        finally:
+            connection.close()
+
+        result = [ClubTeamSum(*row) for row in rows]
+        result.sort(key=lambda s: (-s.penalty_sum, s.club, s.team_name))
+        return result
+
+    @staticmethod
+    def _query_chunk(
+        connection: sqlite3.Connection,
+        clubs: list[Club],
+        template: str,
+        season: str
+    ) -> list[tuple]:
+        schemas = [f"club{index}" for index in range(len(clubs))]
+
+        for club, schema in zip(clubs, schemas):
+            uri = Path(club.path).resolve().as_uri() + "?mode=ro"
+            connection.execute("ATTACH DATABASE ? AS ?", (uri, schema))
+        try:
+            for club, schema in zip(clubs, schemas):
+                version = connection.execute(
+                    f"PRAGMA {schema}.user_version"
+                ).fetchone()[0]
+                if version < MIGRATIONS[-1].version:
+                    raise ValueError(
+                        f"The database of club '{club.name}' has schema "
+                        f"version {version}, run upgrade_clubs first"
+                    )
+
+            query = " UNION ALL ".join(
+                template.format(schema=schema) for schema in schemas
+            )
+            params = []
+            for club in clubs:
+                params.append(club.name)
+                if season is not None:
+                    params.append(season)
+
+            return connection.execute(query, params).fetchall()
+        finally:
+            for schema in schemas:
+                connection.execute("DETACH DATABASE ?", (schema,))
@@ -1,34 +1,48 @@
+import asyncio
 from PySide6.QtCore import QModelIndex, Qt, QSortFilterProxyModel
-from PySide6.QtWidgets import QDialog, QDialogButtonBox
+from PySide6.QtGui import QAction, QActionGroup
+from PySide6.QtWidgets import QComboBox, QDialog, QDialogButtonBox, QLabel
+from qasync import asyncSlot
 from delegates import SpinBoxDelegate
-from edit_player_dialog import Ui_Dialog
-from addGameDialogView_ui import Ui_Dialog as AddGameDialogUi
 from ui_maindow import Ui_MainWindow
 from model import (
-    MainWindowModel,
+    AsyncMainWindowModel,
     EditPenaltyDialogModel,
+    AddGameDialogModel
+)
+from table_models import (
     PlayerPenaltiesTableModel,
     SumPerPlayerTablemodel,
-    AddGameDialogModel,
     PlayerTableModel,
-    SeasonListModel
+    SeasonListModel,
+    TeamListModel,
+    SeasonStandingsTableModel,
+    QueryStatisticsTableModel
 )
+from query_statistics import QueryStatistics
 from entities import Game
+from clubs import Club
+from backup import BackupResult
 from typing import TypeVar, Generic
 import abc
 
 
 class MainWindowController:
-    def __init__(self, model: MainWindowModel, mainWindow) -> None:
+    def __init__(self, model: AsyncMainWindowModel, mainWindow) -> None:
         self._window = mainWindow
         self._view: Ui_MainWindow = mainWindow.ui
         self._model = model
         self._currentGame: Game | None = None
-        self._games: list[Game] = []
+        self._previous_game: Game | None = None
+        self._next_game: Game | None = None
         self._penalty_tablemodel = SumPerPlayerTablemodel()
         self._sort_proxy_model = QSortFilterProxyModel()
+        self._statistics_controller: SeasonStatisticsDialogController | None = None
+        self._debug_controller: QueryStatisticsDialogController | None = None
         
         self._window.loaded.connect(self.window_loaded)
+        self._model.add_change_listener(self._games_changed)
+        self._model.add_backup_failure_listener(self._backup_failed)
         self._view.previous_push_button.clicked.connect(
             self.previous_button_clicked
             )
@@ -37,135 +51,247 @@ class MainWindowController:
             )
         self._view.tableView.doubleClicked.connect(self.table_doubleclick)
         self._view.addGamePushButton.clicked.connect(self.add_game_button_clicked)
+        self._window.season_statistics_action.triggered.connect(
+            self.season_statistics_triggered
+        )
+        self._window.debug_shortcut.activated.connect(self.debug_shortcut_activated)
+        self._window_title = self._window.windowTitle()
+        self._club_actions = self._create_club_actions()
+        self._update_window_title()
+
+    def _create_club_actions(self) -> QActionGroup:
+        group = QActionGroup(self._window)
+        clubs = self._model.clubs
+
+        for club in clubs:
+            action = self._window.club_menu.addAction(club.name)
+            action.setCheckable(True)
+            action.setChecked(club == self._model.current_club)
+            action.setData(club.name)
+            group.addAction(action)
+
+        group.triggered.connect(self.club_triggered)
+        self._window.club_menu.menuAction().setVisible(len(clubs) > 1)
+        return group
+
+    def _update_window_title(self):
+        if len(self._model.clubs) > 1:
+            self._window.setWindowTitle(
+                f"{self._window_title} - {self._model.current_club.name}"
+            )
+
+    @asyncSlot(QAction)
+    async def club_triggered(self, action: QAction):
+        name = action.data()
+        if name == self._model.current_club.name:
+            return
+
+        # Both dialogs show data of the club they were opened for
+        for controller in (self._statistics_controller, self._debug_controller):
+            if controller is not None:
+                controller.close()
+        self._statistics_controller = None
+        self._debug_controller = None
+
+        await self._model.switch_club(name)
+        self._update_window_title()
+        await self.initialize()
         
-    def add_game_button_clicked(self):
-        dialog_model = AddGameDialogModel(self._model._database)
+    @asyncSlot()
+    async def add_game_button_clicked(self):
+        dialog_model = self._model.create_add_game_model()
+        await self._model.run(dialog_model.load)
+        # Dialog views are imported on first use to keep them off the start
+        from addGameDialogView_ui import Ui_Dialog as AddGameDialogUi
         dialog_controller = AddGameDialogController(dialog_model, AddGameDialogUi())
-        dialog_result = dialog_controller.show_dialog()
+        dialog_result = await dialog_controller.show_dialog_async()
         
         if dialog_result:
-            dialog_model.save_game()
-            self.initialize()
+            await self._model.save_game(dialog_model)
+            await self.initialize()
+
+    @asyncSlot()
+    async def season_statistics_triggered(self):
+        if self._statistics_controller is None:
+            from season_statistics_view import Ui_SeasonStatisticsDialog
+            self._statistics_controller = SeasonStatisticsDialogController(
+                self._model, Ui_SeasonStatisticsDialog()
+            )
+
+        await self._statistics_controller.show_modeless()
+
+    def debug_shortcut_activated(self):
+        if self._debug_controller is None:
+            from debug_dialog_view import Ui_QueryStatisticsDialog
+            self._debug_controller = QueryStatisticsDialogController(
+                self._model.query_statistics, Ui_QueryStatisticsDialog()
+            )
+
+        self._debug_controller.show_modeless()
+
+    async def _games_changed(self, club: Club, game_ids: set[int]):
+        # Saves from this window and from the live scoring clients alike
+        if club != self._model.current_club:
+            return
+
+        game = self._currentGame
+        if game is not None and game.id in game_ids:
+            await self.fill_form()
+        await self._refresh_season_statistics()
+
+    def _backup_failed(self, club: Club, result: BackupResult):
+        # Stays until the next message; the saved data itself is fine
+        self._window.statusBar().showMessage(
+            f"Sicherung von {club.name} fehlgeschlagen: {result.check}"
+        )
+
+    async def _refresh_season_statistics(self):
+        # The statistics window stays open next to the main window and
+        # follows every saved game.
+        controller = self._statistics_controller
+        if controller is not None and controller.is_visible:
+            await controller.refresh()
         
-    def window_loaded(self):
-        self.initialize()
+    @asyncSlot()
+    async def window_loaded(self):
+        await self.initialize()
+        self._window.ready.emit()
 
-    def initialize(self) -> None:
-        self._games = self._model.get_all_games()
+    async def initialize(self) -> None:
+        last_game = await self._model.get_last_game()
         
-        if self._games:
+        if last_game:
             self._sort_proxy_model.setSourceModel(self._penalty_tablemodel)
-            self._currentGame = self._games[-1]
-            self.fill_form()
+            await self.show_game(last_game)
             self._view.tableView.setModel(self._sort_proxy_model)
-            
-            self.set_current_game_label()
-            self.set_enabled_of_previous_pushbutton()
-            self.set_enabled_of_next_pushbutton()
+        else:
+            self._clear_form()
+
+    def _clear_form(self):
+        # A club without games, e.g. after switching to a new one
+        self._currentGame = None
+        self._previous_game = None
+        self._next_game = None
+        self.set_enabled_of_previous_pushbutton()
+        self.set_enabled_of_next_pushbutton()
+        self._view.game_day_label.setText("")
+        self._penalty_tablemodel.merge_rows([])
+        for line_edit in (
+            self._view.teamresult_lineedit, self._view.teamerrors_lineEdit,
+            self._view.full_lineEdit, self._view.clear_lineEdit,
+            self._view.paysum_lineedit
+        ):
+            line_edit.setText("")
+
+    async def show_game(self, game: Game) -> None:
+        self._currentGame = game
+        self._previous_game = None
+        self._next_game = None
+        self.set_current_game_label()
+        self.set_enabled_of_previous_pushbutton()
+        self.set_enabled_of_next_pushbutton()
+
+        previous_game, next_game = await self._model.get_adjacent_games(game)
+
+        # Another navigation may have finished while we were waiting.
+        if self._currentGame is not game:
+            return
+
+        self._previous_game = previous_game
+        self._next_game = next_game
+        self.set_enabled_of_previous_pushbutton()
+        self.set_enabled_of_next_pushbutton()
+
+        await self.fill_form()
 
     def set_current_game_label(self):
         self._view.game_day_label.setText(self._currentGame.date)
 
-    def fill_form(self):
-        self._update_table_in_view()
-        self.update_game_stats_in_view()
-        self._update_sum_in_view()
-        
-    def _update_table_in_view(self):
-        table_model = self._penalty_tablemodel
-        table_model.remove_all_rows()
+    async def fill_form(self):
+        game = self._currentGame
+        snapshot = await self._model.get_game_snapshot(game.id)
+
+        # Another navigation (or a club switch, where ids repeat) may have
+        # finished while we were waiting.
+        if self._currentGame is not game:
+            return
+
+        self._update_table_in_view(snapshot.sum_per_player)
+        self.update_game_stats_in_view(snapshot.result)
+        self._update_sum_in_view(snapshot.penalty_sum)
+        self._prefetch_neighbours()
+
+    def _prefetch_neighbours(self):
+        neighbours = [
+            game.id
+            for game in (self._previous_game, self._next_game)
+            if game is not None
+        ]
+        self._model.prefetch_game_snapshots(neighbours)
         
-        sum_per_players = self._model.get_all_sum_per_player(
-            self._currentGame.id
+    def _update_table_in_view(self, sum_per_players):
+        structure_changed = self._penalty_tablemodel.merge_rows(
+            sum_per_players
         )
-        insert_index = table_model.createIndex(0, 0, QModelIndex())
-        table_model.insertRows(
-            insert_index,
-            rows=sum_per_players,
-            parent=QModelIndex()
-        )
-        
-        self._view.tableView.resizeColumnsToContents()
 
-    def update_game_stats_in_view(self):
-        game_stats = self._model.get_results_per_game(
-            self._currentGame.id
-        )
-        
+        if structure_changed:
+            self._view.tableView.resizeColumnsToContents()
+
+    def update_game_stats_in_view(self, game_stats):
         self._view.teamresult_lineedit.setText(str(game_stats.totalResult))
         self._view.teamerrors_lineEdit.setText(str(game_stats.totalErrors))
         self._view.full_lineEdit.setText(str(game_stats.totalFull))
         self._view.clear_lineEdit.setText(str(game_stats.totalClear))
 
-    def _update_sum_in_view(self):
-        sum_of_game = self._model.get_sum_per_game(
-            self._currentGame.id
-            )
-        
+    def _update_sum_in_view(self, sum_of_game):
         self._view.paysum_lineedit.setText(f"{sum_of_game.penalty_sum:.2f} €")
 
-    def previous_button_clicked(self):
-        current_index = self.get_current_index_of_game()
-        previous_index = current_index - 1
-        self._currentGame = self._games[previous_index]
-        self.set_current_game_label()
-        self.fill_form()
-
-        self.set_enabled_of_previous_pushbutton()
-        self.set_enabled_of_next_pushbutton()
+    @asyncSlot()
+    async def previous_button_clicked(self):
+        if self._previous_game is not None:
+            await self.show_game(self._previous_game)
 
     def set_enabled_of_previous_pushbutton(self):
-        at_first_index = self.get_current_index_of_game() == 0
-        self._view.previous_push_button.setEnabled(not at_first_index)
-
-    def next_pushbutton_clicked(self):
-        current_index = self.get_current_index_of_game()
-        next_index = current_index + 1
-        self._currentGame = self._games[next_index]
-        self.set_current_game_label()
-        self.fill_form()
+        self._view.previous_push_button.setEnabled(
+            self._previous_game is not None
+        )
 
-        self.set_enabled_of_next_pushbutton()
-        self.set_enabled_of_previous_pushbutton()
+    @asyncSlot()
+    async def next_pushbutton_clicked(self):
+        if self._next_game is not None:
+            await self.show_game(self._next_game)
 
     def set_enabled_of_next_pushbutton(self):
-        last_index = len(self._games) - 1
-        at_last_index = self.get_current_index_of_game() == last_index
-        self._view.next_push_button.setEnabled(not at_last_index)
+        self._view.next_push_button.setEnabled(self._next_game is not None)
 
-    def get_current_index_of_game(self):
-        current_index = self._games.index(self._currentGame)
-        return current_index
-
-    def table_doubleclick(self):
+    @asyncSlot()
+    async def table_doubleclick(self):
         selection_model = self._view.tableView.selectionModel()
         current_index = selection_model.currentIndex()
         selected_player = self._penalty_tablemodel.get(current_index.row())
 
-        game_player = self._model.get_by_game_and_player_id(
+        game_player = await self._model.get_game_player_with_penalties(
             selected_player.game_id,
             selected_player.player_id
             )
-        player_penalties = self._model.get_penalty_by_gameplayerid(
-            game_player.id
-            )
-
-        for player_penalty in player_penalties:
-            player_penalty.penalty_navigation = self._model.get_penalty(
-                player_penalty.penalty
-                )
+        player_penalties = game_player.player_penalties_navigation
 
-        game_player.player_penalties_navigation = player_penalties
-        dialog_model = EditPenaltyDialogModel(selected_player, game_player)
+        dialog_model = EditPenaltyDialogModel(
+            selected_player,
+            game_player,
+            await self._model.get_penalty_calculator()
+        )
 
+        from edit_player_dialog import Ui_Dialog
         dialog_controller = EditPenaltyDialogController(
             dialog_model, Ui_Dialog()
         )
-        dialog_result = dialog_controller.show_dialog()
+        dialog_result = await dialog_controller.show_dialog_async()
 
         if dialog_result:
-            self._model.update_game_player_with_penalties(game_player, player_penalties)
-            self.fill_form()
+            await self._model.update_game_player_with_penalties(
+                game_player, player_penalties
+            )
 
 
 TModel = TypeVar('TModel')
@@ -183,11 +309,26 @@ class DialogController(abc.ABC, Generic[TModel]):
         self.initialize()
         self._dialog.exec()
         return self._dialog.result()
+
+    async def show_dialog_async(self) -> int:
+        # A nested exec() loop would run other asyncio tasks re-entrantly,
+        # so the dialog is shown modeless-to-the-loop and awaited instead.
+        self.initialize()
+        finished = asyncio.get_running_loop().create_future()
+        self._dialog.finished.connect(
+            lambda result: finished.done() or finished.set_result(result)
+        )
+        self._dialog.setWindowModality(Qt.WindowModality.ApplicationModal)
+        self._dialog.show()
+        return await finished
     
     @abc.abstractmethod
     def initialize(self):
         pass
     
+    def close(self):
+        self._dialog.close()
+
     @property
     def model(self) -> TModel:
         return self.__model
@@ -200,7 +341,7 @@ class EditPenaltyDialogController(DialogController[EditPenaltyDialogModel]):
             view) -> None:
         super().__init__(edit_player_penalties_model, view)
              
-        self._table_model = PlayerPenaltiesTableModel()
+        self._table_model = PlayerPenaltiesTableModel(self.model.calculator)
         
         self._view.full_spin_box.setValue(self.model.game_player.full)
         self._view.clear_spin_box.setValue(self.model.game_player.clear)
@@ -243,6 +384,7 @@ class EditPenaltyDialogController(DialogController[EditPenaltyDialogModel]):
         total = full + clear
         
         self._view.total_line_edit.setText(str(total))
+        self._table_model.set_range_values(total)
 
     def __error_value_changed(self):
         self.model.game_player.errors = self._view.error_spin_box.value()
@@ -252,6 +394,98 @@ class EditPenaltyDialogController(DialogController[EditPenaltyDialogModel]):
                                   Qt.ItemDataRole.DisplayRole)
 
 
+class SeasonStatisticsDialogController(DialogController[AsyncMainWindowModel]):
+    def __init__(self, model: AsyncMainWindowModel, view) -> None:
+        super().__init__(model, view)
+
+        self._table_model = SeasonStandingsTableModel()
+        self._seasons_loaded = False
+        self._view.seasonComboBox.currentIndexChanged.connect(
+            self.season_changed
+        )
+
+    def initialize(self):
+        self._view.standingsTableView.verticalHeader().setVisible(False)
+        self._view.standingsTableView.setModel(self._table_model)
+
+    @property
+    def is_visible(self) -> bool:
+        return self._dialog.isVisible()
+
+    async def show_modeless(self):
+        if not self._seasons_loaded:
+            self.initialize()
+            seasons = await self.model.get_seasons()
+            self._view.seasonComboBox.setModel(SeasonListModel(seasons))
+            self._view.seasonComboBox.setCurrentIndex(len(seasons) - 1)
+            self._seasons_loaded = True
+
+        self._dialog.show()
+        self._dialog.raise_()
+        await self.refresh()
+
+    @asyncSlot()
+    async def season_changed(self):
+        await self.refresh()
+
+    async def refresh(self):
+        season_id = self._view.seasonComboBox.currentData(
+            Qt.ItemDataRole.UserRole
+        )
+        if season_id is None:
+            return
+
+        standings = await self.model.get_season_standings(season_id)
+
+        # The season may have been switched while we were waiting.
+        if season_id != self._view.seasonComboBox.currentData(
+            Qt.ItemDataRole.UserRole
+        ):
+            return
+
+        if self._table_model.merge_rows(standings):
+            self._view.standingsTableView.resizeColumnsToContents()
+
+
+class QueryStatisticsDialogController(DialogController[QueryStatistics]):
+    def __init__(self, model: QueryStatistics, view) -> None:
+        super().__init__(model, view)
+
+        self._table_model = QueryStatisticsTableModel()
+        self._view.thresholdSpinBox.setValue(model.slow_query_threshold_ms)
+        self._view.thresholdSpinBox.valueChanged.connect(self.threshold_changed)
+        self._view.refreshPushButton.clicked.connect(self.refresh)
+        self._view.resetPushButton.clicked.connect(self.reset)
+
+    def initialize(self):
+        self._view.statisticsTableView.verticalHeader().setVisible(False)
+        self._view.statisticsTableView.setModel(self._table_model)
+
+    def show_modeless(self):
+        self.initialize()
+        self.refresh()
+        self._dialog.show()
+        self._dialog.raise_()
+
+    def threshold_changed(self, value: float):
+        self.model.slow_query_threshold_ms = value
+
+    def reset(self):
+        self.model.reset()
+        self.refresh()
+
+    def refresh(self):
+        # The statistics are thread-safe snapshots, no database access here
+        if self._table_model.merge_rows(self.model.statistics()):
+            self._view.statisticsTableView.resizeColumnsToContents()
+
+        self._view.slowQueryPlainTextEdit.setPlainText("\n\n".join(
+            f"{query.duration_ms:.2f} ms  {query.sql}\n"
+            f"Parameter: {query.params}\n" + "\n".join(query.plan)
+            for query in reversed(self.model.slow_queries())
+        ))
+
+
 class AddGameDialogController(DialogController[AddGameDialogModel]):
     def __init__(self, model: AddGameDialogModel, view) -> None:
         super().__init__(model, view)
@@ -263,20 +497,46 @@ class AddGameDialogController(DialogController[AddGameDialogModel]):
         self._view.dateEdit.dateChanged.connect(self.date_changed)
         self._view.opponentLineEdit.textChanged.connect(self.set_opponent)
         self._view.seasonComboBox.currentIndexChanged.connect(self.set_season_id)
+        self._add_team_combo_box()
         
         self._is_opponent_valid = False
+
+    def _add_team_combo_box(self):
+        # Not part of the generated view: inserted above its spacer
+        layout = self._view.gridLayout_3
+        layout.removeItem(self._view.verticalSpacer)
+        self._team_label = QLabel("Mannschaft", self._dialog)
+        self._team_combo_box = QComboBox(self._dialog)
+        layout.addWidget(self._team_label, 4, 0, 1, 1)
+        layout.addWidget(self._team_combo_box, 4, 1, 1, 1)
+        layout.addItem(self._view.verticalSpacer, 5, 0, 1, 1)
+        self._team_combo_box.currentIndexChanged.connect(self.set_team_id)
                
     def initialize(self):
         self._view.playerTtableView.verticalHeader().setVisible(False)
         self._view.playerTtableView.setModel(self._table_model)
                 
-        self.model.load()  
         insert_index = self._table_model.createIndex(0, 0, QModelIndex())
         self._table_model.insertRows(insert_index, self.model.players, QModelIndex())
         self._view.playerTtableView.resizeColumnsToContents()
         
         self._view.seasonComboBox.setModel(SeasonListModel(self.model.seasons))
+
+        teams = self.model.teams
+        self._team_combo_box.setModel(TeamListModel(teams))
+        self._team_combo_box.setCurrentIndex(next(
+            (i for i, t in enumerate(teams) if t.id == self.model.selected_team),
+            -1
+        ))
+        # A club with a single team has nothing to choose
+        self._team_label.setVisible(len(teams) > 1)
+        self._team_combo_box.setVisible(len(teams) > 1)
         self.update_save_button()
+
+    def set_team_id(self):
+        self.model.selected_team = self._team_combo_box.currentData(
+            Qt.ItemDataRole.UserRole
+        )
     
     def set_season_id(self):
         season_id = self._view.seasonComboBox.currentData(Qt.ItemDataRole.UserRole)
@@ -302,5 +562,9 @@ class AddGameDialogController(DialogController[AddGameDialogModel]):
         self.update_save_button()
     
     def update_save_button(self):
-        is_enabled = self._is_opponent_valid and self._table_model.is_any_player_selected
+        is_enabled = (
+            self._is_opponent_valid
+            and self._table_model.is_any_player_selected
+            and self.model.selected_team is not None
+        )
         self._view.buttonBox.button(QDialogButtonBox.StandardButton.Save).setEnabled(is_enabled)
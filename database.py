@@ -1,35 +1,389 @@
+import queue
 import sqlite3
+import threading
+import time
 from typing import Any
+from collections.abc import Callable, Iterator
 from contextlib import contextmanager
+from pathlib import Path
+from migrations import MIGRATIONS, Migration
+from query_statistics import QueryStatistics
 
 
 class Database:
-    def __init__(self, db_name: str):
-        self._connection: sqlite3.Connection = sqlite3.connect(db_name)
+    """SQLite access in WAL mode with one writer and a pool of readers.
+
+    Queries are served by read-only connections so they never wait for an
+    open write transaction; commands and transactions go to the single
+    writer connection. Queries issued inside a transaction on the same
+    thread use the writer so they see their own uncommitted changes.
+    """
+    READER_COUNT = 3
+    BUSY_TIMEOUT_SECONDS = 5.0
+    ITER_BATCH_SIZE = 500
+    BACKUP_PAGES_PER_STEP = 64
+    BACKUP_STEP_PAUSE_SECONDS = 0.005
+
+    def __init__(
+        self,
+        db_name: str,
+        reader_count: int = READER_COUNT,
+        query_statistics: QueryStatistics = None
+    ):
+        self._db_name = db_name
+        self._query_statistics = query_statistics or QueryStatistics()
+        self._write_lock = threading.RLock()
+        self._version_lock = threading.Lock()
+        self._local = threading.local()
+
+        self._connection: sqlite3.Connection = self._connect(db_name)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._apply_migrations(MIGRATIONS)
+
+        self._readers: queue.SimpleQueue[sqlite3.Connection] = queue.SimpleQueue()
+        self._reader_connections: list[sqlite3.Connection] = []
+        self._version_connection: sqlite3.Connection = self._connection
+
+        if self._is_file_database(db_name):
+            self._reader_connections = [
+                self._connect_read_only(db_name) for _ in range(reader_count)
+            ]
+            for reader in self._reader_connections:
+                self._readers.put(reader)
+            # data_version only changes for commits of *other* connections,
+            # so it is watched through a connection that never writes.
+            self._version_connection = self._connect_read_only(db_name)
 
     @property
     def in_transaction(self) -> bool:
         return self._connection.in_transaction
 
+    @property
+    def data_version(self) -> int:
+        if self._version_connection is self._connection:
+            lock = self._write_lock
+        else:
+            lock = self._version_lock
+
+        with lock:
+            return self._version_connection.execute(
+                "PRAGMA data_version"
+            ).fetchone()[0]
+
+    @property
+    def query_statistics(self) -> QueryStatistics:
+        return self._query_statistics
+
+    @property
+    def schema_version(self) -> int:
+        with self._write_lock:
+            return self._connection.execute("PRAGMA user_version").fetchone()[0]
+
     def execute_query(self, sql: str, params: tuple = ()):
-        cursor = self._connection.cursor()
-        return cursor.execute(sql, params).fetchall()
+        with self._reader() as connection:
+            start = time.perf_counter()
+            rows = connection.execute(sql, params).fetchall()
+            self._record(connection, sql, params, start, len(rows))
+            return rows
 
     def execute_single_query(self, sql: str, params: tuple = ()) -> Any:
-        cursor = self._connection.cursor()
-        return cursor.execute(sql, params).fetchone()
+        with self._reader() as connection:
+            start = time.perf_counter()
+            row = connection.execute(sql, params).fetchone()
+            self._record(connection, sql, params, start, int(row is not None))
+            return row
+
+    def iter_query(
+        self,
+        sql: str,
+        params: tuple = (),
+        batch_size: int = ITER_BATCH_SIZE
+    ) -> Iterator[list[tuple]]:
+        """Yields the result in lists of at most ``batch_size`` rows.
+
+        A pooled reader is held until the generator is exhausted or closed,
+        so the whole result comes from one consistent snapshot. Only the
+        time spent fetching is recorded, not the consumer's.
+        """
+        with self._reader() as connection:
+            duration = 0.0
+            row_count = 0
+            start = time.perf_counter()
+            cursor = connection.execute(sql, params)
+            try:
+                while True:
+                    batch = cursor.fetchmany(batch_size)
+                    duration += time.perf_counter() - start
+                    if not batch:
+                        break
+                    row_count += len(batch)
+                    yield batch
+                    start = time.perf_counter()
+            finally:
+                cursor.close()
+                self._record_duration(
+                    connection, sql, params, duration * 1000, row_count
+                )
 
     def execute_command(self, sql: str, params: tuple = ()) -> int:
-        cursor = self._connection.cursor()
-        cursor.execute(sql, params)
-        return cursor.lastrowid
+        with self._write_lock:
+            start = time.perf_counter()
+            cursor = self._connection.cursor()
+            cursor.execute(sql, params)
+            self._record(
+                self._connection, sql, params, start, max(cursor.rowcount, 0)
+            )
+            return cursor.lastrowid
+
+    def execute_many(self, sql: str, rows: list[tuple]) -> int:
+        with self._write_lock:
+            start = time.perf_counter()
+            cursor = self._connection.cursor()
+            cursor.executemany(sql, rows)
+            self._record(
+                self._connection, sql, (), start, max(cursor.rowcount, 0)
+            )
+            return cursor.rowcount
+
+    def execute_returning(self, sql: str, params: tuple = ()) -> list:
+        with self._write_lock:
+            start = time.perf_counter()
+            cursor = self._connection.cursor()
+            rows = cursor.execute(sql, params).fetchall()
+            self._record(self._connection, sql, params, start, len(rows))
+            return rows
+
+    def backup(
+        self,
+        target: str,
+        pages_per_step: int = BACKUP_PAGES_PER_STEP,
+        step_pause: float = BACKUP_STEP_PAUSE_SECONDS,
+        progress: Callable[[int, int], None] = None
+    ) -> int:
+        """Copies the database to ``target`` while it stays in use and
+        returns the number of pages copied.
+
+        The copy runs through its own read-only connection in steps of
+        ``pages_per_step`` pages with a short pause in between, so the
+        writer is never blocked for longer than one step. Commits of other
+        connections make SQLite restart the copy from a newer snapshot.
+        """
+        total_pages = 0
+
+        def on_step(status: int, remaining: int, total: int) -> None:
+            nonlocal total_pages
+            total_pages = total
+            if progress is not None:
+                progress(total - remaining, total)
+            if remaining:
+                time.sleep(step_pause)
+
+        destination = sqlite3.connect(target)
+        try:
+            if self._is_file_database(self._db_name):
+                source = self._connect_read_only(self._db_name)
+                try:
+                    source.backup(
+                        destination, pages=pages_per_step, progress=on_step
+                    )
+                finally:
+                    source.close()
+            else:
+                # An in-memory database is only reachable through the writer
+                with self._write_lock:
+                    self._connection.backup(
+                        destination, pages=pages_per_step, progress=on_step
+                    )
+            # The copy is a standalone file, not part of a WAL setup
+            destination.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            destination.close()
+
+        return total_pages
+
+    @property
+    def max_variables(self) -> int:
+        return self._connection.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
 
     @contextmanager
     def transaction(self):
-        try:
-            self._connection.execute("BEGIN")
+        """Runs the block in one write transaction. A nested call joins
+        the enclosing transaction, which commits or rolls back as a whole.
+        """
+        with self._write_lock:
+            depth = self._transaction_depth
+            self._local.transaction_depth = depth + 1
+            if depth:
+                try:
+                    yield
+                finally:
+                    self._local.transaction_depth -= 1
+                return
+
+            self._local.after_commit = []
+            try:
+                self._connection.execute("BEGIN IMMEDIATE")
+                yield
+                self._connection.commit()
+            except Exception:
+                self._connection.rollback()
+                raise
+            finally:
+                self._local.transaction_depth -= 1
+                callbacks, self._local.after_commit = self._local.after_commit, []
+
+            for callback in callbacks:
+                callback()
+
+    @contextmanager
+    def read_transaction(self):
+        """Runs the queries of the block on one reader inside one read
+        transaction, so they all see the same committed state. Inside a
+        write transaction, or nested, the block simply joins it.
+        """
+        if self._transaction_depth or self._pinned_reader is not None:
             yield
-            self._connection.commit()
-        except Exception:
-            self._connection.rollback()
-            raise
+            return
+
+        with self._reader() as connection:
+            connection.execute("BEGIN")
+            self._local.reader = connection
+            try:
+                yield
+            finally:
+                self._local.reader = None
+                connection.execute("COMMIT")
+
+    def call_after_commit(self, callback: Callable[[], None]) -> None:
+        """Calls ``callback`` once the current transaction of this thread
+        has committed - never if it rolls back - or right away outside of
+        a transaction."""
+        if self._transaction_depth:
+            self._local.after_commit.append(callback)
+        else:
+            callback()
+
+    def close(self) -> None:
+        for reader in self._reader_connections:
+            reader.close()
+        if self._version_connection is not self._connection:
+            self._version_connection.close()
+        self._connection.close()
+
+    def _record(
+        self,
+        connection: sqlite3.Connection,
+        sql: str,
+        params: tuple,
+        start: float,
+        rows: int
+    ) -> None:
+        duration_ms = (time.perf_counter() - start) * 1000
+        self._record_duration(connection, sql, params, duration_ms, rows)
+
+    def _record_duration(
+        self,
+        connection: sqlite3.Connection,
+        sql: str,
+        params: tuple,
+        duration_ms: float,
+        rows: int
+    ) -> None:
+        is_slow = self._query_statistics.record(sql, duration_ms, rows)
+
+        if is_slow:
+            # Still on the connection that ran the statement, so the plan
+            # matches what was just executed.
+            self._query_statistics.log_slow_query(
+                sql, params, duration_ms,
+                self._explain(connection, sql, params)
+            )
+
+    @staticmethod
+    def _explain(
+        connection: sqlite3.Connection,
+        sql: str,
+        params: tuple
+    ) -> list[str]:
+        try:
+            plan = connection.execute(
+                "EXPLAIN QUERY PLAN " + sql, params
+            ).fetchall()
+        except sqlite3.Error as error:
+            return [f"EXPLAIN QUERY PLAN failed: {error}"]
+
+        depths = {0: -1}
+        lines = []
+        for node_id, parent_id, _, detail in plan:
+            depths[node_id] = depths.get(parent_id, -1) + 1
+            lines.append("  " * depths[node_id] + detail)
+
+        return lines
+
+    @property
+    def _transaction_depth(self) -> int:
+        return getattr(self._local, "transaction_depth", 0)
+
+    @property
+    def _pinned_reader(self) -> sqlite3.Connection | None:
+        return getattr(self._local, "reader", None)
+
+    @contextmanager
+    def _reader(self):
+        if self._pinned_reader is not None:
+            yield self._pinned_reader
+            return
+
+        if self._transaction_depth or not self._reader_connections:
+            with self._write_lock:
+                yield self._connection
+            return
+
+        reader = self._readers.get()
+        try:
+            yield reader
+        finally:
+            self._readers.put(reader)
+
+    @classmethod
+    def _connect(cls, db_name: str) -> sqlite3.Connection:
+        # Autocommit mode: transactions are only opened explicitly through
+        # transaction(), so single commands never leave the writer locked.
+        return sqlite3.connect(
+            db_name,
+            timeout=cls.BUSY_TIMEOUT_SECONDS,
+            isolation_level=None,
+            check_same_thread=False
+        )
+
+    @classmethod
+    def _connect_read_only(cls, db_name: str) -> sqlite3.Connection:
+        uri = Path(db_name).resolve().as_uri() + "?mode=ro"
+        return sqlite3.connect(
+            uri,
+            uri=True,
+            timeout=cls.BUSY_TIMEOUT_SECONDS,
+            check_same_thread=False
+        )
+
+    @staticmethod
+    def _is_file_database(db_name: str) -> bool:
+        in_memory = db_name in ("", ":memory:")
+        return not in_memory and not db_name.startswith("file:")
+
+    def _apply_migrations(self, migrations: list[Migration]) -> None:
+        current_version = self.schema_version
+        pending = [m for m in migrations if m.version > current_version]
+
+        if not pending:
+            return
+
+        with self.transaction():
+            for migration in pending:
+                for statement in migration.statements:
+                    self._connection.execute(statement)
+
+            # PRAGMA does not accept bound parameters
+            self._connection.execute(
+                f"PRAGMA user_version = {int(pending[-1].version)}"
+            )
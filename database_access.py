@@ -1,10 +1,15 @@
 import abc
-from typing import Generic, TypeVar
+import re
+from typing import Generic, NamedTuple, TypeVar
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import starmap
 from entities import (
     DefaultTeamPlayer,
     Game,
     GamePlayers,
     Penalty,
+    PenaltyKind,
     PlayerPenalties,
     Team,
     TeamPenalties,
@@ -12,29 +17,377 @@ from entities import (
     Season
 )
 from database import Database
+from record_batch import RecordBatch
 from view_data_classes import (
     SumPerPlayer,
     ResultOfGame,
     SumPerGame,
     SumPerTeam
 )
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator
 
 T = TypeVar('T')
 
 
+@dataclass(frozen=True)
+class Navigation:
+    """Describes how a navigation attribute of an entity is joined.
+
+    ``local_key`` is a column of the owning table, ``remote_key`` the
+    matching column of ``target``. ``many`` navigations are loaded into a
+    list, all others into a single entity (or None).
+    """
+    target: type["AbstractDatabaseObject"]
+    local_key: str
+    remote_key: str
+    many: bool = False
+
+
+class _IncludeNode:
+    def __init__(
+        self,
+        table: "AbstractDatabaseObject",
+        alias: str,
+        parent: "_IncludeNode" = None,
+        attribute: str = None,
+        navigation: Navigation = None
+    ):
+        self.table = table
+        self.alias = alias
+        self.parent = parent
+        self.attribute = attribute
+        self.navigation = navigation
+        self.children: dict[str, "_IncludeNode"] = {}
+        self.offset = 0
+        self.identity_map: dict = {}
+
+
+@lru_cache(maxsize=None)
+def _projection_type(table_name: str, columns: tuple[str, ...]) -> type:
+    fields = [
+        re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", column).lower()
+        for column in columns
+    ]
+    return NamedTuple(f"{table_name}Projection", [(f, object) for f in fields])
+
+
 class AbstractDatabaseObject(abc.ABC, Generic[T]):    
     def __init__(self, database_connection: Database):
         self._database: Database = database_connection
         self._table_name: str = ""
+        # Rows are mapped positionally onto _entity; _mapper is only set
+        # where a row needs converting first.
+        self._entity: type[T] = None
         self._mapper: Callable[[tuple], T] = None
+        self._columns: tuple[str, ...] = ()
+        self._navigations: dict[str, Navigation] = {}
+        # Tables that save changes keep each loaded row as the entity's
+        # snapshot; the others skip that per-row work.
+        self._track_changes = False
         
     def _create_select_query(self) -> str:
-        return f"SELECT * FROM {self._table_name}"
-    
+        # Mappers rely on the column order, so it is always spelled out
+        if not self._columns:
+            return f"SELECT * FROM {self._table_name}"
+
+        column_list = ", ".join(f'"{column}"' for column in self._columns)
+        return f"SELECT {column_list} FROM {self._table_name}"
+
     def get_all(self) -> list[T]:
-        rows = self._database.execute_query(self._create_select_query())
-        return [self._mapper(row) for row in rows]
+        return self._query(self._create_select_query())
+
+    def iter_all(
+        self,
+        batch_size: int = Database.ITER_BATCH_SIZE
+    ) -> Iterator[T]:
+        return self.iter_where("", (), batch_size=batch_size)
+
+    def iter_where(
+        self,
+        where: str,
+        params: tuple = (),
+        order_by: str = "",
+        batch_size: int = Database.ITER_BATCH_SIZE
+    ) -> Iterator[T]:
+        """Streams the matching entities through ``fetchmany`` instead of
+        loading the whole result. Navigations are not loaded.
+        """
+        query = self._create_select_query()
+        if where:
+            query += f" WHERE {where}"
+        if order_by:
+            query += f" ORDER BY {order_by}"
+
+        for batch in self._database.iter_query(query, params, batch_size):
+            yield from self._map_all(batch)
+
+    def project(
+        self,
+        columns: tuple[str, ...],
+        where: str = "",
+        params: tuple = (),
+        order_by: str = ""
+    ) -> list[tuple]:
+        """Reads only ``columns`` into lightweight named tuples whose fields
+        are the snake_case column names, e.g. ``SeasonId`` -> ``season_id``.
+        """
+        query = self._create_projection_query(columns, where, order_by)
+        projection = _projection_type(self._table_name, tuple(columns))
+
+        return list(starmap(
+            projection, self._database.execute_query(query, params)
+        ))
+
+    def project_batch(
+        self,
+        columns: tuple[str, ...],
+        where: str = "",
+        params: tuple = (),
+        order_by: str = ""
+    ) -> RecordBatch:
+        """Like ``project`` but stores the result column by column."""
+        query = self._create_projection_query(columns, where, order_by)
+        rows = self._database.execute_query(query, params)
+
+        return RecordBatch.from_rows(tuple(columns), rows)
+
+    def _create_projection_query(
+        self,
+        columns: tuple[str, ...],
+        where: str,
+        order_by: str
+    ) -> str:
+        unknown = set(columns) - set(self._columns)
+        if unknown:
+            raise ValueError(
+                f"{type(self).__name__} has no columns {sorted(unknown)}"
+            )
+
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        query = f"SELECT {column_list} FROM {self._table_name}"
+        if where:
+            query += f" WHERE {where}"
+        if order_by:
+            query += f" ORDER BY {order_by}"
+
+        return query
+
+    def _map(self, row: tuple) -> T:
+        if self._mapper is not None:
+            entity = self._mapper(row)
+        else:
+            entity = self._entity(*row)
+
+        if self._track_changes:
+            entity.mark_clean(tuple(row))
+        return entity
+
+    def _map_all(self, rows: list[tuple]) -> list[T]:
+        # starmap calls the dataclass constructor from C, without a Python
+        # level lambda per row.
+        if self._mapper is not None:
+            entities = list(map(self._mapper, rows))
+        else:
+            entities = list(starmap(self._entity, rows))
+
+        if self._track_changes:
+            for entity, row in zip(entities, rows):
+                entity.mark_clean(row)
+        return entities
+
+    def save_changes(self, entities: Iterable[T]) -> int:
+        """Writes the columns that differ from each entity's snapshot and
+        returns the number of updated rows.
+
+        Rows with the same set of changed columns share one ``executemany``.
+        Without changes no transaction is opened at all; inside an open
+        transaction the updates join it. Snapshots are refreshed once the
+        transaction has committed.
+        """
+        groups: dict[tuple[int, ...], list[tuple]] = {}
+        written: list[tuple[T, tuple]] = []
+
+        for entity in entities:
+            # The key column identifies the row and is never updated
+            changed = tuple(i for i in entity.changed_fields() if i != 0)
+            if not changed:
+                continue
+
+            values = entity.column_values()
+            groups.setdefault(changed, []).append(
+                tuple(values[i] for i in changed) + (values[0],)
+            )
+            written.append((entity, values))
+
+        if not written:
+            return 0
+
+        with self._database.transaction():
+            for changed, rows in groups.items():
+                assignments = ", ".join(
+                    f'"{self._columns[i]}" = ?' for i in changed
+                )
+                self._database.execute_many(
+                    f"UPDATE {self._table_name} SET {assignments} "
+                    f'WHERE "{self._columns[0]}" = ?',
+                    rows
+                )
+
+            def mark_clean():
+                for entity, values in written:
+                    entity.mark_clean(values)
+
+            self._database.call_after_commit(mark_clean)
+
+        return len(written)
+
+    def _query(self, query: str, params: tuple = ()) -> list[T]:
+        return self._map_all(self._database.execute_query(query, params))
+
+    def _query_single(self, query: str, params: tuple = ()) -> T | None:
+        row = self._database.execute_single_query(query, params)
+        return self._map(row) if row is not None else None
+
+    def get_where(
+        self,
+        where: str,
+        params: tuple = (),
+        includes: tuple[str, ...] = ()
+    ) -> list[T]:
+        """Loads the matching entities together with the given navigation
+        paths (e.g. ``"player_penalties_navigation.penalty_navigation"``)
+        in a single joined query. Columns in ``where`` must be qualified
+        with the table name.
+        """
+        root = self._build_include_tree(includes)
+        nodes = list(self._walk(root))
+
+        select_list = []
+        offset = 0
+        for node in nodes:
+            node.offset = offset
+            offset += len(node.table._columns)
+            select_list.extend(
+                f'{node.alias}."{column}"' for column in node.table._columns
+            )
+
+        query = (
+            f"SELECT {', '.join(select_list)} "
+            f"FROM {self._table_name} AS {root.alias}"
+            + "".join(self._create_join(node) for node in nodes[1:])
+            + f" WHERE {where} ORDER BY "
+            + ", ".join(f'{node.alias}."{node.table._columns[0]}"'
+                        for node in nodes)
+        )
+
+        results = []
+        for row in self._database.execute_query(query, params):
+            entity, is_new = self._materialize(root, row)
+            if is_new:
+                results.append(entity)
+            self._materialize_children(root, row, entity)
+
+        return results
+
+    def _build_include_tree(self, includes: tuple[str, ...]) -> _IncludeNode:
+        root = _IncludeNode(self, self._table_name)
+        alias_count = 0
+
+        for include in includes:
+            node = root
+            for attribute in include.split("."):
+                if attribute not in node.children:
+                    navigation = node.table._navigations.get(attribute)
+                    if navigation is None:
+                        raise ValueError(
+                            f"{type(node.table).__name__} has no "
+                            f"navigation '{attribute}'"
+                        )
+                    alias_count += 1
+                    node.children[attribute] = _IncludeNode(
+                        navigation.target(self._database),
+                        f"n{alias_count}",
+                        node,
+                        attribute,
+                        navigation
+                    )
+                node = node.children[attribute]
+
+        return root
+
+    @classmethod
+    def _walk(cls, node: _IncludeNode):
+        yield node
+        for child in node.children.values():
+            yield from cls._walk(child)
+
+    @staticmethod
+    def _create_join(node: _IncludeNode) -> str:
+        return (
+            f" LEFT JOIN {node.table._table_name} AS {node.alias}"
+            f' ON {node.alias}."{node.navigation.remote_key}"'
+            f' = {node.parent.alias}."{node.navigation.local_key}"'
+        )
+
+    @staticmethod
+    def _materialize(node: _IncludeNode, row: tuple):
+        columns = node.table._columns
+        values = row[node.offset:node.offset + len(columns)]
+        key = values[0]
+
+        if key is None:
+            return None, False
+
+        entity = node.identity_map.get(key)
+        if entity is not None:
+            return entity, False
+
+        entity = node.table._map(values)
+        for attribute, child in node.children.items():
+            if child.navigation.many:
+                setattr(entity, attribute, [])
+        node.identity_map[key] = entity
+        return entity, True
+
+    def _materialize_children(self, node: _IncludeNode, row: tuple, entity):
+        for attribute, child in node.children.items():
+            child_entity, is_new = self._materialize(child, row)
+            if child_entity is None:
+                continue
+
+            if child.navigation.many:
+                if is_new:
+                    getattr(entity, attribute).append(child_entity)
+            else:
+                setattr(entity, attribute, child_entity)
+
+            self._materialize_children(child, row, child_entity)
+
+    def _insert_many(
+        self, columns: tuple[str, ...], rows: list[tuple]
+    ) -> list[int]:
+        if not rows:
+            return []
+
+        column_list = ", ".join(columns)
+        placeholders = "(" + ", ".join("?" * len(columns)) + ")"
+        chunk_size = max(1, self._database.max_variables // len(columns))
+        new_ids = []
+
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            query = (
+                f"INSERT INTO {self._table_name} ({column_list}) VALUES "
+                + ", ".join([placeholders] * len(chunk))
+                + " RETURNING ID"
+            )
+            params = tuple(value for row in chunk for value in row)
+            returned = self._database.execute_returning(query, params)
+            # RETURNING has no defined order, but AUTOINCREMENT hands out
+            # ascending ids in VALUES order.
+            new_ids.extend(sorted(row[0] for row in returned))
+
+        return new_ids
     
     def commit(self):
         self._database.commit()
@@ -47,21 +400,24 @@ class SeasonTable(AbstractDatabaseObject[Season]):
     def __init__(self, database_connection):
         super().__init__(database_connection)
         self._table_name = "Seasons"
-        self._mapper = lambda row: Season(*row)
+        self._entity = Season
+        self._columns = ("Id", "Description")
 
 
 class DefaultTeamPlayerTable(AbstractDatabaseObject[DefaultTeamPlayer]):
     def __init__(self, database_connection,):
         super().__init__(database_connection)
         self._table_name = "DefaultTeamPlayer"
-        self._mapper = lambda row: DefaultTeamPlayer(*row)
+        self._entity = DefaultTeamPlayer
+        self._columns = ("ID", "Player", "Team")
 
 
 class GameTable(AbstractDatabaseObject[Game]):
     def __init__(self, database_connection):
         super().__init__(database_connection)
         self._table_name = "Game"
-        self._mapper = lambda row: Game(*row)
+        self._entity = Game
+        self._columns = ("ID", "Team", "Date", "Vs", "Gameday", "SeasonId")
         
     def insert(self, team_id: int, game_date: str, opponent: str, game_day: int, season_id: int) -> int:
         query = f"""INSERT INTO {self._table_name} 
@@ -71,18 +427,118 @@ class GameTable(AbstractDatabaseObject[Game]):
         new_id = self._database.execute_command(query, params)
         return new_id
 
+    # Keyset navigation over (Date, ID): every seek is a single index range
+    # scan, independent of how many games the archive holds.
+    def get_by_id(self, game_id: int) -> Game | None:
+        query = self._create_select_query() + " WHERE ID = ?"
+        return self._query_single(query, (game_id,))
+
+    def get_first(self, season_id: int = None) -> Game | None:
+        return self._seek("", (), "ASC", season_id)
+
+    def get_last(self, season_id: int = None) -> Game | None:
+        return self._seek("", (), "DESC", season_id)
+
+    def get_next(self, game: Game, season_id: int = None) -> Game | None:
+        return self._seek(
+            "(Date, ID) > (?, ?)", (game.date, game.id), "ASC", season_id
+        )
+
+    def get_previous(self, game: Game, season_id: int = None) -> Game | None:
+        return self._seek(
+            "(Date, ID) < (?, ?)", (game.date, game.id), "DESC", season_id
+        )
+
+    def get_page(
+        self,
+        after: Game = None,
+        limit: int = 50,
+        season_id: int = None
+    ) -> list[Game]:
+        condition, params = "", ()
+        if after is not None:
+            condition, params = "(Date, ID) > (?, ?)", (after.date, after.id)
+
+        query, params = self._create_seek_query(
+            condition, params, "ASC", season_id
+        )
+        return self._query(query, params + (limit,))
+
+    def iter_pages(self, page_size: int = 50, season_id: int = None):
+        page = self.get_page(None, page_size, season_id)
+
+        while page:
+            yield page
+            page = self.get_page(page[-1], page_size, season_id)
+
+    def _seek(
+        self,
+        condition: str,
+        params: tuple,
+        direction: str,
+        season_id: int
+    ) -> Game | None:
+        query, params = self._create_seek_query(
+            condition, params, direction, season_id
+        )
+        return self._query_single(query, params + (1,))
+
+    def _create_seek_query(
+        self,
+        condition: str,
+        params: tuple,
+        direction: str,
+        season_id: int
+    ) -> tuple[str, tuple]:
+        conditions = [condition] if condition else []
+
+        if season_id is not None:
+            conditions.append("SeasonId = ?")
+            params = params + (season_id,)
+
+        query = self._create_select_query()
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY Date {direction}, ID {direction} LIMIT ?"
+
+        return query, params
+
 
 class GamePlayerTable(AbstractDatabaseObject[GamePlayers]):
     def __init__(self, database_connection):
         super().__init__(database_connection)
         self._table_name = "GamePlayers"
-        self._mapper = lambda row: GamePlayers(*row)
+        self._entity = GamePlayers
+        self._track_changes = True
+        self._columns = (
+            "ID", "Game", "Player", "Paid", "Result",
+            "Full", "Clear", "Errors", "Played"
+        )
+        self._navigations = {
+            "player_penalties_navigation": Navigation(
+                PlayerPenaltiesTable, "ID", "GamePlayer", many=True
+            )
+        }
+
+    _INSERT_COLUMNS = (
+        "Game", "Player", "Paid", "Result", "Full", "Clear", "Errors", "Played"
+    )
 
     def insert(self, game_player: GamePlayers) -> int:
         query = f"""INSERT INTO {self._table_name} 
                    (Game, Player, Paid, Result, Full, Clear, Errors, Played)
                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)"""
-        params = (
+        params = self._insert_params(game_player)
+        
+        return self._database.execute_command(query, params)
+
+    def insert_many(self, game_players: list[GamePlayers]) -> list[int]:
+        rows = [self._insert_params(gp) for gp in game_players]
+        return self._insert_many(self._INSERT_COLUMNS, rows)
+
+    @staticmethod
+    def _insert_params(game_player: GamePlayers) -> tuple:
+        return (
             game_player.game,
             game_player.player,
             game_player.paid,
@@ -92,152 +548,200 @@ class GamePlayerTable(AbstractDatabaseObject[GamePlayers]):
             game_player.errors,
             int(game_player.played)
         )
-        
-        return self._database.execute_command(query, params)
 
     def get_by_game_and_player(
         self, game_id: int, player_id: int
     ) -> GamePlayers:
         query = self._create_select_query() + " WHERE Game = ? AND Player = ?"
         params = (game_id, player_id)
-        r = self._database.execute_single_query(query, params)
-
-        return self._mapper(r)
 
-    def update(self, game_player: GamePlayers) -> None:
-        query = f"""UPDATE {self._table_name} 
-                   SET Result = ?,
-                       Full = ?,
-                       Clear = ?,
-                       Errors = ?
-                   WHERE Id = ?"""
-
-        params = (
-            game_player.sum_points,
-            game_player.full,
-            game_player.clear,
-            game_player.errors,
-            game_player.id
-        )
-        self._database.execute_command(query, params)
+        return self._query_single(query, params)
 
 
 class PenaltyTable(AbstractDatabaseObject[Penalty]):
     def __init__(self, database_connection):
         super().__init__(database_connection)
         self._table_name = "Penalty"
-        self._mapper = lambda row: Penalty(*row)
+        self._entity = Penalty
+        self._columns = (
+            "ID", "Description", "PenaltyTypeId", "penalty",
+            "LowerLimit", "UpperLimit", "GetsValueByParent"
+        )
+        self._navigations = {
+            "type_navigation": Navigation(
+                PenaltyKindTable, "PenaltyTypeId", "ID"
+            )
+        }
 
     def get_by_id(self, penalty_id: int) -> Penalty:
         query = self._create_select_query() + " WHERE Id = ?"
         params = (penalty_id,)
-        r = self._database.execute_single_query(query, params)
 
-        return self._mapper(r)
+        return self._query_single(query, params)
+
+
+class PenaltyKindTable(AbstractDatabaseObject[PenaltyKind]):
+    def __init__(self, database_connection):
+        super().__init__(database_connection)
+        self._table_name = "PenaltyKind"
+        self._entity = PenaltyKind
+        self._mapper = lambda row: PenaltyKind(row[0], row[1], bool(row[2]))
+        self._columns = ("ID", "Description", "IsRange")
 
 
 class PlayerPenaltiesTable(AbstractDatabaseObject[PlayerPenalties]):
     def __init__(self, database_connection):
         super().__init__(database_connection)
         self._table_name = "PlayerPenalties"
-        self._mapper = lambda row: PlayerPenalties(*row)
+        self._entity = PlayerPenalties
+        self._track_changes = True
+        self._columns = ("ID", "GamePlayer", "Penalty", "Value")
+        self._navigations = {
+            "penalty_navigation": Navigation(PenaltyTable, "Penalty", "ID")
+        }
 
     def get_by_gameplayerid(self, gameplayerid: int) -> list[PlayerPenalties]:
         query = self._create_select_query() + " WHERE GamePlayer = ?"
         params = (gameplayerid,)
-        r = self._database.execute_query(query, params)
 
-        return [self._mapper(row) for row in r]
+        return self._query(query, params)
 
-    def update(self, player_penalty: PlayerPenalties):
-        query = """UPDATE PlayerPenalties 
-                   SET Value = ?
-                   WHERE Id = ?"""
+    def get_penalty_columns(self, season_id: int = None) -> list[tuple]:
+        """Returns (SeasonId, Game, Player, GamePlayer, Penalty, Value) rows
+        for one season, or for the whole history if no season is given.
+        """
+        query = f"""SELECT COALESCE(Game.SeasonId, 0), GamePlayers.Game,
+                           GamePlayers.Player, {self._table_name}.GamePlayer,
+                           {self._table_name}.Penalty, {self._table_name}.Value
+                    FROM {self._table_name}
+                    INNER JOIN GamePlayers
+                    ON {self._table_name}.GamePlayer = GamePlayers.ID
+                    INNER JOIN Game ON GamePlayers.Game = Game.ID"""
+        params = ()
+
+        if season_id is not None:
+            query += " WHERE Game.SeasonId = ?"
+            params = (season_id,)
+
+        return self._database.execute_query(query, params)
 
-        params = (player_penalty.value, player_penalty.id)
-        self._database.execute_command(query, params)
-        
     def insert(self, player_penalty: PlayerPenalties) -> int:
         query = """INSERT INTO PlayerPenalties 
                    (GamePlayer, Penalty, Value)
                    VALUES (?, ?, ?)"""
-        params = (
+        params = self._insert_params(player_penalty)
+        
+        return self._database.execute_command(query, params)
+
+    def insert_many(
+        self, player_penalties: list[PlayerPenalties]
+    ) -> list[int]:
+        rows = [self._insert_params(pp) for pp in player_penalties]
+        return self._insert_many(("GamePlayer", "Penalty", "Value"), rows)
+
+    @staticmethod
+    def _insert_params(player_penalty: PlayerPenalties) -> tuple:
+        return (
             player_penalty.game_player,
             player_penalty.penalty,
             player_penalty.value
         )
-        
-        return self._database.execute_command(query, params)
 
 
 class PlayerTable(AbstractDatabaseObject[Player]):
     def __init__(self, database_connection):
         super().__init__(database_connection)
         self._table_name = "Player"
-        self._mapper = lambda row: Player(*row)
+        self._entity = Player
+        self._columns = ("ID", "Name")
 
 
 class TeamTableAccess(AbstractDatabaseObject[Team]):
     def __init__(self, database_connection):
         super().__init__(database_connection)
         self._table_name = "Team"
-        self._mapper = lambda row: Team(*row)
+        self._entity = Team
+        self._columns = ("ID", "TeamName")
 
 
 class TeamPenaltiesTableAccess(AbstractDatabaseObject[TeamPenalties]):
     def __init__(self, database_connection):
         super().__init__(database_connection)
         self._table_name = "TeamPenalties"
-        self._mapper = lambda row: TeamPenalties(*row)
+        self._entity = TeamPenalties
+        self._columns = ("ID", "Team", "Penalty")
 
 
 class SumPerTeamViewAccess(AbstractDatabaseObject[SumPerTeam]):
     def __init__(self, database_connection):
         super().__init__(database_connection)
-        self._table_name = "SumPerTeam"
-        self._mapper = lambda row: SumPerTeam(*row)
+        self._table_name = "TeamTotals"
+        self._entity = SumPerTeam
+
+    def _create_select_query(self) -> str:
+        return f"""SELECT Team.TeamName, {self._table_name}.PenaltySum
+                   FROM {self._table_name}
+                   INNER JOIN Team ON Team.ID = {self._table_name}.Team"""
 
 
 class SumPerPlayerView(AbstractDatabaseObject[SumPerPlayer]):
     def __init__(self, database_connection):
         super().__init__(database_connection)
-        self._table_name = "SumPerPlayer"
-        self._mapper = lambda row: SumPerPlayer(*row)
+        self._table_name = "PlayerTotals"
+        self._entity = SumPerPlayer
+
+    def _create_select_query(self) -> str:
+        return f"""SELECT Game.ID, Game.Date, Team.TeamName, Player.ID,
+                          Player.Name, {self._table_name}.PenaltySum,
+                          GamePlayers."Full", GamePlayers.Clear,
+                          GamePlayers.Errors, GamePlayers.Played,
+                          GamePlayers."Full" + GamePlayers.Clear
+                   FROM GamePlayers
+                   INNER JOIN {self._table_name}
+                   ON {self._table_name}.GamePlayer = GamePlayers.ID
+                   INNER JOIN Player ON GamePlayers.Player = Player.ID
+                   INNER JOIN Game ON GamePlayers.Game = Game.ID
+                   INNER JOIN Team ON Game.Team = Team.ID"""
 
     def get_by_game_id(self, game_id: int):
-        query = self._create_select_query() + " WHERE GameId = ?"
+        query = self._create_select_query() + """ WHERE GamePlayers.Game = ?
+                                                  ORDER BY GamePlayers.Player"""
         params = (game_id,)
 
-        r = self._database.execute_query(query, params)
-        return [self._mapper(row) for row in r]
+        return self._query(query, params)
 
 
 class ResultOfGameView(AbstractDatabaseObject[ResultOfGame]):
     def __init__(self, database_connection):
         super().__init__(database_connection)
-        self._table_name = "ResultOfGame"
-        self._mapper = lambda row: ResultOfGame(*row)
+        self._table_name = "GameTotals"
+        self._entity = ResultOfGame
+
+    def _create_select_query(self) -> str:
+        return f"""SELECT Game, TotalFull, TotalClear, TotalResult, TotalErrors
+                   FROM {self._table_name}"""
 
     def get_by_game_id(self, game_id: int) -> ResultOfGame:
         params = (game_id,)
-        r = self._database.execute_single_query(
-            self._create_select_query() + " WHERE Id = ?", params
+        return self._query_single(
+            self._create_select_query() + " WHERE Game = ?", params
         )
-        return self._mapper(r)
 
 
 class SumPerGameView(AbstractDatabaseObject[SumPerGame]):
     def __init__(self, database_connection):
         super().__init__(database_connection)
-        self._table_name = "SumPerGame"
-        self._mapper = lambda row: SumPerGame(*row)
+        self._table_name = "GameTotals"
+        self._entity = SumPerGame
+
+    def _create_select_query(self) -> str:
+        return f"SELECT Game, PenaltySum FROM {self._table_name}"
     
     def get_by_game_id(self, game_id: int) -> SumPerGame:
         params = (game_id,)
-        r = self._database.execute_single_query(
-            self._create_select_query() + " WHERE GameId = ?", params
+        return self._query_single(
+            self._create_select_query() + " WHERE Game = ?", params
         )
-        return self._mapper(r)
 
 
 if __name__ == "__main__":
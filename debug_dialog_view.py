@@ -0,0 +1,68 @@
+from PySide6.QtCore import QCoreApplication, Qt
+from PySide6.QtWidgets import (
+    QDialogButtonBox,
+    QDoubleSpinBox,
+    QHBoxLayout,
+    QLabel,
+    QPlainTextEdit,
+    QPushButton,
+    QSplitter,
+    QTableView,
+    QVBoxLayout
+)
+
+
+class Ui_QueryStatisticsDialog:
+    def setupUi(self, Dialog):
+        Dialog.setObjectName("QueryStatisticsDialog")
+        Dialog.resize(900, 600)
+
+        self.verticalLayout = QVBoxLayout(Dialog)
+
+        self.horizontalLayout = QHBoxLayout()
+        self.thresholdLabel = QLabel(Dialog)
+        self.horizontalLayout.addWidget(self.thresholdLabel)
+        self.thresholdSpinBox = QDoubleSpinBox(Dialog)
+        self.thresholdSpinBox.setObjectName("thresholdSpinBox")
+        self.thresholdSpinBox.setRange(0.0, 10000.0)
+        self.thresholdSpinBox.setSuffix(" ms")
+        self.horizontalLayout.addWidget(self.thresholdSpinBox)
+        self.horizontalLayout.addStretch(1)
+        self.refreshPushButton = QPushButton(Dialog)
+        self.refreshPushButton.setObjectName("refreshPushButton")
+        self.horizontalLayout.addWidget(self.refreshPushButton)
+        self.resetPushButton = QPushButton(Dialog)
+        self.resetPushButton.setObjectName("resetPushButton")
+        self.horizontalLayout.addWidget(self.resetPushButton)
+        self.verticalLayout.addLayout(self.horizontalLayout)
+
+        self.splitter = QSplitter(Qt.Orientation.Vertical, Dialog)
+        self.statisticsTableView = QTableView(self.splitter)
+        self.statisticsTableView.setObjectName("statisticsTableView")
+        self.slowQueryPlainTextEdit = QPlainTextEdit(self.splitter)
+        self.slowQueryPlainTextEdit.setObjectName("slowQueryPlainTextEdit")
+        self.slowQueryPlainTextEdit.setReadOnly(True)
+        self.verticalLayout.addWidget(self.splitter)
+
+        self.buttonBox = QDialogButtonBox(Dialog)
+        self.buttonBox.setStandardButtons(
+            QDialogButtonBox.StandardButton.Close
+        )
+        self.verticalLayout.addWidget(self.buttonBox)
+        self.buttonBox.rejected.connect(Dialog.reject)
+
+        self.retranslateUi(Dialog)
+
+    def retranslateUi(self, Dialog):
+        Dialog.setWindowTitle(QCoreApplication.translate(
+            "QueryStatisticsDialog", "Datenbank-Statistik", None
+        ))
+        self.thresholdLabel.setText(QCoreApplication.translate(
+            "QueryStatisticsDialog", "Langsam ab", None
+        ))
+        self.refreshPushButton.setText(QCoreApplication.translate(
+            "QueryStatisticsDialog", "Aktualisieren", None
+        ))
+        self.resetPushButton.setText(QCoreApplication.translate(
+            "QueryStatisticsDialog", "Zurücksetzen", None
+        ))
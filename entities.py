@@ -1,21 +1,64 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Any
 
 
-@dataclass
-class Season:
+@lru_cache(maxsize=None)
+def _column_fields(cls: type) -> tuple[str, ...]:
+    # Navigation attributes hold related entities, not columns
+    return tuple(
+        field.name for field in fields(cls)
+        if not field.name.endswith("_navigation")
+    )
+
+
+class TrackedEntity:
+    """Change tracking against the values an entity was loaded with.
+
+    The column fields come first and in column order, so the row a table
+    mapped the entity from is its snapshot. An entity without snapshot
+    counts every column as changed.
+    """
+    __slots__ = ("_snapshot",)
+
+    def column_values(self) -> tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in _column_fields(type(self)))
+
+    def changed_fields(self) -> tuple[int, ...]:
+        """Positions of the column fields that differ from the snapshot."""
+        values = self.column_values()
+        snapshot = getattr(self, "_snapshot", None)
+        if snapshot is None:
+            return tuple(range(len(values)))
+
+        return tuple(
+            index for index, (value, original) in enumerate(zip(values, snapshot))
+            if value != original
+        )
+
+    @property
+    def is_dirty(self) -> bool:
+        return bool(self.changed_fields())
+
+    def mark_clean(self, values: tuple = None) -> None:
+        self._snapshot = self.column_values() if values is None else values
+
+
+@dataclass(slots=True)
+class Season(TrackedEntity):
     id: int
     name: str
 
 
-@dataclass
-class DefaultTeamPlayer:
+@dataclass(slots=True)
+class DefaultTeamPlayer(TrackedEntity):
     id: int
     player: int
     team: int
 
 
-@dataclass
-class Game:
+@dataclass(slots=True)
+class Game(TrackedEntity):
     id: int
     team: int
     date: str
@@ -24,15 +67,15 @@ class Game:
     season_id: int
 
 
-@dataclass
-class PenaltyKind:
+@dataclass(slots=True)
+class PenaltyKind(TrackedEntity):
     id: int
     description: str
     is_range: bool = False
 
 
-@dataclass
-class Penalty:
+@dataclass(slots=True)
+class Penalty(TrackedEntity):
     id: int
     description: str
     type: int
@@ -43,14 +86,14 @@ class Penalty:
     type_navigation: PenaltyKind = None
 
 
-@dataclass
-class Player:
+@dataclass(slots=True)
+class Player(TrackedEntity):
     id: int
     name: str
 
 
-@dataclass
-class PlayerPenalties:
+@dataclass(slots=True)
+class PlayerPenalties(TrackedEntity):
     id: int
     game_player: int
     penalty: int
@@ -58,21 +101,21 @@ class PlayerPenalties:
     penalty_navigation: Penalty = None
 
 
-@dataclass
-class Team:
+@dataclass(slots=True)
+class Team(TrackedEntity):
     id: int
     name: str
 
 
-@dataclass
-class TeamPenalties:
+@dataclass(slots=True)
+class TeamPenalties(TrackedEntity):
     id: int
     team: int
     penalty: int
 
 
-@dataclass
-class GamePlayers:
+@dataclass(slots=True)
+class GamePlayers(TrackedEntity):
     id: int
     game: int
     player: int
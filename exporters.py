@@ -0,0 +1,144 @@
+import argparse
+import csv
+import json
+import os
+from collections.abc import Iterable, Iterator
+from dataclasses import fields
+from pathlib import Path
+from database import Database
+from database_access import PlayerPenaltiesTable, SumPerPlayerView
+
+EXPORT_FORMATS = (".csv", ".jsonl")
+
+
+def export_sum_per_player(
+    database: Database,
+    path: str,
+    season_id: int = None,
+    batch_size: int = Database.ITER_BATCH_SIZE
+) -> int:
+    """Writes the per-player sums of every game of a season (or of the
+    whole archive) to ``path``; the format follows the file suffix."""
+    where, params = "", ()
+    if season_id is not None:
+        where, params = "Game.SeasonId = ?", (season_id,)
+
+    rows = SumPerPlayerView(database).iter_where(
+        where, params, "Game.Date, Game.ID, GamePlayers.Player", batch_size
+    )
+    return export(rows, path)
+
+
+def export_player_penalties(
+    database: Database,
+    path: str,
+    season_id: int = None,
+    batch_size: int = Database.ITER_BATCH_SIZE
+) -> int:
+    where, params = "", ()
+    if season_id is not None:
+        where = """GamePlayer IN (SELECT GamePlayers.ID
+                                  FROM GamePlayers
+                                  INNER JOIN Game
+                                  ON GamePlayers.Game = Game.ID
+                                  WHERE Game.SeasonId = ?)"""
+        params = (season_id,)
+
+    rows = PlayerPenaltiesTable(database).iter_where(
+        where, params, "GamePlayer, Penalty", batch_size
+    )
+    return export(rows, path)
+
+
+def export(rows: Iterator, path: str) -> int:
+    """Streams dataclass ``rows`` to ``path`` and returns how many were
+    written. The file is written next to the target and renamed when
+    complete, so an aborted export never leaves a truncated file behind.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Unsupported export format '{suffix}', "
+            f"expected one of {', '.join(EXPORT_FORMATS)}"
+        )
+
+    first = next(rows, None)
+    names = _field_names(first) if first is not None else []
+    records = _records(first, rows, names) if first is not None else iter(())
+
+    temporary_path = f"{path}.part"
+    try:
+        with open(temporary_path, "w", newline="", encoding="utf-8") as file:
+            if suffix == ".csv":
+                count = _write_csv(file, names, records)
+            else:
+                count = _write_jsonl(file, names, records)
+        os.replace(temporary_path, path)
+    except BaseException:
+        Path(temporary_path).unlink(missing_ok=True)
+        raise
+
+    return count
+
+
+def _field_names(row) -> list[str]:
+    # Navigation attributes hold related entities, not columns
+    return [
+        field.name for field in fields(row)
+        if not field.name.endswith("_navigation")
+    ]
+
+
+def _records(first, rest: Iterator, names: list[str]) -> Iterator[tuple]:
+    yield tuple(getattr(first, name) for name in names)
+    for row in rest:
+        yield tuple(getattr(row, name) for name in names)
+
+
+def _write_csv(file, names: list[str], records: Iterable[tuple]) -> int:
+    writer = csv.writer(file)
+    writer.writerow(names)
+    count = 0
+
+    for record in records:
+        writer.writerow(record)
+        count += 1
+
+    return count
+
+
+def _write_jsonl(file, names: list[str], records: Iterable[tuple]) -> int:
+    count = 0
+
+    for record in records:
+        file.write(json.dumps(dict(zip(names, record)), ensure_ascii=False))
+        file.write("\n")
+        count += 1
+
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Exports Kegelkasse data as CSV or JSON Lines."
+    )
+    parser.add_argument("database")
+    parser.add_argument("output", help="target file, .csv or .jsonl")
+    parser.add_argument(
+        "--data",
+        choices=("sum-per-player", "player-penalties"),
+        default="sum-per-player"
+    )
+    parser.add_argument("--season", type=int, help="season id, default: all")
+    arguments = parser.parse_args()
+
+    database = Database(arguments.database)
+    try:
+        exporter = (
+            export_sum_per_player if arguments.data == "sum-per-player"
+            else export_player_penalties
+        )
+        written = exporter(database, arguments.output, arguments.season)
+        print(f"{written} rows written to {arguments.output}")
+    finally:
+        database.close()
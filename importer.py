@@ -0,0 +1,465 @@
+import argparse
+import csv
+import json
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from database import Database
+from migrations import backfill_aggregates
+from reference_data import ReferenceDataCache
+
+CSV_GAME_COLUMNS = ("date", "opponent", "gameday", "season")
+CSV_PLAYER_COLUMNS = ("player", "full", "clear", "errors")
+# Tables whose triggers and indexes are rebuilt after a deferred import
+IMPORT_TABLES = ("Game", "GamePlayers", "PlayerPenalties")
+
+
+@dataclass(slots=True)
+class ImportedPlayer:
+    name: str
+    full: int
+    clear: int
+    errors: int
+    penalties: dict[str, int] = field(default_factory=dict)
+    line: int = 0
+
+
+@dataclass(slots=True)
+class ImportedGame:
+    date: str
+    opponent: str
+    gameday: int
+    season: str
+    players: list[ImportedPlayer] = field(default_factory=list)
+    line: int = 0
+
+
+@dataclass(slots=True)
+class ImportReport:
+    games: int
+    game_players: int
+    player_penalties: int
+    seconds: float
+
+    @property
+    def rows(self) -> int:
+        return self.games + self.game_players + self.player_penalties
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self.seconds if self.seconds else 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class ImportValidationError(ValueError):
+    def __init__(self, errors: list[str]):
+        super().__init__(f"{len(errors)} invalid records:\n" + "\n".join(errors))
+        self.errors = errors
+
+
+def read_csv(path: str) -> Iterator[ImportedGame]:
+    """One row per player and game; consecutive rows with the same date,
+    opponent, gameday and season form a game. Every further column is the
+    count of the penalty with that description."""
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.DictReader(file)
+        missing = set(CSV_GAME_COLUMNS + CSV_PLAYER_COLUMNS) - set(
+            reader.fieldnames or ()
+        )
+        if missing:
+            raise ImportValidationError(
+                [f"{path}: missing columns {', '.join(sorted(missing))}"]
+            )
+
+        penalty_columns = [
+            name for name in reader.fieldnames
+            if name not in CSV_GAME_COLUMNS + CSV_PLAYER_COLUMNS
+        ]
+        game = None
+
+        for line, row in enumerate(reader, start=2):
+            key = tuple(row[column] for column in CSV_GAME_COLUMNS)
+            if game is None or key != (
+                game.date, game.opponent, game.gameday, game.season
+            ):
+                if game is not None:
+                    yield game
+                game = ImportedGame(*key, line=line)
+
+            game.players.append(ImportedPlayer(
+                row["player"],
+                _to_int(row["full"]),
+                _to_int(row["clear"]),
+                _to_int(row["errors"]),
+                {
+                    name: _to_int(row[name]) for name in penalty_columns
+                    if row[name] not in ("", None)
+                },
+                line
+            ))
+
+        if game is not None:
+            yield game
+
+
+def read_json(path: str) -> Iterator[ImportedGame]:
+    """A list of games (.json) or one game per line (.jsonl), each like
+    {"date", "opponent", "gameday", "season",
+     "players": [{"name", "full", "clear", "errors", "penalties": {}}]}."""
+    with open(path, encoding="utf-8") as file:
+        if Path(path).suffix.lower() == ".jsonl":
+            records = (
+                (line, json.loads(text))
+                for line, text in enumerate(file, start=1) if text.strip()
+            )
+        else:
+            records = enumerate(json.load(file), start=1)
+
+        for line, record in records:
+            yield ImportedGame(
+                record.get("date"),
+                record.get("opponent"),
+                record.get("gameday"),
+                record.get("season"),
+                [
+                    ImportedPlayer(
+                        player.get("name"),
+                        player.get("full"),
+                        player.get("clear"),
+                        player.get("errors"),
+                        dict(player.get("penalties", {})),
+                        line
+                    )
+                    for player in record.get("players", [])
+                ],
+                line
+            )
+
+
+def read_file(path: str) -> Iterator[ImportedGame]:
+    suffix = Path(path).suffix.lower()
+
+    if suffix == ".csv":
+        return read_csv(path)
+    if suffix in (".json", ".jsonl"):
+        return read_json(path)
+
+    raise ValueError(
+        f"Unsupported import format '{suffix}', expected .csv, .json or .jsonl"
+    )
+
+
+def _to_int(value):
+    # Invalid numbers are reported by the validation, not while parsing
+    if isinstance(value, bool):
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _is_count(value) -> bool:
+    # bool is an int subclass, but true is no count of anything
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+class GameImporter:
+    """Validates imported games against the reference data and bulk inserts
+    them in one transaction.
+
+    With ``defer_maintenance`` the aggregate triggers and the indexes of the
+    imported tables are dropped for the load, then the indexes are rebuilt,
+    the aggregates back-filled for the new rows and the triggers restored -
+    all inside the same transaction, so a failed import leaves no trace.
+    By default this only happens from DEFER_THRESHOLD game players on, since
+    rebuilding the indexes costs more than it saves for a few games.
+    """
+    BATCH_SIZE = 5000
+    DEFER_THRESHOLD = 500
+
+    def __init__(
+        self,
+        database: Database,
+        team_id: int = 1,
+        defer_maintenance: bool | None = None
+    ):
+        self._database = database
+        self._team_id = team_id
+        self._defer_maintenance = defer_maintenance
+
+        reference_data = ReferenceDataCache(database)
+        self._teams = set(reference_data.teams)
+        self._players = {
+            self._key(p.name): p.id for p in reference_data.players.values()
+        }
+        self._seasons = {
+            self._key(s.name): s.id for s in reference_data.seasons.values()
+        }
+        self._penalties = {
+            self._key(p.description): p
+            for p in reference_data.penalties.values()
+        }
+
+    def import_file(self, path: str) -> ImportReport:
+        return self.import_games(read_file(path))
+
+    def import_games(self, games: Iterable[ImportedGame]) -> ImportReport:
+        start = time.perf_counter()
+        games = list(games)
+        self._validate(games)
+
+        with self._database.transaction():
+            first_game = self._next_id("Game")
+            first_game_player = self._next_id("GamePlayers")
+            game_rows, game_player_rows, penalty_rows = self._create_rows(
+                games, first_game, first_game_player
+            )
+
+            defer = self._defer_maintenance
+            if defer is None:
+                defer = len(game_player_rows) >= self.DEFER_THRESHOLD
+            deferred = self._drop_maintenance() if defer else []
+
+            self._insert(
+                """INSERT INTO Game (ID, Team, Date, Vs, Gameday, SeasonId)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                game_rows
+            )
+            self._insert(
+                """INSERT INTO GamePlayers (ID, Game, Player, Paid, Result,
+                                            "Full", Clear, Errors, Played)
+                   VALUES (?, ?, ?, 0, ?, ?, ?, ?, 1)""",
+                game_player_rows
+            )
+            self._insert(
+                """INSERT INTO PlayerPenalties (GamePlayer, Penalty, Value)
+                   VALUES (?, ?, ?)""",
+                penalty_rows
+            )
+
+            if defer:
+                self._restore_maintenance(
+                    deferred, first_game, first_game_player
+                )
+
+        return ImportReport(
+            len(game_rows),
+            len(game_player_rows),
+            len(penalty_rows),
+            time.perf_counter() - start
+        )
+
+    def _validate(self, games: list[ImportedGame]) -> None:
+        errors = []
+
+        # Games of an unknown team would vanish from every view, which
+        # joins Team
+        if isinstance(self._team_id, bool) or self._team_id not in self._teams:
+            errors.append(f"unknown team {self._team_id!r}")
+
+        for game in games:
+            where = f"line {game.line}"
+            try:
+                date.fromisoformat(str(game.date))
+            except ValueError:
+                errors.append(f"{where}: invalid date '{game.date}'")
+            if not str(game.opponent or "").strip():
+                errors.append(f"{where}: opponent is missing")
+            if not _is_count(_to_int(game.gameday)):
+                errors.append(f"{where}: invalid gameday '{game.gameday}'")
+            if self._key(game.season) not in self._seasons:
+                errors.append(f"{where}: unknown season '{game.season}'")
+            if not game.players:
+                errors.append(f"{where}: game without players")
+
+            names = [self._key(player.name) for player in game.players]
+            for name in {n for n in names if names.count(n) > 1}:
+                errors.append(f"{where}: player '{name}' listed twice")
+
+            for player in game.players:
+                errors.extend(self._validate_player(player))
+
+        if errors:
+            raise ImportValidationError(errors)
+
+    def _validate_player(self, player: ImportedPlayer) -> list[str]:
+        where = f"line {player.line}"
+        errors = []
+
+        if self._key(player.name) not in self._players:
+            errors.append(f"{where}: unknown player '{player.name}'")
+        for name in ("full", "clear", "errors"):
+            value = getattr(player, name)
+            if not _is_count(value):
+                errors.append(f"{where}: invalid {name} '{value}'")
+
+        for description, value in player.penalties.items():
+            penalty = self._penalties.get(self._key(description))
+            if penalty is None:
+                errors.append(f"{where}: unknown penalty '{description}'")
+            elif self._is_derived(penalty):
+                errors.append(
+                    f"{where}: penalty '{description}' is derived from the "
+                    "result or errors and must not be given"
+                )
+            elif not _is_count(value):
+                errors.append(
+                    f"{where}: invalid count '{value}' for '{description}'"
+                )
+
+        return errors
+
+    def _create_rows(
+        self,
+        games: list[ImportedGame],
+        game_id: int,
+        game_player_id: int
+    ) -> tuple[list[tuple], list[tuple], list[tuple]]:
+        game_rows, game_player_rows, penalty_rows = [], [], []
+        penalties = list(self._penalties.values())
+
+        for game in games:
+            game_rows.append((
+                game_id, self._team_id, str(game.date), game.opponent.strip(),
+                int(game.gameday), self._seasons[self._key(game.season)]
+            ))
+
+            for player in game.players:
+                result = player.full + player.clear
+                game_player_rows.append((
+                    game_player_id, game_id, self._players[self._key(player.name)],
+                    result, player.full, player.clear, player.errors
+                ))
+                counts = {
+                    self._key(name): value
+                    for name, value in player.penalties.items()
+                }
+                # Like save_game: every penalty of the catalog gets a row
+                penalty_rows.extend(
+                    (game_player_id, penalty.id,
+                     self._penalty_value(penalty, result, player.errors,
+                                         counts))
+                    for penalty in penalties
+                )
+                game_player_id += 1
+
+            game_id += 1
+
+        return game_rows, game_player_rows, penalty_rows
+
+    def _penalty_value(
+        self,
+        penalty,
+        result: int,
+        errors: int,
+        counts: dict[str, int]
+    ) -> int:
+        if penalty.type_navigation.is_range:
+            return result
+        if penalty.get_value_by_parent:
+            return errors
+        return counts.get(self._key(penalty.description), 0)
+
+    @staticmethod
+    def _is_derived(penalty) -> bool:
+        return penalty.type_navigation.is_range or bool(
+            penalty.get_value_by_parent
+        )
+
+    def _insert(self, sql: str, rows: list[tuple]) -> None:
+        for start in range(0, len(rows), self.BATCH_SIZE):
+            self._database.execute_many(sql, rows[start:start + self.BATCH_SIZE])
+
+    def _next_id(self, table: str) -> int:
+        # AUTOINCREMENT never reuses ids, so the sequence counts as well
+        row = self._database.execute_single_query(
+            f"""SELECT MAX(
+                    COALESCE((SELECT seq FROM sqlite_sequence
+                              WHERE name = ?), 0),
+                    COALESCE((SELECT MAX(ID) FROM {table}), 0))""",
+            (table,)
+        )
+        return row[0] + 1
+
+    def _drop_maintenance(self) -> list[tuple[str, str, str]]:
+        placeholders = ", ".join("?" * len(IMPORT_TABLES))
+        deferred = self._database.execute_query(
+            f"""SELECT type, name, sql FROM sqlite_master
+                WHERE type IN ('trigger', 'index') AND sql IS NOT NULL
+                AND tbl_name IN ({placeholders})""",
+            IMPORT_TABLES
+        )
+
+        for object_type, name, _ in deferred:
+            self._database.execute_command(f'DROP {object_type.upper()} "{name}"')
+
+        return deferred
+
+    def _restore_maintenance(
+        self,
+        deferred: list[tuple[str, str, str]],
+        first_game: int,
+        first_game_player: int
+    ) -> None:
+        # Indexes first, the back-fill queries rely on them
+        for object_type, _, sql in deferred:
+            if object_type == "index":
+                self._database.execute_command(sql)
+
+        params = {
+            "first_game": first_game,
+            "first_game_player": first_game_player
+        }
+        for statement in backfill_aggregates():
+            self._database.execute_command(
+                statement, params if ":" in statement else ()
+            )
+
+        for object_type, _, sql in deferred:
+            if object_type == "trigger":
+                self._database.execute_command(sql)
+
+    @staticmethod
+    def _key(name) -> str:
+        return " ".join(str(name or "").split()).casefold()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Imports historical score sheets (.csv, .json, .jsonl)."
+    )
+    parser.add_argument("database")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--team", type=int, default=1)
+    parser.add_argument(
+        "--keep-triggers",
+        action="store_true",
+        help="maintain aggregates and indexes row by row during the import"
+    )
+    arguments = parser.parse_args()
+
+    database = Database(arguments.database)
+    try:
+        importer = GameImporter(
+            database,
+            arguments.team,
+            False if arguments.keep_triggers else None
+        )
+        for path in arguments.files:
+            report = importer.import_file(path)
+            print(
+                f"{path}: {report.games} games, {report.game_players} players, "
+                f"{report.player_penalties} penalties in "
+                f"{report.seconds:.2f} s ({report.games_per_second:.0f} "
+                f"games/s, {report.rows_per_second:.0f} rows/s)"
+            )
+    except ImportValidationError as error:
+        raise SystemExit(str(error))
+    finally:
+        database.close()
@@ -0,0 +1,692 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import re
+from dataclasses import asdict
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+from calculators import PenaltyCalculator
+from clubs import Club
+from entities import Game, GamePlayers, Penalty
+from model import AsyncMainWindowModel, GamePlayerEdit
+
+# Standard library only: the server runs on the qasync loop of the GUI and
+# must not pull in a web framework with its own event loop.
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+logger = logging.getLogger(__name__)
+
+
+def is_loopback_host(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        # A host name, which may resolve to any interface
+        return False
+
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str = None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class _Request:
+    __slots__ = ("method", "path", "query", "headers", "body")
+
+    def __init__(
+        self,
+        method: str,
+        target: str,
+        headers: dict[str, str],
+        body: bytes
+    ):
+        url = urlsplit(target)
+        self.method = method
+        self.path = url.path.rstrip("/") or "/"
+        self.query = parse_qs(url.query)
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+    def json(self) -> dict:
+        try:
+            payload = json.loads(self.body)
+        except ValueError as error:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {error}")
+        if not isinstance(payload, dict):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Expected a JSON object")
+        return payload
+
+
+class EditBatcher:
+    """Coalesces game player edits into few write transactions.
+
+    Edits arriving within ``delay`` seconds, or while the previous batch is
+    being written, are applied together, one transaction per club; several
+    edits of the same game player are merged, the later values winning.
+    Every edit is written to the club it was submitted for, even if the
+    window switched clubs in the meantime. Each caller gets the result for
+    its own game player.
+    """
+    DELAY_SECONDS = 0.05
+
+    def __init__(self, model: AsyncMainWindowModel, delay: float = DELAY_SECONDS):
+        self._model = model
+        self._delay = delay
+        self._pending: dict[
+            tuple[str, int, int], tuple[GamePlayerEdit, list[asyncio.Future]]
+        ] = {}
+        self._task: asyncio.Task | None = None
+
+    def submit(self, club: str, edit: GamePlayerEdit) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        key = (club, edit.game_id, edit.player_id)
+
+        pending = self._pending.get(key)
+        if pending is None:
+            self._pending[key] = (edit, [future])
+        else:
+            pending[0].merge(edit)
+            pending[1].append(future)
+
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._flush())
+        return future
+
+    async def close(self) -> None:
+        if self._task is not None:
+            await self._task
+
+    async def _flush(self) -> None:
+        try:
+            while self._pending:
+                await asyncio.sleep(self._delay)
+                batch, self._pending = self._pending, {}
+
+                per_club: dict[str, list] = {}
+                for (club, _, _), pending in batch.items():
+                    per_club.setdefault(club, []).append(pending)
+                for club, pending in per_club.items():
+                    await self._write(club, pending)
+        finally:
+            self._task = None
+
+    async def _write(
+        self,
+        club: str,
+        pending: list[tuple[GamePlayerEdit, list[asyncio.Future]]]
+    ) -> None:
+        try:
+            results = await self._model.apply_game_player_edits(
+                [edit for edit, _ in pending], club
+            )
+        except Exception as error:
+            for _, futures in pending:
+                _resolve(futures, exception=error)
+            return
+
+        for (_, futures), result in zip(pending, results):
+            _resolve(futures, result)
+
+
+def _resolve(
+    futures: list[asyncio.Future],
+    result=None,
+    exception: Exception = None
+) -> None:
+    for future in futures:
+        # The client may have disconnected in the meantime
+        if future.done():
+            continue
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+
+class LiveScoringServer:
+    """JSON over HTTP/1.1 and WebSocket pushes for entering scores and
+    fines from phones at the lane.
+
+    Serves the club that is currently open in the window; games and game
+    players name it as ``club``, and a request that overlapped a club
+    switch is answered with 409 Conflict, except for a PATCH that was
+    already accepted:
+
+    ``GET /api/games/last``, ``GET /api/games/{id}``
+        a game with its per-player sums, result and penalty sum
+    ``GET /api/penalties``
+        the penalties with their amounts
+    ``GET /api/games/{id}/players/{player_id}``
+        a game player with the recorded penalties
+    ``PATCH /api/games/{id}/players/{player_id}``
+        ``{"club", "full", "clear", "errors", "penalties": {penalty_id:
+        value}}``; ``club`` is required and has to be the club the client
+        was shown, the other keys are optional. Range penalties and the
+        penalty counted from the errors follow like in the edit dialog
+    ``GET /ws``
+        WebSocket receiving ``{"type": "games_changed", ...}`` after every
+        save, from the window and from the clients
+
+    Edits go through an EditBatcher, so a whole team typing at once costs
+    a few transactions on the one writer connection instead of one each.
+    With a ``token`` every request needs ``Authorization: Bearer <token>``
+    or, for browsers opening a WebSocket, ``?token=<token>``; a server
+    reachable from the network cannot be started without one.
+    """
+    MAX_BODY_SIZE = 64 * 1024
+    MAX_HEADERS = 64
+    KEEP_ALIVE_TIMEOUT_SECONDS = 30.0
+    MAX_PUSH_BUFFER = 256 * 1024
+
+    _ROUTES = [
+        ("GET", re.compile(r"/api/games/last"), "_get_last_game"),
+        ("GET", re.compile(r"/api/games/(\d+)"), "_get_game"),
+        ("GET", re.compile(r"/api/penalties"), "_get_penalties"),
+        (
+            "GET",
+            re.compile(r"/api/games/(\d+)/players/(\d+)"),
+            "_get_game_player"
+        ),
+        (
+            "PATCH",
+            re.compile(r"/api/games/(\d+)/players/(\d+)"),
+            "_patch_game_player"
+        ),
+    ]
+
+    def __init__(
+        self,
+        model: AsyncMainWindowModel,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        token: str = None
+    ):
+        if token is None and not is_loopback_host(host):
+            raise ValueError(
+                f"A live scoring server on '{host}' can be reached from the "
+                "network and needs a token"
+            )
+
+        self._model = model
+        self._host = host
+        self._port = port
+        self._token = token
+        self._batcher = EditBatcher(model)
+        self._server: asyncio.Server | None = None
+        self._clients: set[asyncio.StreamWriter] = set()
+        self._connections: dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    @property
+    def port(self) -> int:
+        """The bound port, also when started with port 0."""
+        if self._server is None:
+            return self._port
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(
+            self._handle_connection, self._host, self._port
+        )
+        self._model.add_change_listener(self._games_changed)
+
+    async def close(self) -> None:
+        if self._server is None:
+            return
+
+        self._model.remove_change_listener(self._games_changed)
+        self._server.close()
+        # Edits already accepted are still written
+        await self._batcher.close()
+
+        for client in list(self._clients):
+            client.write(_frame(0x8, (1001).to_bytes(2, "big")))
+        # Closing the transports ends every connection at its next read
+        for writer in list(self._connections.values()):
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(
+                        self._read_request(reader),
+                        self.KEEP_ALIVE_TIMEOUT_SECONDS
+                    )
+                except HttpError as error:
+                    writer.write(_response(
+                        error.status, {"error": str(error)}, False
+                    ))
+                    break
+                if request is None:
+                    break
+
+                if request.path == "/ws":
+                    await self._websocket(request, reader, writer)
+                    break
+
+                status, payload = await self._dispatch(request)
+                writer.write(_response(status, payload, request.keep_alive))
+                await writer.drain()
+                if not request.keep_alive:
+                    break
+        except (
+            asyncio.TimeoutError,
+            asyncio.IncompleteReadError,
+            ConnectionError
+        ):
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+    async def _read_request(
+        self,
+        reader: asyncio.StreamReader
+    ) -> _Request | None:
+        try:
+            line = await reader.readline()
+            if not line:
+                return None
+
+            parts = line.decode("latin-1").split()
+            if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+                raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid request line")
+            method, target, version = parts
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                if len(headers) >= self.MAX_HEADERS:
+                    raise HttpError(
+                        HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE
+                    )
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+        except ValueError:
+            # StreamReader.readline raises it for overlong lines
+            raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+
+        if version == "HTTP/1.0" and "connection" not in headers:
+            headers["connection"] = "close"
+        if "transfer-encoding" in headers:
+            raise HttpError(
+                HTTPStatus.LENGTH_REQUIRED, "Chunked bodies are not supported"
+            )
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if not 0 <= length <= self.MAX_BODY_SIZE:
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+
+        body = await reader.readexactly(length)
+        return _Request(method.upper(), target, headers, body)
+
+    async def _dispatch(self, request: _Request) -> tuple[HTTPStatus, object]:
+        try:
+            self._authorize(request)
+
+            path_found = False
+            for method, pattern, handler in self._ROUTES:
+                match = pattern.fullmatch(request.path)
+                if match is None:
+                    continue
+                path_found = True
+                if method == request.method:
+                    arguments = [int(group) for group in match.groups()]
+                    club = self._model.current_club.name
+                    payload = await getattr(self, handler)(request, *arguments)
+                    if method == "GET":
+                        # The answer must not mix data of two clubs
+                        self._check_club(club)
+                    return HTTPStatus.OK, payload
+
+            if path_found:
+                raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED)
+            raise HttpError(HTTPStatus.NOT_FOUND)
+        except HttpError as error:
+            return error.status, {"error": str(error)}
+        except Exception:
+            # E.g. "database is locked" after the busy timeout; the client
+            # gets an answer it can retry instead of a dropped connection
+            logger.exception("%s %s failed", request.method, request.path)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {
+                "error": HTTPStatus.INTERNAL_SERVER_ERROR.phrase
+            }
+
+    def _check_club(self, club: str) -> None:
+        if club != self._model.current_club.name:
+            raise HttpError(
+                HTTPStatus.CONFLICT,
+                f"The window switched from club '{club}' to "
+                f"'{self._model.current_club.name}', please reload"
+            )
+
+    def _authorize(self, request: _Request) -> None:
+        if self._token is None:
+            return
+
+        token = request.query.get("token", [""])[0]
+        authorization = request.headers.get("authorization", "")
+        if authorization.startswith("Bearer "):
+            token = authorization[len("Bearer "):]
+
+        if not hmac.compare_digest(token.encode(), self._token.encode()):
+            raise HttpError(HTTPStatus.UNAUTHORIZED)
+
+    async def _get_last_game(self, request: _Request) -> dict:
+        game = await self._model.get_last_game()
+        if game is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, "The club has no games")
+        return await self._game_payload(game)
+
+    async def _get_game(self, request: _Request, game_id: int) -> dict:
+        game = await self._model.get_game(game_id)
+        if game is None:
+            raise HttpError(
+                HTTPStatus.NOT_FOUND, f"Game {game_id} does not exist"
+            )
+        return await self._game_payload(game)
+
+    async def _game_payload(self, game: Game) -> dict:
+        snapshot = await self._model.get_game_snapshot(game.id)
+        return {
+            "club": self._model.current_club.name,
+            "game": _game_json(game),
+            "players": [asdict(row) for row in snapshot.sum_per_player],
+            "result": asdict(snapshot.result) if snapshot.result else None,
+            "penalty_sum": (
+                snapshot.penalty_sum.penalty_sum
+                if snapshot.penalty_sum else 0.0
+            ),
+        }
+
+    async def _get_penalties(self, request: _Request) -> list[dict]:
+        penalties = await self._model.get_penalties()
+        calculator = await self._model.get_penalty_calculator()
+        return [_penalty_json(p, calculator) for p in penalties]
+
+    async def _get_game_player(
+        self,
+        request: _Request,
+        game_id: int,
+        player_id: int
+    ) -> dict:
+        game_player = await self._model.get_game_player_with_penalties(
+            game_id, player_id
+        )
+        if game_player is None:
+            raise HttpError(
+                HTTPStatus.NOT_FOUND,
+                f"Player {player_id} did not play game {game_id}"
+            )
+        calculator = await self._model.get_penalty_calculator()
+        return _game_player_json(
+            self._model.current_club.name, game_player, calculator
+        )
+
+    async def _patch_game_player(
+        self,
+        request: _Request,
+        game_id: int,
+        player_id: int
+    ) -> dict:
+        payload = request.json()
+        club = payload.pop("club", None)
+        if not isinstance(club, str):
+            raise HttpError(
+                HTTPStatus.BAD_REQUEST,
+                "club must name the club the game was loaded from"
+            )
+        edit = self._parse_edit(payload, game_id, player_id)
+
+        # Checked when the edit is accepted; the batcher then writes it to
+        # this club whatever the window shows by the time it is flushed
+        self._check_club(club)
+        result = await self._batcher.submit(club, edit)
+
+        if isinstance(result, LookupError):
+            raise HttpError(HTTPStatus.NOT_FOUND, str(result))
+        if isinstance(result, ValueError):
+            raise HttpError(HTTPStatus.BAD_REQUEST, str(result))
+
+        calculator = await self._model.get_penalty_calculator(club)
+        return _game_player_json(club, result, calculator)
+
+    @staticmethod
+    def _parse_edit(
+        payload: dict,
+        game_id: int,
+        player_id: int
+    ) -> GamePlayerEdit:
+        unknown = set(payload) - {"full", "clear", "errors", "penalties"}
+        if unknown:
+            raise HttpError(
+                HTTPStatus.BAD_REQUEST, f"Unknown fields {sorted(unknown)}"
+            )
+
+        penalties = payload.get("penalties", {})
+        if not isinstance(penalties, dict):
+            raise HttpError(
+                HTTPStatus.BAD_REQUEST, "penalties must be a JSON object"
+            )
+        try:
+            penalties = {int(key): value for key, value in penalties.items()}
+        except ValueError:
+            raise HttpError(
+                HTTPStatus.BAD_REQUEST, "penalties must be keyed by penalty id"
+            )
+
+        edit = GamePlayerEdit(
+            game_id,
+            player_id,
+            payload.get("full"),
+            payload.get("clear"),
+            payload.get("errors"),
+            penalties
+        )
+
+        # Rejected here so that an invalid edit is never merged with the
+        # valid edit of another client
+        for value in (edit.full, edit.clear, edit.errors, *penalties.values()):
+            if value is not None and (type(value) is not int or value < 0):
+                raise HttpError(
+                    HTTPStatus.BAD_REQUEST, f"Invalid value {value!r}"
+                )
+
+        return edit
+
+    async def _websocket(
+        self,
+        request: _Request,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            self._authorize(request)
+            key = request.headers.get("sec-websocket-key")
+            if (
+                request.method != "GET"
+                or request.headers.get("upgrade", "").lower() != "websocket"
+                or key is None
+            ):
+                raise HttpError(
+                    HTTPStatus.BAD_REQUEST, "Expected a WebSocket upgrade"
+                )
+        except HttpError as error:
+            writer.write(_response(error.status, {"error": str(error)}, False))
+            return
+
+        accept = base64.b64encode(
+            hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()
+        ).decode()
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+        writer.write(_text_frame({
+            "type": "hello", "club": self._model.current_club.name
+        }))
+        await writer.drain()
+
+        self._clients.add(writer)
+        try:
+            await self._read_frames(reader, writer)
+        finally:
+            self._clients.discard(writer)
+
+    async def _read_frames(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        # Clients only listen; their data frames are read and dropped
+        while True:
+            first, second = await reader.readexactly(2)
+            opcode = first & 0x0F
+            length = second & 0x7F
+            if length == 126:
+                length = int.from_bytes(await reader.readexactly(2), "big")
+            elif length == 127:
+                length = int.from_bytes(await reader.readexactly(8), "big")
+
+            if not second & 0x80 or length > self.MAX_BODY_SIZE:
+                # Unmasked client frames are a protocol error (1002)
+                code = 1002 if not second & 0x80 else 1009
+                writer.write(_frame(0x8, code.to_bytes(2, "big")))
+                return
+
+            mask = await reader.readexactly(4)
+            payload = bytes(
+                byte ^ mask[index % 4]
+                for index, byte in enumerate(await reader.readexactly(length))
+            )
+
+            if opcode == 0x8:
+                writer.write(_frame(0x8, payload[:2]))
+                await writer.drain()
+                return
+            if opcode == 0x9:
+                writer.write(_frame(0xA, payload))
+                await writer.drain()
+
+    def _games_changed(self, club: Club, game_ids: set[int]) -> None:
+        if not self._clients:
+            return
+
+        frame = _text_frame({
+            "type": "games_changed",
+            "club": club.name,
+            "game_ids": sorted(game_ids),
+        })
+        for client in list(self._clients):
+            # Never wait for a phone; one that stopped reading is dropped
+            if client.transport.get_write_buffer_size() > self.MAX_PUSH_BUFFER:
+                self._clients.discard(client)
+                client.close()
+            else:
+                client.write(frame)
+
+
+def _response(status: HTTPStatus, payload, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Cache-Control: no-store\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+def _frame(opcode: int, payload: bytes) -> bytes:
+    length = len(payload)
+    if length < 126:
+        header = bytes([0x80 | opcode, length])
+    elif length < 1 << 16:
+        header = bytes([0x80 | opcode, 126]) + length.to_bytes(2, "big")
+    else:
+        header = bytes([0x80 | opcode, 127]) + length.to_bytes(8, "big")
+    return header + payload
+
+
+def _text_frame(message: dict) -> bytes:
+    return _frame(0x1, json.dumps(message, ensure_ascii=False).encode("utf-8"))
+
+
+def _game_json(game: Game) -> dict:
+    return {
+        "id": game.id,
+        "team": game.team,
+        "date": game.date,
+        "opponent": game.vs,
+        "gameday": game.gameday,
+        "season_id": game.season_id,
+    }
+
+
+def _penalty_json(penalty: Penalty, calculator: PenaltyCalculator) -> dict:
+    return {
+        "id": penalty.id,
+        "description": penalty.description,
+        "amount": penalty.penalty,
+        "lower_limit": penalty.lower_limit,
+        "upper_limit": penalty.upper_limit,
+        "is_range": calculator.is_range(penalty.id),
+        "get_value_by_parent": bool(penalty.get_value_by_parent),
+    }
+
+
+def _game_player_json(
+    club: str,
+    game_player: GamePlayers,
+    calculator: PenaltyCalculator
+) -> dict:
+    penalties = [
+        {
+            "penalty": pp.penalty,
+            "description": pp.penalty_navigation.description,
+            "value": pp.value,
+            "amount": calculator.calculate_penalty(pp.penalty, pp.value),
+        }
+        for pp in game_player.player_penalties_navigation
+    ]
+    return {
+        "club": club,
+        "id": game_player.id,
+        "game": game_player.game,
+        "player": game_player.player,
+        "full": game_player.full,
+        "clear": game_player.clear,
+        "total": game_player.full + game_player.clear,
+        "errors": game_player.errors,
+        "penalties": penalties,
+        "penalty_sum": round(sum(p["amount"] for p in penalties), 2),
+    }
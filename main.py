@@ -1,15 +1,95 @@
+import argparse
+import secrets
 import sys
-import main_window
-from PySide6.QtWidgets import QApplication
-from qt_material import apply_stylesheet
-from model import MainWindowModel
-from qasync import QEventLoop
+from startup_profile import StartupProfile
 
-if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    loop = QEventLoop(app)   
-    model = MainWindowModel('Kegelkasse.db')
-    window = main_window.MainWindow(model)
+
+def parse_arguments() -> tuple[argparse.Namespace, list[str]]:
+    parser = argparse.ArgumentParser(prog="kegelkasse")
+    parser.add_argument(
+        "--live-port", type=int,
+        help="serve live scoring for phones on this port"
+    )
+    parser.add_argument("--live-host", default="0.0.0.0")
+    parser.add_argument(
+        "--live-token",
+        help="token the live scoring clients have to send, generated and "
+             "shown in the status bar if the host is reachable from the "
+             "network"
+    )
+    parser.add_argument(
+        "--profile-startup", action="store_true",
+        help="print how long each phase of the start took"
+    )
+    # Everything else is left to Qt, e.g. -platform
+    return parser.parse_known_args()
+
+
+def main() -> int:
+    profile = StartupProfile()
+    arguments, qt_arguments = parse_arguments()
+
+    # Imported here so the profile covers them
+    import asyncio
+    from PySide6.QtWidgets import QApplication
+    from qasync import QEventLoop
+    from main_window import MainWindow
+    from clubs import load_clubs
+    from model import AsyncMainWindowModel
+    from stylesheet import apply_cached_stylesheet
+    profile.mark("imports")
+
+    app = QApplication(sys.argv[:1] + qt_arguments)
+    app.setApplicationName("Kegelkasse")
+    loop = QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    model = AsyncMainWindowModel(load_clubs())
+    profile.mark("application")
+
+    # Styled before the first show, so the window never repaints unstyled
+    apply_cached_stylesheet(app)
+    profile.mark("stylesheet")
+
+    window = MainWindow(model)
+    profile.mark("main window")
+
+    if arguments.profile_startup:
+        def report_startup():
+            profile.mark("first data")
+            print(profile.report())
+
+        window.loaded.connect(lambda: profile.mark("first paint"))
+        window.ready.connect(report_startup)
     window.show()
-    apply_stylesheet(app, "light_blue.xml", invert_secondary=False)
-    app.exec()
+
+    live_server = None
+    if arguments.live_port is not None:
+        # Imported only here: without --live-port nothing of it is loaded
+        from PySide6.QtWidgets import QLabel
+        from live_server import LiveScoringServer, is_loopback_host
+
+        token = arguments.live_token
+        if token is None and not is_loopback_host(arguments.live_host):
+            # Nobody else on the venue Wi-Fi may write scores and fines
+            token = secrets.token_urlsafe(9)
+
+        live_server = LiveScoringServer(
+            model, arguments.live_host, arguments.live_port, token
+        )
+        loop.run_until_complete(live_server.start())
+
+        status = f"Live-Erfassung auf Port {live_server.port}"
+        status += f", Token: {token}" if token else " (nur lokal)"
+        window.ui.statusbar.addPermanentWidget(QLabel(status))
+
+    with loop:
+        loop.run_forever()
+        if live_server is not None:
+            loop.run_until_complete(live_server.close())
+
+    model.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,17 +1,29 @@
-from PySide6.QtCore import Signal
+from PySide6.QtCore import QTimer, Signal
+from PySide6.QtGui import QKeySequence, QShortcut
 from PySide6.QtWidgets import QMainWindow
 from ui_maindow import Ui_MainWindow
-from controller import MainWindowController, MainWindowModel
+from controller import MainWindowController, AsyncMainWindowModel
 
 
 class MainWindow(QMainWindow):
     loaded = Signal()
+    # Emitted once the first game is on screen
+    ready = Signal()
       
-    def __init__(self, model: MainWindowModel):
+    def __init__(self, model: AsyncMainWindowModel):
         super().__init__()
         
         self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
+
+        # Filled by the controller, one checkable entry per club
+        self.club_menu = self.ui.menuBar.addMenu("Verein")
+        statistics_menu = self.ui.menuBar.addMenu("Statistik")
+        self.season_statistics_action = statistics_menu.addAction(
+            "Saisonstatistik"
+        )
+        # Not in any menu: opens the query statistics for troubleshooting
+        self.debug_shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
         
         self.controller = MainWindowController(model, self)
         
@@ -21,6 +33,7 @@ class MainWindow(QMainWindow):
         super().showEvent(event)   
         
         if not self._initialized: 
-            self.loaded.emit()
+            # Queued so the empty window paints before the first load
+            QTimer.singleShot(0, self.loaded.emit)
             self._initialized = True
             print("Main window shown")
\ No newline at end of file
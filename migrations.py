@@ -0,0 +1,516 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    statements: tuple[str, ...]
+
+
+# Player and game totals are recomputed from their (small, indexed) source
+# rows so they never drift; team totals span the whole history and are
+# therefore maintained by deltas, rounded to cents.
+def _player_penalty_sum(game_player: str) -> str:
+    """The fine of one game player under the current rules. Every totals
+    path uses this expression, so it matches RangeCalculator: a range
+    penalty charges its flat amount when the value lies within
+    [LowerLimit, UpperLimit] and only if no other covering tier sorts
+    before it by RangeCalculator.narrowness. A value of 0 means "not
+    recorded"."""
+    return _range_aware_penalty_sum(
+        game_player,
+        f"""AND NOT EXISTS (
+                SELECT 1 FROM Penalty o
+                INNER JOIN PenaltyKind ok ON o.PenaltyTypeId = ok.ID
+                WHERE ok.IsRange AND o.ID <> p.ID
+                AND pp.Value >= COALESCE(o.LowerLimit, pp.Value)
+                AND pp.Value <= COALESCE(o.UpperLimit, pp.Value)
+                AND {_sorts_before("o", "p")})"""
+    )
+
+
+def _legacy_player_penalty_sum(
+    game_player: str,
+    range_aware: bool = False
+) -> str:
+    # Frozen rules of migrations 4 (no ranges) and 5 (overlapping tiers
+    # summed); nothing else may use them.
+    if not range_aware:
+        return f"""(SELECT COALESCE(SUM(pp.Value * p.penalty), 0)
+                    FROM PlayerPenalties pp
+                    INNER JOIN Penalty p ON pp.Penalty = p.ID
+                    WHERE pp.GamePlayer = {game_player})"""
+
+    return _range_aware_penalty_sum(game_player, "")
+
+
+def _range_aware_penalty_sum(game_player: str, tier_rule: str) -> str:
+    return f"""(SELECT COALESCE(SUM(
+                    CASE WHEN k.IsRange THEN
+                        CASE WHEN pp.Value > 0
+                              AND pp.Value >= COALESCE(p.LowerLimit, pp.Value)
+                              AND pp.Value <= COALESCE(p.UpperLimit, pp.Value)
+                              {tier_rule}
+                             THEN p.penalty ELSE 0 END
+                    ELSE pp.Value * p.penalty END), 0)
+                FROM PlayerPenalties pp
+                INNER JOIN Penalty p ON pp.Penalty = p.ID
+                INNER JOIN PenaltyKind k ON p.PenaltyTypeId = k.ID
+                WHERE pp.GamePlayer = {game_player})"""
+
+
+def _sorts_before(tier: str, other: str) -> str:
+    # Row value form of RangeCalculator.narrowness: the lower limits swap
+    # sides so that the higher one sorts first.
+    highest, lowest = 9223372036854775807, -9223372036854775807
+    return f"""(COALESCE({tier}.UpperLimit, {highest}),
+                COALESCE({other}.LowerLimit, {lowest}), {tier}.ID)
+               < (COALESCE({other}.UpperLimit, {highest}),
+                  COALESCE({tier}.LowerLimit, {lowest}), {other}.ID)"""
+
+
+# Tables cached by ReferenceDataCache; any write to them bumps
+# CatalogVersion, so the cache can ignore commits that only touch games.
+CATALOG_TABLES = ("PenaltyKind", "Penalty", "Player", "Seasons", "Team")
+
+
+def _catalog_version_triggers() -> tuple[str, ...]:
+    return tuple(
+        f"""CREATE TRIGGER TR_{table}_{event.title()}_CatalogVersion
+            AFTER {event} ON {table}
+            BEGIN
+                UPDATE CatalogVersion SET Version = Version + 1;
+            END"""
+        for table in CATALOG_TABLES
+        for event in ("INSERT", "UPDATE", "DELETE")
+    )
+
+
+def _refresh_player_totals(game_player: str) -> str:
+    return f"""UPDATE PlayerTotals
+               SET PenaltySum = {_player_penalty_sum(game_player)}
+               WHERE GamePlayer = {game_player};"""
+
+
+def _refresh_legacy_player_totals(
+    game_player: str,
+    range_aware: bool = False
+) -> str:
+    penalty_sum = _legacy_player_penalty_sum(game_player, range_aware)
+    return f"""UPDATE PlayerTotals
+               SET PenaltySum = {penalty_sum}
+               WHERE GamePlayer = {game_player};"""
+
+
+# The penalty's own rows, plus every range row if it is or was a tier
+_PENALTY_OR_TIER_CHANGED = """pp.Penalty = NEW.ID OR k.IsRange AND EXISTS (
+                                  SELECT 1 FROM PenaltyKind
+                                  WHERE ID IN (OLD.PenaltyTypeId,
+                                               NEW.PenaltyTypeId)
+                                  AND IsRange)"""
+
+
+def _refresh_tiered_totals(where: str) -> str:
+    return f"""UPDATE PlayerTotals
+               SET PenaltySum = {_player_penalty_sum(
+                   "PlayerTotals.GamePlayer"
+               )}
+               WHERE GamePlayer IN (
+                   SELECT pp.GamePlayer FROM PlayerPenalties pp
+                   INNER JOIN Penalty p ON pp.Penalty = p.ID
+                   INNER JOIN PenaltyKind k ON p.PenaltyTypeId = k.ID
+                   WHERE {where});"""
+
+
+def _refresh_game_penalty_sum(game: str) -> str:
+    return f"""UPDATE GameTotals
+               SET PenaltySum = (
+                   SELECT COALESCE(SUM(pt.PenaltySum), 0)
+                   FROM GamePlayers gp
+                   INNER JOIN PlayerTotals pt ON pt.GamePlayer = gp.ID
+                   WHERE gp.Game = {game})
+               WHERE Game = {game};"""
+
+
+def _refresh_game_results(game: str) -> str:
+    return f"""UPDATE GameTotals
+               SET (TotalFull, TotalClear, TotalResult, TotalErrors) = (
+                   SELECT COALESCE(SUM("Full"), 0),
+                          COALESCE(SUM(Clear), 0),
+                          COALESCE(SUM("Full" + Clear), 0),
+                          COALESCE(SUM(Errors), 0)
+                   FROM GamePlayers
+                   WHERE Game = {game})
+               WHERE Game = {game};"""
+
+
+def backfill_aggregates() -> tuple[str, ...]:
+    """Statements that fill the aggregate tables for every game and game
+    player with an ID of at least the bound ``first_game`` and
+    ``first_game_player``. Used by bulk loads that run with the maintenance
+    triggers dropped; team totals are recomputed as a whole."""
+    return (
+        f"""INSERT INTO PlayerTotals (GamePlayer, PenaltySum)
+            SELECT gp.ID, {_player_penalty_sum("gp.ID")}
+            FROM GamePlayers gp
+            WHERE gp.ID >= :first_game_player""",
+        """INSERT INTO GameTotals
+               (Game, PenaltySum, TotalFull, TotalClear,
+                TotalResult, TotalErrors)
+           SELECT g.ID,
+                  COALESCE(SUM(pt.PenaltySum), 0),
+                  COALESCE(SUM(gp."Full"), 0),
+                  COALESCE(SUM(gp.Clear), 0),
+                  COALESCE(SUM(gp."Full" + gp.Clear), 0),
+                  COALESCE(SUM(gp.Errors), 0)
+           FROM Game g
+           LEFT JOIN GamePlayers gp ON gp.Game = g.ID
+           LEFT JOIN PlayerTotals pt ON pt.GamePlayer = gp.ID
+           WHERE g.ID >= :first_game
+           GROUP BY g.ID""",
+        """UPDATE TeamTotals
+           SET PenaltySum = ROUND((
+               SELECT COALESCE(SUM(gt.PenaltySum), 0)
+               FROM Game g
+               INNER JOIN GameTotals gt ON gt.Game = g.ID
+               WHERE g.Team = TeamTotals.Team), 2)""",
+    )
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(
+        1,
+        "Index GamePlayers by game and player",
+        (
+            """CREATE INDEX IF NOT EXISTS IX_GamePlayers_Game_Player
+               ON GamePlayers (Game, Player)""",
+        )
+    ),
+    Migration(
+        2,
+        "Covering index for the penalties of a game player",
+        (
+            """CREATE INDEX IF NOT EXISTS IX_PlayerPenalties_GamePlayer_Penalty
+               ON PlayerPenalties (GamePlayer, Penalty, Value)""",
+        )
+    ),
+    Migration(
+        3,
+        "Index games by season and date",
+        (
+            """CREATE INDEX IF NOT EXISTS IX_Game_SeasonId_Date
+               ON Game (SeasonId, Date)""",
+        )
+    ),
+    Migration(
+        4,
+        "Aggregate tables maintained by triggers",
+        (
+            """CREATE TABLE PlayerTotals (
+                   GamePlayer INTEGER PRIMARY KEY
+                       REFERENCES GamePlayers (ID) ON DELETE CASCADE,
+                   PenaltySum NUMERIC NOT NULL DEFAULT 0)""",
+            """CREATE TABLE GameTotals (
+                   Game INTEGER PRIMARY KEY
+                       REFERENCES Game (ID) ON DELETE CASCADE,
+                   PenaltySum NUMERIC NOT NULL DEFAULT 0,
+                   TotalFull INTEGER NOT NULL DEFAULT 0,
+                   TotalClear INTEGER NOT NULL DEFAULT 0,
+                   TotalResult INTEGER NOT NULL DEFAULT 0,
+                   TotalErrors INTEGER NOT NULL DEFAULT 0)""",
+            """CREATE TABLE TeamTotals (
+                   Team INTEGER PRIMARY KEY
+                       REFERENCES Team (ID) ON DELETE CASCADE,
+                   PenaltySum NUMERIC NOT NULL DEFAULT 0)""",
+            """INSERT INTO PlayerTotals (GamePlayer, PenaltySum)
+               SELECT gp.ID, COALESCE(SUM(pp.Value * p.penalty), 0)
+               FROM GamePlayers gp
+               LEFT JOIN PlayerPenalties pp ON pp.GamePlayer = gp.ID
+               LEFT JOIN Penalty p ON pp.Penalty = p.ID
+               GROUP BY gp.ID""",
+            """INSERT INTO GameTotals
+                   (Game, PenaltySum, TotalFull, TotalClear,
+                    TotalResult, TotalErrors)
+               SELECT g.ID,
+                      COALESCE(SUM(pt.PenaltySum), 0),
+                      COALESCE(SUM(gp."Full"), 0),
+                      COALESCE(SUM(gp.Clear), 0),
+                      COALESCE(SUM(gp."Full" + gp.Clear), 0),
+                      COALESCE(SUM(gp.Errors), 0)
+               FROM Game g
+               LEFT JOIN GamePlayers gp ON gp.Game = g.ID
+               LEFT JOIN PlayerTotals pt ON pt.GamePlayer = gp.ID
+               GROUP BY g.ID""",
+            """INSERT INTO TeamTotals (Team, PenaltySum)
+               SELECT t.ID, COALESCE(SUM(gt.PenaltySum), 0)
+               FROM Team t
+               LEFT JOIN Game g ON g.Team = t.ID
+               LEFT JOIN GameTotals gt ON gt.Game = g.ID
+               GROUP BY t.ID""",
+            """CREATE TRIGGER TR_Team_Insert AFTER INSERT ON Team
+               BEGIN
+                   INSERT OR IGNORE INTO TeamTotals (Team) VALUES (NEW.ID);
+               END""",
+            """CREATE TRIGGER TR_Team_Delete AFTER DELETE ON Team
+               BEGIN
+                   DELETE FROM TeamTotals WHERE Team = OLD.ID;
+               END""",
+            """CREATE TRIGGER TR_Game_Insert AFTER INSERT ON Game
+               BEGIN
+                   INSERT OR IGNORE INTO GameTotals (Game) VALUES (NEW.ID);
+                   INSERT OR IGNORE INTO TeamTotals (Team) VALUES (NEW.Team);
+               END""",
+            """CREATE TRIGGER TR_Game_UpdateTeam AFTER UPDATE OF Team ON Game
+               WHEN OLD.Team <> NEW.Team
+               BEGIN
+                   INSERT OR IGNORE INTO TeamTotals (Team) VALUES (NEW.Team);
+                   UPDATE TeamTotals
+                   SET PenaltySum = ROUND(PenaltySum - COALESCE(
+                       (SELECT PenaltySum FROM GameTotals
+                        WHERE Game = NEW.ID), 0), 2)
+                   WHERE Team = OLD.Team;
+                   UPDATE TeamTotals
+                   SET PenaltySum = ROUND(PenaltySum + COALESCE(
+                       (SELECT PenaltySum FROM GameTotals
+                        WHERE Game = NEW.ID), 0), 2)
+                   WHERE Team = NEW.Team;
+               END""",
+            """CREATE TRIGGER TR_Game_Delete AFTER DELETE ON Game
+               BEGIN
+                   UPDATE TeamTotals
+                   SET PenaltySum = ROUND(PenaltySum - COALESCE(
+                       (SELECT PenaltySum FROM GameTotals
+                        WHERE Game = OLD.ID), 0), 2)
+                   WHERE Team = OLD.Team;
+                   DELETE FROM GameTotals WHERE Game = OLD.ID;
+               END""",
+            """CREATE TRIGGER TR_GameTotals_UpdatePenaltySum
+               AFTER UPDATE OF PenaltySum ON GameTotals
+               BEGIN
+                   UPDATE TeamTotals
+                   SET PenaltySum = ROUND(
+                       PenaltySum + NEW.PenaltySum - OLD.PenaltySum, 2)
+                   WHERE Team = (SELECT Team FROM Game WHERE ID = NEW.Game);
+               END""",
+            f"""CREATE TRIGGER TR_GamePlayers_Insert AFTER INSERT ON GamePlayers
+                BEGIN
+                    INSERT OR IGNORE INTO PlayerTotals (GamePlayer)
+                    VALUES (NEW.ID);
+                    {_refresh_game_results("NEW.Game")}
+                END""",
+            f"""CREATE TRIGGER TR_GamePlayers_UpdateResults
+                AFTER UPDATE OF "Full", Clear, Errors ON GamePlayers
+                BEGIN
+                    {_refresh_game_results("NEW.Game")}
+                END""",
+            f"""CREATE TRIGGER TR_GamePlayers_UpdateGame
+                AFTER UPDATE OF Game ON GamePlayers
+                WHEN OLD.Game <> NEW.Game
+                BEGIN
+                    {_refresh_game_results("NEW.Game")}
+                    {_refresh_game_penalty_sum("NEW.Game")}
+                    {_refresh_game_results("OLD.Game")}
+                    {_refresh_game_penalty_sum("OLD.Game")}
+                END""",
+            f"""CREATE TRIGGER TR_GamePlayers_Delete AFTER DELETE ON GamePlayers
+                BEGIN
+                    DELETE FROM PlayerTotals WHERE GamePlayer = OLD.ID;
+                    {_refresh_game_results("OLD.Game")}
+                    {_refresh_game_penalty_sum("OLD.Game")}
+                END""",
+            f"""CREATE TRIGGER TR_PlayerTotals_UpdatePenaltySum
+                AFTER UPDATE OF PenaltySum ON PlayerTotals
+                BEGIN
+                    {_refresh_game_penalty_sum(
+                        "(SELECT Game FROM GamePlayers WHERE ID = NEW.GamePlayer)"
+                    )}
+                END""",
+            f"""CREATE TRIGGER TR_PlayerPenalties_Insert
+                AFTER INSERT ON PlayerPenalties
+                BEGIN
+                    {_refresh_legacy_player_totals("NEW.GamePlayer")}
+                END""",
+            f"""CREATE TRIGGER TR_PlayerPenalties_Update
+                AFTER UPDATE OF GamePlayer, Penalty, Value ON PlayerPenalties
+                BEGIN
+                    {_refresh_legacy_player_totals("NEW.GamePlayer")}
+                END""",
+            f"""CREATE TRIGGER TR_PlayerPenalties_UpdateGamePlayer
+                AFTER UPDATE OF GamePlayer ON PlayerPenalties
+                WHEN OLD.GamePlayer <> NEW.GamePlayer
+                BEGIN
+                    {_refresh_legacy_player_totals("OLD.GamePlayer")}
+                END""",
+            f"""CREATE TRIGGER TR_PlayerPenalties_Delete
+                AFTER DELETE ON PlayerPenalties
+                BEGIN
+                    {_refresh_legacy_player_totals("OLD.GamePlayer")}
+                END""",
+            f"""CREATE TRIGGER TR_Penalty_UpdatePenalty
+                AFTER UPDATE OF penalty ON Penalty
+                BEGIN
+                    UPDATE PlayerTotals
+                    SET PenaltySum = {_legacy_player_penalty_sum(
+                        "PlayerTotals.GamePlayer"
+                    )}
+                    WHERE GamePlayer IN (
+                        SELECT GamePlayer FROM PlayerPenalties
+                        WHERE Penalty = NEW.ID);
+                END""",
+        )
+    ),
+    Migration(
+        5,
+        "Range penalties",
+        (
+            """ALTER TABLE PenaltyKind
+               ADD COLUMN IsRange INTEGER NOT NULL DEFAULT 0""",
+            # Only range penalties have limits; the seed catalog's range
+            # kind (ID 2) has no penalties yet, so it is marked by its id.
+            """UPDATE PenaltyKind SET IsRange = 1
+               WHERE ID = 2 OR ID IN (
+                   SELECT PenaltyTypeId FROM Penalty
+                   WHERE LowerLimit IS NOT NULL OR UpperLimit IS NOT NULL)""",
+            "DROP TRIGGER TR_PlayerPenalties_Insert",
+            "DROP TRIGGER TR_PlayerPenalties_Update",
+            "DROP TRIGGER TR_PlayerPenalties_UpdateGamePlayer",
+            "DROP TRIGGER TR_PlayerPenalties_Delete",
+            "DROP TRIGGER TR_Penalty_UpdatePenalty",
+            f"""CREATE TRIGGER TR_PlayerPenalties_Insert
+                AFTER INSERT ON PlayerPenalties
+                BEGIN
+                    {_refresh_legacy_player_totals("NEW.GamePlayer", True)}
+                END""",
+            f"""CREATE TRIGGER TR_PlayerPenalties_Update
+                AFTER UPDATE OF GamePlayer, Penalty, Value ON PlayerPenalties
+                BEGIN
+                    {_refresh_legacy_player_totals("NEW.GamePlayer", True)}
+                END""",
+            f"""CREATE TRIGGER TR_PlayerPenalties_UpdateGamePlayer
+                AFTER UPDATE OF GamePlayer ON PlayerPenalties
+                WHEN OLD.GamePlayer <> NEW.GamePlayer
+                BEGIN
+                    {_refresh_legacy_player_totals("OLD.GamePlayer", True)}
+                END""",
+            f"""CREATE TRIGGER TR_PlayerPenalties_Delete
+                AFTER DELETE ON PlayerPenalties
+                BEGIN
+                    {_refresh_legacy_player_totals("OLD.GamePlayer", True)}
+                END""",
+            f"""CREATE TRIGGER TR_Penalty_Update
+                AFTER UPDATE OF penalty, PenaltyTypeId, LowerLimit, UpperLimit
+                ON Penalty
+                BEGIN
+                    UPDATE PlayerTotals
+                    SET PenaltySum = {_legacy_player_penalty_sum(
+                        "PlayerTotals.GamePlayer", True
+                    )}
+                    WHERE GamePlayer IN (
+                        SELECT GamePlayer FROM PlayerPenalties
+                        WHERE Penalty = NEW.ID);
+                END""",
+            f"""CREATE TRIGGER TR_PenaltyKind_UpdateIsRange
+                AFTER UPDATE OF IsRange ON PenaltyKind
+                BEGIN
+                    UPDATE PlayerTotals
+                    SET PenaltySum = {_legacy_player_penalty_sum(
+                        "PlayerTotals.GamePlayer", True
+                    )}
+                    WHERE GamePlayer IN (
+                        SELECT pp.GamePlayer FROM PlayerPenalties pp
+                        INNER JOIN Penalty p ON pp.Penalty = p.ID
+                        WHERE p.PenaltyTypeId = NEW.ID);
+                END""",
+            f"""UPDATE PlayerTotals
+                SET PenaltySum = {_legacy_player_penalty_sum(
+                    "PlayerTotals.GamePlayer", True
+                )}""",
+        )
+    ),
+    Migration(
+        6,
+        "Index games by date for keyset navigation",
+        (
+            """CREATE INDEX IF NOT EXISTS IX_Game_Date
+               ON Game (Date)""",
+        )
+    ),
+    Migration(
+        7,
+        "Count catalog changes",
+        (
+            """CREATE TABLE CatalogVersion (
+                   ID INTEGER PRIMARY KEY CHECK (ID = 1),
+                   Version INTEGER NOT NULL)""",
+            "INSERT INTO CatalogVersion (ID, Version) VALUES (1, 0)",
+            *_catalog_version_triggers(),
+        )
+    ),
+    Migration(
+        8,
+        "Charge only the narrowest range tier",
+        (
+            "DROP TRIGGER TR_PlayerPenalties_Insert",
+            "DROP TRIGGER TR_PlayerPenalties_Update",
+            "DROP TRIGGER TR_PlayerPenalties_UpdateGamePlayer",
+            "DROP TRIGGER TR_PlayerPenalties_Delete",
+            "DROP TRIGGER TR_Penalty_Update",
+            "DROP TRIGGER TR_PenaltyKind_UpdateIsRange",
+            f"""CREATE TRIGGER TR_PlayerPenalties_Insert
+                AFTER INSERT ON PlayerPenalties
+                BEGIN
+                    {_refresh_player_totals("NEW.GamePlayer")}
+                END""",
+            f"""CREATE TRIGGER TR_PlayerPenalties_Update
+                AFTER UPDATE OF GamePlayer, Penalty, Value ON PlayerPenalties
+                BEGIN
+                    {_refresh_player_totals("NEW.GamePlayer")}
+                END""",
+            f"""CREATE TRIGGER TR_PlayerPenalties_UpdateGamePlayer
+                AFTER UPDATE OF GamePlayer ON PlayerPenalties
+                WHEN OLD.GamePlayer <> NEW.GamePlayer
+                BEGIN
+                    {_refresh_player_totals("OLD.GamePlayer")}
+                END""",
+            f"""CREATE TRIGGER TR_PlayerPenalties_Delete
+                AFTER DELETE ON PlayerPenalties
+                BEGIN
+                    {_refresh_player_totals("OLD.GamePlayer")}
+                END""",
+            # Changing, adding or removing a tier can move the charge to
+            # another tier, so every player with range rows is refreshed.
+            f"""CREATE TRIGGER TR_Penalty_Update
+                AFTER UPDATE OF penalty, PenaltyTypeId, LowerLimit, UpperLimit
+                ON Penalty
+                BEGIN
+                    {_refresh_tiered_totals(_PENALTY_OR_TIER_CHANGED)}
+                END""",
+            f"""CREATE TRIGGER TR_Penalty_InsertTier
+                AFTER INSERT ON Penalty
+                WHEN (SELECT IsRange FROM PenaltyKind
+                      WHERE ID = NEW.PenaltyTypeId)
+                BEGIN
+                    {_refresh_tiered_totals("k.IsRange")}
+                END""",
+            f"""CREATE TRIGGER TR_Penalty_DeleteTier
+                AFTER DELETE ON Penalty
+                WHEN (SELECT IsRange FROM PenaltyKind
+                      WHERE ID = OLD.PenaltyTypeId)
+                BEGIN
+                    {_refresh_tiered_totals("k.IsRange")}
+                END""",
+            f"""CREATE TRIGGER TR_PenaltyKind_UpdateIsRange
+                AFTER UPDATE OF IsRange ON PenaltyKind
+                BEGIN
+                    {_refresh_tiered_totals(
+                        "p.PenaltyTypeId = NEW.ID OR k.IsRange"
+                    )}
+                END""",
+            f"""UPDATE PlayerTotals
+                SET PenaltySum = {_player_penalty_sum(
+                    "PlayerTotals.GamePlayer"
+                )}""",
+        )
+    ),
+]
@@ -1,33 +1,52 @@
-from typing import Any, Union, TypeVar, Generic
-from PySide6.QtCore import (
-    QAbstractTableModel,
-    QModelIndex,
-    QPersistentModelIndex,
-    QAbstractListModel
-)
-from PySide6.QtGui import Qt
+from typing import Any, Union
+from collections.abc import Awaitable, Callable
 from database import Database
+from async_database import AsyncDatabase
+from backup import BackupService, BackupResult
+from clubs import Club, CrossClubStatistics, upgrade_clubs
 from database_access import (
     SumPerPlayerView,
     GamePlayerTable,
     PlayerPenaltiesTable,
-    PenaltyTable,
     GameTable,
     ResultOfGameView,
-    SumPerGameView,
-    PlayerTable,
-    SeasonTable
+    SumPerGameView
+)
+from entities import (
+    PlayerPenalties,
+    GamePlayers,
+    Season,
+    Game,
+    Team,
+    Penalty
+)
+from reference_data import ReferenceDataCache
+from calculators import PenaltyCalculator
+from view_data_classes import (
+    SumPerPlayer,
+    GameSnapshot,
+    SeasonStanding,
+    ClubTeamSum
 )
-from entities import PlayerPenalties, GamePlayers, Season
-from view_data_classes import SumPerPlayer
-from dataclasses import dataclass
+from snapshot_cache import GameSnapshotCache
+from season_statistics import SeasonStatistics
+from query_statistics import QueryStatistics
+import asyncio
+import inspect
+import logging
+from dataclasses import dataclass, field
 from datetime import date
-from abc import abstractmethod
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
 
 
 class MainWindowModel:
-    def __init__(self, db_name: str):
-        self._database = Database(db_name)
+    SNAPSHOT_CACHE_SIZE = 32
+
+    def __init__(self, database: Database):
+        self._database = database
+        self._snapshots = GameSnapshotCache(self.SNAPSHOT_CACHE_SIZE)
         self._sum_per_player_view = SumPerPlayerView(
             self._database
         )
@@ -36,20 +55,60 @@ class MainWindowModel:
         self._player_penalty_table = PlayerPenaltiesTable(
             self._database
         )
-        self._penalty_table = PenaltyTable(self._database)
         self._game_table = GameTable(self._database)
         
         self._result_of_game_view = ResultOfGameView(self._database)
         self._sum_per_game_view = SumPerGameView(self._database)
+        self._reference_data = ReferenceDataCache(self._database)
+        self._season_statistics = SeasonStatistics(self._database)
+
+    @property
+    def reference_data(self) -> ReferenceDataCache:
+        return self._reference_data
     
     def get_all_games(self):
         return self._game_table.get_all()
 
+    def get_last_game(self) -> Game | None:
+        return self._game_table.get_last()
+
+    def get_game(self, game_id: int) -> Game | None:
+        return self._game_table.get_by_id(game_id)
+
+    def get_adjacent_games(self, game: Game) -> tuple[Game | None, Game | None]:
+        return (
+            self._game_table.get_previous(game),
+            self._game_table.get_next(game)
+        )
+
     def get_results_per_game(self, game_id: int):
         return self._result_of_game_view.get_by_game_id(game_id)
     
     def get_all_sum_per_player(self, game_id: int) -> list[SumPerPlayer]:
         return self._sum_per_player_view.get_by_game_id(game_id)
+
+    def get_game_snapshot(self, game_id: int) -> GameSnapshot:
+        snapshot = self._snapshots.get(game_id)
+
+        if snapshot is None:
+            generation = self._snapshots.generation
+            # One read transaction, so a commit in between cannot mix
+            # the per-player rows with older or newer totals
+            with self._database.read_transaction():
+                snapshot = GameSnapshot(
+                    game_id,
+                    self.get_all_sum_per_player(game_id),
+                    self.get_results_per_game(game_id),
+                    self.get_sum_per_game(game_id)
+                )
+            self._snapshots.put(snapshot, generation)
+
+        return snapshot
+
+    def prefetch_game_snapshots(self, game_ids: list[int]) -> None:
+        for game_id in game_ids:
+            if game_id not in self._snapshots:
+                self.get_game_snapshot(game_id)
         
     def get_by_game_and_player_id(
         self,
@@ -61,43 +120,411 @@ class MainWindowModel:
             player_id
         )
         
+    def get_game_player_with_penalties(
+        self,
+        game_id: int,
+        player_id: int
+    ) -> Union[GamePlayers, None]:
+        game_players = self._game_player_table.get_where(
+            "GamePlayers.Game = ? AND GamePlayers.Player = ?",
+            (game_id, player_id),
+            ("player_penalties_navigation",)
+        )
+
+        if not game_players:
+            return None
+
+        penalties = self._reference_data.penalties
+        for player_penalty in game_players[0].player_penalties_navigation:
+            player_penalty.penalty_navigation = penalties[
+                player_penalty.penalty
+            ]
+
+        return game_players[0]
+        
     def get_sum_per_game(self, game_id: int):
         return self._sum_per_game_view.get_by_game_id(game_id)
         
     def get_penalty(self, penalty_id: int):
-        return self._penalty_table.get_by_id(penalty_id)
+        return self._reference_data.penalties[penalty_id]
+
+    def get_penalties(self) -> list[Penalty]:
+        return list(self._reference_data.penalties.values())
+
+    def get_seasons(self) -> list[Season]:
+        return list(self._reference_data.seasons.values())
+
+    def create_add_game_model(self) -> "AddGameDialogModel":
+        return AddGameDialogModel(self._database, self._reference_data)
+
+    def get_season_standings(self, season_id: int) -> list[SeasonStanding]:
+        return self._season_statistics.get_standings(season_id)
     
     def get_penalty_by_gameplayerid(
                                     self, game_player_id: int
             ) -> list[PlayerPenalties]:
         return self._player_penalty_table.get_by_gameplayerid(game_player_id)
         
-    def update_game_player(self, game_player: GamePlayers):
-        self._game_player_table.update(game_player)
-        
-    def update_player_penalty(self, player_penalty: PlayerPenalties):
-        self._player_penalty_table.update(player_penalty)
-        
     def update_game_player_with_penalties(
         self,
         game_player: GamePlayers,
         player_penalties: list[PlayerPenalties]
-    ):
+    ) -> bool:
+        """Writes only the changed rows and columns; returns False without
+        touching the database when nothing was changed."""
+        if not game_player.is_dirty and not any(
+            pp.is_dirty for pp in player_penalties
+        ):
+            return False
+
         with self._database.transaction():
-            self.update_game_player(game_player)
-            
-            for pp in player_penalties:
-                self.update_player_penalty(pp)
+            self._game_player_table.save_changes([game_player])
+            self._player_penalty_table.save_changes(player_penalties)
+
+        self._snapshots.invalidate(game_player.game)
+        return True
+
+    def apply_game_player_edits(
+        self,
+        edits: list["GamePlayerEdit"]
+    ) -> tuple[list[GamePlayers | LookupError | ValueError], set[int]]:
+        """Applies a batch of edits in a single transaction.
+
+        Returns, per edit, the updated game player or the error that
+        rejected just this edit (the others are written regardless), and
+        the ids of the games that actually changed. Only changed rows and
+        columns are written; a batch without changes opens no transaction.
+        """
+        calculator = self._reference_data.penalty_calculator
+        results = []
+        changed: list[GamePlayers] = []
+
+        for edit in edits:
+            game_player = self.get_game_player_with_penalties(
+                edit.game_id, edit.player_id
+            )
+            if game_player is None:
+                results.append(LookupError(
+                    f"Player {edit.player_id} did not play game {edit.game_id}"
+                ))
+                continue
+
+            try:
+                edit.apply_to(game_player, calculator)
+            except ValueError as error:
+                results.append(error)
+                continue
+
+            results.append(game_player)
+            if game_player.is_dirty or any(
+                pp.is_dirty for pp in game_player.player_penalties_navigation
+            ):
+                changed.append(game_player)
+
+        if changed:
+            with self._database.transaction():
+                self._game_player_table.save_changes(changed)
+                self._player_penalty_table.save_changes([
+                    pp for gp in changed for pp in gp.player_penalties_navigation
+                ])
+
+        game_ids = {gp.game for gp in changed}
+        for game_id in game_ids:
+            self._snapshots.invalidate(game_id)
+
+        return results, game_ids
+
+
+class _ClubSession:
+    """Everything that is opened for one club: the database with its
+    worker threads, the model bound to it and its backups."""
+    def __init__(
+        self,
+        club: Club,
+        backup_directory: str = None,
+        on_backup_failed: Callable[[Club, BackupResult], None] = None
+    ):
+        self.club = club
+        self._on_backup_failed = on_backup_failed
+        self.async_database = AsyncDatabase(club.path)
+        self.model: MainWindowModel = self.async_database.run_sync(
+            MainWindowModel, self.async_database.database
+        )
+        self.backups = BackupService(
+            self.async_database.database,
+            backup_directory
+            or str(Path(club.path).resolve().parent / "backups"),
+            prefix=Path(club.path).stem,
+            on_finished=self._backup_finished
+        )
+
+    def _backup_finished(self, result: BackupResult) -> None:
+        # Runs on the backup thread
+        if result.ok:
+            return
+
+        logger.error(
+            "Backup %s of club '%s' failed: %s",
+            result.path, self.club.name, result.check
+        )
+        if self._on_backup_failed is not None:
+            self._on_backup_failed(self.club, result)
+
+    def close(self) -> None:
+        self.backups.close()
+        self.async_database.close()
+
+
+class AsyncMainWindowModel:
+    """Coroutine facade for MainWindowModel.
+
+    The wrapped model runs on the worker threads of an AsyncDatabase, so
+    slow queries never block the Qt GUI thread. Every club has its own
+    database file; a club is opened on first use and stays open, so
+    switching back and forth does not reopen anything. Every save is
+    followed by an online backup into ``backup_directory`` (default:
+    ``backups`` next to the club's database) and reported to the change
+    listeners with the club and the ids of the changed games, whichever
+    client made it. Failed backups are reported to the backup failure
+    listeners on the event loop.
+    """
+    def __init__(
+        self,
+        clubs: list[Club] | str,
+        backup_directory: str = None
+    ):
+        if isinstance(clubs, str):
+            clubs = [Club(Path(clubs).stem, clubs)]
+
+        self._clubs = clubs
+        self._backup_directory = backup_directory
+        # Backups finish on their own threads and are reported through it
+        self._loop = asyncio.get_event_loop()
+        self._backup_failure_listeners: list[
+            Callable[[Club, BackupResult], None]
+        ] = []
+        self._sessions: dict[str, _ClubSession] = {}
+        self._session = self._open(clubs[0])
+        self._background_tasks: set[asyncio.Task] = set()
+        self._change_listeners: list[
+            Callable[[Club, set[int]], Awaitable[None] | None]
+        ] = []
+
+    @property
+    def clubs(self) -> list[Club]:
+        return list(self._clubs)
+
+    @property
+    def current_club(self) -> Club:
+        return self._session.club
+
+    async def switch_club(self, name: str) -> None:
+        session = self._sessions.get(name)
+        if session is None:
+            club = next(c for c in self._clubs if c.name == name)
+            # Opening applies migrations, which must not block the GUI
+            session = await asyncio.to_thread(self._open, club)
+
+        self._session = session
+
+    async def get_cross_club_team_sums(
+        self,
+        season: str = None
+    ) -> list[ClubTeamSum]:
+        def query():
+            upgrade_clubs(
+                [c for c in self._clubs if c.name not in self._sessions]
+            )
+            return CrossClubStatistics(self._clubs).sum_per_team(season)
+
+        return await asyncio.to_thread(query)
+
+    def add_change_listener(
+        self,
+        listener: Callable[[Club, set[int]], Awaitable[None] | None]
+    ) -> None:
+        self._change_listeners.append(listener)
+
+    def remove_change_listener(
+        self,
+        listener: Callable[[Club, set[int]], Awaitable[None] | None]
+    ) -> None:
+        self._change_listeners.remove(listener)
+
+    def add_backup_failure_listener(
+        self,
+        listener: Callable[[Club, BackupResult], None]
+    ) -> None:
+        self._backup_failure_listeners.append(listener)
+
+    def _backup_failed(self, club: Club, result: BackupResult) -> None:
+        def notify():
+            for listener in list(self._backup_failure_listeners):
+                listener(club, result)
+
+        try:
+            self._loop.call_soon_threadsafe(notify)
+        except RuntimeError:
+            # The loop was already closed at shutdown; the log has it
+            pass
+
+    async def _notify(self, club: Club, game_ids: set[int]) -> None:
+        for listener in list(self._change_listeners):
+            result = listener(club, game_ids)
+            if inspect.isawaitable(result):
+                await result
+
+    def _open(self, club: Club) -> _ClubSession:
+        session = _ClubSession(
+            club, self._backup_directory, self._backup_failed
+        )
+        self._sessions[club.name] = session
+        return session
+
+    @property
+    def model(self) -> MainWindowModel:
+        return self._session.model
+
+    @property
+    def backups(self) -> BackupService:
+        return self._session.backups
+
+    @property
+    def query_statistics(self) -> QueryStatistics:
+        return self._session.async_database.database.query_statistics
+
+    async def run(self, func: Callable, *args) -> Any:
+        return await self._session.async_database.run(func, *args)
+
+    async def run_read(self, func: Callable, *args) -> Any:
+        return await self._session.async_database.run_read(func, *args)
+
+    async def get_all_games(self):
+        return await self.run_read(self.model.get_all_games)
+
+    async def get_last_game(self) -> Game | None:
+        return await self.run_read(self.model.get_last_game)
+
+    async def get_game(self, game_id: int) -> Game | None:
+        return await self.run_read(self.model.get_game, game_id)
+
+    async def get_adjacent_games(
+        self,
+        game: Game
+    ) -> tuple[Game | None, Game | None]:
+        return await self.run_read(self.model.get_adjacent_games, game)
+
+    async def get_results_per_game(self, game_id: int):
+        return await self.run_read(self.model.get_results_per_game, game_id)
+
+    async def get_all_sum_per_player(self, game_id: int) -> list[SumPerPlayer]:
+        return await self.run_read(self.model.get_all_sum_per_player, game_id)
+
+    async def get_sum_per_game(self, game_id: int):
+        return await self.run_read(self.model.get_sum_per_game, game_id)
+
+    async def get_game_snapshot(self, game_id: int) -> GameSnapshot:
+        return await self.run_read(self.model.get_game_snapshot, game_id)
+
+    def prefetch_game_snapshots(self, game_ids: list[int]) -> asyncio.Task:
+        task = asyncio.ensure_future(
+            self.run_read(self.model.prefetch_game_snapshots, game_ids)
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def get_game_player_with_penalties(
+        self,
+        game_id: int,
+        player_id: int
+    ) -> Union[GamePlayers, None]:
+        return await self.run_read(
+            self.model.get_game_player_with_penalties, game_id, player_id
+        )
+
+    async def get_penalties(self) -> list[Penalty]:
+        return await self.run_read(self.model.get_penalties)
+
+    async def get_penalty_calculator(
+        self,
+        club: str = None
+    ) -> PenaltyCalculator:
+        session = self._session if club is None else self._sessions[club]
+        return await session.async_database.run_read(
+            lambda: session.model.reference_data.penalty_calculator
+        )
+
+    async def get_seasons(self) -> list[Season]:
+        return await self.run_read(self.model.get_seasons)
+
+    async def get_season_standings(
+        self,
+        season_id: int
+    ) -> list[SeasonStanding]:
+        return await self.run_read(
+            self.model.get_season_standings, season_id
+        )
+
+    async def update_game_player_with_penalties(
+        self,
+        game_player: GamePlayers,
+        player_penalties: list[PlayerPenalties]
+    ) -> bool:
+        session = self._session
+        changed = await session.async_database.run(
+            session.model.update_game_player_with_penalties,
+            game_player,
+            player_penalties
+        )
+        if changed:
+            session.backups.request()
+            await self._notify(session.club, {game_player.game})
+        return changed
+
+    async def apply_game_player_edits(
+        self,
+        edits: list["GamePlayerEdit"],
+        club: str = None
+    ) -> list[GamePlayers | LookupError | ValueError]:
+        """Writes to the club named ``club``, which has to be open, rather
+        than to whichever club is current once the edits arrive here."""
+        session = self._session if club is None else self._sessions[club]
+        results, game_ids = await session.async_database.run(
+            session.model.apply_game_player_edits, edits
+        )
+        if game_ids:
+            session.backups.request()
+            await self._notify(session.club, game_ids)
+        return results
+
+    def create_add_game_model(self) -> "AddGameDialogModel":
+        """A dialog model for a new game of the current club; load it with
+        ``run`` before showing the dialog."""
+        return self.model.create_add_game_model()
+
+    async def save_game(self, dialog_model: "AddGameDialogModel") -> int:
+        session = self._session
+        game_id = await session.async_database.run(dialog_model.save_game)
+        session.backups.request()
+        await self._notify(session.club, {game_id})
+        return game_id
+
+    def close(self) -> None:
+        for session in self._sessions.values():
+            session.close()
 
 
 class EditPenaltyDialogModel:
     def __init__(
         self,
         selected_player: SumPerPlayer,
-        game_player: GamePlayers
+        game_player: GamePlayers,
+        calculator: PenaltyCalculator
     ):
         self._selected_player = selected_player
         self._game_player = game_player
+        self._calculator = calculator
 
     @property
     def game_player(self):
@@ -107,17 +534,24 @@ class EditPenaltyDialogModel:
     def selected_player(self):
         return self._selected_player
 
+    @property
+    def calculator(self) -> PenaltyCalculator:
+        return self._calculator
+
 
 class AddGameDialogModel:
-    def __init__(self, database):
+    def __init__(self, database, reference_data: ReferenceDataCache):
         self._database = database
+        self._reference_data = reference_data
         self.game_date = date.today()
         self.opponent = ""
         self.game_day = 1
         self.selected_season = 0
+        self.selected_team: int | None = None
         
         self._players = []
         self._seasons = []
+        self._teams = []
         
     @property
     def players(self):
@@ -126,20 +560,28 @@ class AddGameDialogModel:
     @property
     def seasons(self):
         return self._seasons
+
+    @property
+    def teams(self) -> list[Team]:
+        return self._teams
     
     def load(self) -> None:
-        player_table = PlayerTable(self._database)
-        all_players = player_table.get_all()
+        all_players = self._reference_data.players.values()
         self._players = [PlayerTableModelItem(False, p.name, p.id) for p in all_players]
         
-        season_table = SeasonTable(self._database)
-        self._seasons = season_table.get_all()
+        self._seasons = list(self._reference_data.seasons.values())
+        self._teams = list(self._reference_data.teams.values())
+        if self.selected_team is None and self._teams:
+            self.selected_team = self._teams[0].id
         
-    def save_game(self):
+    def save_game(self) -> int:
+        if self.selected_team is None:
+            raise ValueError("A game needs a team, but the club has none")
+
         with self._database.transaction():
             game_table = GameTable(self._database)
             new_game_id = game_table.insert(
-                1,
+                self.selected_team,
                 self.game_date,
                 self.opponent,
                 self.game_day,
@@ -159,253 +601,87 @@ class AddGameDialogModel:
                 for p in self._players if p.is_playing]
             
             game_player_table = GamePlayerTable(self._database)
-            game_player_ids = [game_player_table.insert(gp) for gp in game_players]
+            game_player_ids = game_player_table.insert_many(game_players)
             
-            penalty_table = PenaltyTable(self._database)
-            penalty_ids = [penalty.id for penalty in penalty_table.get_all()]
+            penalty_ids = list(self._reference_data.penalties)
             player_penalty_table = PlayerPenaltiesTable(self._database)
             
-            for game_player_id in game_player_ids:
-                player_penalties = [PlayerPenalties(
-                    None,
-                    game_player_id,
-                    pid,
-                    0,
-                    None)
-                    for pid in penalty_ids]                
-  
-                [player_penalty_table.insert(pp) for pp in player_penalties]
-
-
-T = TypeVar('T')
-
-
-class ListModel(QAbstractListModel, Generic[T]):
-    def __init__(self, items=None, parent=...):
-        super().__init__(parent)
-        self._items: list[T] = items or []
-        
-    def data(self, index: QModelIndex, role: int = ...) -> Any:
-        if not index.isValid():
-            return None
-        
-        item = self._items[index.row()]
-        
-        if role == Qt.ItemDataRole.DisplayRole:
-            return self.get_label(item)
-        elif role == Qt.ItemDataRole.UserRole:
-            return self.get_id(item)
-        
-        return None
-        
-    def rowCount(self, parent=QModelIndex()) -> int:
-        return len(self._items)
-    
-    @abstractmethod
-    def get_label(self, item: T) -> str:
-        pass
-    
-    @abstractmethod
-    def get_id(self, item: T) -> int:
-        pass
-
-
-class SeasonListModel(ListModel[Season]):
-    def __init__(self, items: list[Season] = None, parent=None):
-        super().__init__(items, parent)
-    
-    def get_label(self, item: Season) -> str:
-        return item.name
-    
-    def get_id(self, item: Season) -> int:
-        return item.id
-
-
-class AbstractTableModel(QAbstractTableModel, Generic[T]):
-    def __init__(self):
-        super().__init__()
-        self._source: list[T] = []
-
-    def get(self, index: int) -> T:
-        return self._source[index]
-
-    def insertRows(self, index, rows, parent=...):
-        if not rows:
-            return False
-
-        position = index.row()
-
-        self.beginInsertRows(parent, position, position + len(rows) - 1)
-        self._source[position:position] = rows
-        self.endInsertRows()
-
-        return True
-
-    def removeRows(self, row, count, parent=...):
-        if row < 0 or count <= 0 or row >= len(self._source):
-            return False
-
-        end_row = min(row + count - 1, len(self._source) - 1)
-        self.beginRemoveRows(QModelIndex(), row, end_row)
-
-        del self._source[row:end_row + 1]
-
-        self.endRemoveRows()
-
-    def remove_all_rows(self):
-        if self._source:
-            self.removeRows(0, len(self._source), QModelIndex())
-
-    def rowCount(self, parent=QModelIndex()) -> int:
-        return len(self._source)
-  
-
-class SumPerPlayerTablemodel(AbstractTableModel[SumPerPlayer]):
-    PLAYED_COLUMN_INDEX = 5
+            player_penalties = [PlayerPenalties(
+                None,
+                game_player_id,
+                pid,
+                0,
+                None)
+                for game_player_id in game_player_ids
+                for pid in penalty_ids]
 
-    def columnCount(self, parent=QModelIndex()) -> int:
-        return 7
+            player_penalty_table.insert_many(player_penalties)
 
-    def data(
-        self,
-        index: Union[QModelIndex, QPersistentModelIndex],
-        role: int = ...
-    ) -> Any:
-        player = self._source[index.row()]
-        column_index = index.column()
-
-        if role == Qt.ItemDataRole.DisplayRole:
-            match column_index:
-                case 0:
-                    return player.player_name
-                case 1:
-                    return player.full
-                case 2:
-                    return player.clear
-                case 3:
-                    return player.full + player.clear
-                case 4:
-                    return player.errors
-                case 5:
-                    return None
-                case 6:
-                    return (
-                        f"{player.penalty_sum:.2f} €"
-                    )
-        if (
-            role == Qt.ItemDataRole.CheckStateRole
-            and index.column() == self.PLAYED_COLUMN_INDEX
-        ):
-            return Qt.CheckState.Checked if True else Qt.CheckState.Unchecked
+        return new_game_id
 
-        return None
 
-    def headerData(
+@dataclass
+class GamePlayerEdit:
+    """Values one client changed on a game player; None keeps a value."""
+    game_id: int
+    player_id: int
+    full: int | None = None
+    clear: int | None = None
+    errors: int | None = None
+    penalties: dict[int, int] = field(default_factory=dict)
+
+    def merge(self, newer: "GamePlayerEdit") -> None:
+        for name in ("full", "clear", "errors"):
+            value = getattr(newer, name)
+            if value is not None:
+                setattr(self, name, value)
+        self.penalties.update(newer.penalties)
+
+    def apply_to(
         self,
-        section: int,
-        orientation: Qt.Orientation,
-        role: int = ...
-    ) -> Any:
-        if role == Qt.ItemDataRole.DisplayRole:
-            if orientation == Qt.Orientation.Horizontal:
-                match section:
-                    case 0:
-                        return "Spieler"
-                    case 1:
-                        return "Volle"
-                    case 2:
-                        return "Abräumen"
-                    case 3:
-                        return "Gesamt"
-                    case 4:
-                        return "Fehler"
-                    case 5:
-                        return "Gespielt"
-                    case 6:
-                        return "Strafe"
-            elif orientation == Qt.Orientation.Vertical:
-                return section + 1
-
-        return None
-
-    def flags(self, index):
-        flags = super().flags(index)
-
-        if index.column() == self.PLAYED_COLUMN_INDEX:
-            flags = flags | Qt.ItemFlag.ItemIsUserCheckable
-
-        return flags
-
-
-class PlayerPenaltiesTableModel(AbstractTableModel[PlayerPenalties]):
-    EDITABLE_COLUMN = 1
-
-    def columnCount(self, parent=...):
-        return 3
-
-    def headerData(self, section, orientation, role=...):
-        if role == Qt.ItemDataRole.DisplayRole:
-            if orientation == Qt.Orientation.Horizontal:
-                match section:
-                    case 0:
-                        return "Regel"
-                    case 1:
-                        return "Anzahl"
-                    case 2:
-                        return "Summe"
-            elif orientation == Qt.Orientation.Vertical:
-                return section + 1
-
-    def data(self, index, role=...):
-        row = self._source[index.row()]
-        column_index = index.column()
-
-        if role == Qt.ItemDataRole.DisplayRole:
-            match column_index:
-                case 0:
-                    return row.penalty_navigation.description
-                case 1:
-                    return row.value
-                case 2:
-                    total = row.value * row.penalty_navigation.penalty
-                    return f"{total:.2f} €"
-
-        return None
-
-    def setData(self, index, value, role=...):
-        new_value = int(value)
-        index_row = index.row()
-        index_column = index.column()
-
-        if index_column == self.EDITABLE_COLUMN:
-            if role in [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole]:
-                self._source[index_row].value = new_value
-                roles = [role]
-                self.dataChanged.emit(index, index, roles)
-                pay_index = self.index(
-                    index_row, index_column + 1, QModelIndex()
-                )
-                self.dataChanged.emit(pay_index, pay_index, roles)
-
-        return True
-
-    def flags(self, index):
-        flags = super().flags(index)
-
-        if index.column() == self.EDITABLE_COLUMN:
-            current_row = self._source[index.row()]
-
-            if not current_row.penalty_navigation.get_value_by_parent:
-                flags = flags | Qt.ItemFlag.ItemIsEditable
-
-        return flags
-
-    def get_rowindex_of_error_row(self) -> int:
-        for index, row in enumerate(self._source):
-            if row.penalty_navigation.get_value_by_parent:
-                return index
-
-        return -1
+        game_player: GamePlayers,
+        calculator: PenaltyCalculator
+    ) -> None:
+        """Sets the values the way the edit dialog does: range penalties
+        follow full + clear and the penalty counted from the errors follows
+        the errors. Raises ValueError before changing anything if a value
+        is invalid or a penalty is not recorded for the player.
+        """
+        player_penalties = {
+            pp.penalty: pp for pp in game_player.player_penalties_navigation
+        }
+        unknown = set(self.penalties) - set(player_penalties)
+        if unknown:
+            raise ValueError(f"Unknown penalties {sorted(unknown)}")
+
+        values = [self.full, self.clear, self.errors, *self.penalties.values()]
+        for value in values:
+            if value is not None and (
+                type(value) is not int or value < 0
+            ):
+                raise ValueError(f"Invalid value {value!r}")
+
+        for penalty_id, value in self.penalties.items():
+            player_penalties[penalty_id].value = value
+
+        if self.full is not None:
+            game_player.full = self.full
+        if self.clear is not None:
+            game_player.clear = self.clear
+        if self.full is not None or self.clear is not None:
+            total = game_player.full + game_player.clear
+            for pp in player_penalties.values():
+                if calculator.is_range(pp.penalty):
+                    pp.value = total
+
+        if self.errors is not None:
+            game_player.errors = self.errors
+            for pp in player_penalties.values():
+                if (
+                    pp.penalty_navigation.get_value_by_parent
+                    and not calculator.is_range(pp.penalty)
+                ):
+                    pp.value = self.errors
 
 
 @dataclass
@@ -413,70 +689,3 @@ class PlayerTableModelItem():
     is_playing: bool
     player_name: str
     player_id: int
-
-
-class PlayerTableModel(AbstractTableModel[PlayerTableModelItem]):
-    def headerData(
-        self,
-        section: int,
-        orientation: Qt.Orientation,
-        role: int = ...
-    ) -> Any:
-        if role == Qt.ItemDataRole.DisplayRole:
-            if orientation == Qt.Orientation.Horizontal:
-                match section:
-                    case 0:
-                        return ""
-                    case 1:
-                        return "Spieler"
-            elif orientation == Qt.Orientation.Vertical:
-                return section + 1
-
-        return None
-
-    def columnCount(self, parent=...):
-        return 2
-    
-    def data(
-        self,
-        index: Union[QModelIndex, QPersistentModelIndex],
-        role: int = ...
-    ) -> Any:
-        row = self._source[index.row()]
-        column_index = index.column()
-
-        if role == Qt.ItemDataRole.DisplayRole:
-            if column_index == 1:
-                return row.player_name
-        
-        if (
-            role == Qt.ItemDataRole.CheckStateRole
-            and column_index == 0
-        ):
-            return Qt.CheckState.Checked if row.is_playing else Qt.CheckState.Unchecked
-
-        return None
-    
-    def setData(self, index, value, role=...):
-        if not index.isValid() or index.column() != 0:
-            return False
-        
-        if role in [Qt.ItemDataRole.CheckStateRole, Qt.ItemDataRole.DisplayRole]:
-            row = self._source[index.row()]
-            row.is_playing = (value == Qt.CheckState.Checked.value)
-            self.dataChanged.emit(index, index, [role])
-            return True
-        
-        return False
-    
-    def flags(self, index: QModelIndex):
-        flags = super().flags(index)
-        
-        if index.column() == 0:
-            flags = flags | Qt.ItemFlag.ItemIsUserCheckable
-
-        return flags
-    
-    @property
-    def is_any_player_selected(self) -> bool:
-        return any(item.is_playing for item in self._source)
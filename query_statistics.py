@@ -0,0 +1,127 @@
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+
+@dataclass
+class StatementStatistics:
+    sql: str
+    count: int
+    total_ms: float
+    p50_ms: float
+    p99_ms: float
+    rows: int
+
+
+@dataclass
+class SlowQuery:
+    sql: str
+    params: tuple
+    duration_ms: float
+    plan: list[str]
+    timestamp: float
+
+
+class _StatementRecord:
+    def __init__(self, sample_size: int):
+        self.count = 0
+        self.total_ms = 0.0
+        self.rows = 0
+        self.samples: deque[float] = deque(maxlen=sample_size)
+
+
+class QueryStatistics:
+    """Per-statement timings and a bounded log of slow statements.
+
+    Percentiles are computed over the most recent ``sample_size`` runs of a
+    statement; counts, totals and rows cover every run since the last
+    reset. All methods are thread-safe.
+    """
+    SLOW_QUERY_THRESHOLD_MS = 50.0
+    SLOW_LOG_SIZE = 100
+    SAMPLE_SIZE = 1024
+
+    def __init__(
+        self,
+        slow_query_threshold_ms: float = SLOW_QUERY_THRESHOLD_MS,
+        slow_log_size: int = SLOW_LOG_SIZE,
+        sample_size: int = SAMPLE_SIZE
+    ):
+        self.slow_query_threshold_ms = slow_query_threshold_ms
+        self._sample_size = sample_size
+        self._lock = threading.Lock()
+        self._records: dict[str, _StatementRecord] = {}
+        self._slow_queries: deque[SlowQuery] = deque(maxlen=slow_log_size)
+
+    def record(self, sql: str, duration_ms: float, rows: int) -> bool:
+        """Adds one run of ``sql`` and returns whether it counts as slow."""
+        key = self.normalize(sql)
+
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                record = self._records[key] = _StatementRecord(
+                    self._sample_size
+                )
+            record.count += 1
+            record.total_ms += duration_ms
+            record.rows += rows
+            record.samples.append(duration_ms)
+
+        return duration_ms >= self.slow_query_threshold_ms
+
+    def log_slow_query(
+        self,
+        sql: str,
+        params: tuple,
+        duration_ms: float,
+        plan: list[str]
+    ) -> None:
+        with self._lock:
+            self._slow_queries.append(SlowQuery(
+                self.normalize(sql), tuple(params), duration_ms, plan,
+                time.time()
+            ))
+
+    def statistics(self) -> list[StatementStatistics]:
+        with self._lock:
+            snapshot = [
+                (sql, r.count, r.total_ms, r.rows, sorted(r.samples))
+                for sql, r in self._records.items()
+            ]
+
+        result = [
+            StatementStatistics(
+                sql, count, total_ms,
+                self._percentile(samples, 50),
+                self._percentile(samples, 99),
+                rows
+            )
+            for sql, count, total_ms, rows, samples in snapshot
+        ]
+        result.sort(key=lambda s: s.total_ms, reverse=True)
+        return result
+
+    def slow_queries(self) -> list[SlowQuery]:
+        with self._lock:
+            return list(self._slow_queries)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._records.clear()
+            self._slow_queries.clear()
+
+    @staticmethod
+    def normalize(sql: str) -> str:
+        return " ".join(sql.split())
+
+    @staticmethod
+    def _percentile(sorted_samples: list[float], percent: int) -> float:
+        if not sorted_samples:
+            return 0.0
+
+        # Nearest-rank method
+        rank = math.ceil(percent / 100 * len(sorted_samples))
+        return sorted_samples[max(rank, 1) - 1]
@@ -0,0 +1,70 @@
+from array import array
+from collections.abc import Iterator
+from typing import Any
+
+
+class RecordBatch:
+    """Column-oriented container for bulk query results.
+
+    Integer and float columns are stored in ``array`` buffers (8 bytes per
+    value, no per-value object), everything else - text or columns with
+    NULLs - in plain lists. Rows are only materialized on request.
+    """
+    def __init__(self, columns: dict[str, array | list]):
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("all columns of a RecordBatch need the same length")
+
+        self._columns = columns
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_rows(cls, names: tuple[str, ...], rows: list[tuple]) -> "RecordBatch":
+        columns = {}
+
+        for index, name in enumerate(names):
+            columns[name] = cls._compact([row[index] for row in rows])
+
+        return cls(columns)
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return tuple(self._columns)
+
+    def column(self, name: str) -> array | list:
+        return self._columns[name]
+
+    def __getitem__(self, name: str) -> array | list:
+        return self._columns[name]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def rows(self) -> Iterator[tuple]:
+        return zip(*self._columns.values())
+
+    def to_entities(self, entity: type) -> list[Any]:
+        return [entity(*row) for row in self.rows()]
+
+    def nbytes(self) -> int:
+        """Size of the column buffers; list columns count their pointers."""
+        total = 0
+
+        for values in self._columns.values():
+            if isinstance(values, array):
+                total += values.itemsize * len(values)
+            else:
+                total += 8 * len(values)
+
+        return total
+
+    @staticmethod
+    def _compact(values: list) -> array | list:
+        # bool is an int subclass, 'q' keeps it as 0/1
+        for typecode in ("q", "d"):
+            try:
+                return array(typecode, values)
+            except (TypeError, OverflowError):
+                continue
+
+        return values
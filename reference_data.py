@@ -0,0 +1,112 @@
+import threading
+from calculators import PenaltyCalculator
+from database import Database
+from database_access import (
+    PenaltyKindTable,
+    PenaltyTable,
+    PlayerTable,
+    SeasonTable,
+    TeamTableAccess
+)
+from entities import Penalty, PenaltyKind, Player, Season, Team
+
+
+class ReferenceDataCache:
+    """Keeps the rarely changing catalog tables in id-keyed dictionaries.
+
+    The cache is reloaded lazily after ``invalidate`` or when a catalog
+    table was written, be it by this application's writer connection or by
+    another process. ``PRAGMA data_version`` tells cheaply that anything
+    was committed; only then is the trigger-maintained CatalogVersion
+    read, so saving scores does not reload the catalogs.
+    """
+    def __init__(self, database: Database):
+        self._database = database
+        self._data_version: int | None = None
+        self._catalog_version: int | None = None
+        self._lock = threading.Lock()
+
+        self._penalty_kinds: dict[int, PenaltyKind] = {}
+        self._penalties: dict[int, Penalty] = {}
+        self._players: dict[int, Player] = {}
+        self._seasons: dict[int, Season] = {}
+        self._teams: dict[int, Team] = {}
+        self._penalty_calculator: PenaltyCalculator | None = None
+
+    @property
+    def penalty_kinds(self) -> dict[int, PenaltyKind]:
+        self._ensure_loaded()
+        return self._penalty_kinds
+
+    @property
+    def penalties(self) -> dict[int, Penalty]:
+        self._ensure_loaded()
+        return self._penalties
+
+    @property
+    def players(self) -> dict[int, Player]:
+        self._ensure_loaded()
+        return self._players
+
+    @property
+    def seasons(self) -> dict[int, Season]:
+        self._ensure_loaded()
+        return self._seasons
+
+    @property
+    def teams(self) -> dict[int, Team]:
+        self._ensure_loaded()
+        return self._teams
+
+    @property
+    def penalty_calculator(self) -> PenaltyCalculator:
+        self._ensure_loaded()
+        return self._penalty_calculator
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._data_version = None
+            self._catalog_version = None
+
+    def _ensure_loaded(self) -> None:
+        with self._lock:
+            self._load_if_changed()
+
+    def _load_if_changed(self) -> None:
+        data_version = self._database.data_version
+
+        if data_version == self._data_version:
+            return
+
+        # Read before the tables: a catalog commit in between only causes
+        # one more reload, never a stale cache
+        catalog_version = self._database.execute_single_query(
+            "SELECT Version FROM CatalogVersion"
+        )[0]
+        if catalog_version == self._catalog_version:
+            self._data_version = data_version
+            return
+
+        self._penalty_kinds = {
+            k.id: k for k in PenaltyKindTable(self._database).get_all()
+        }
+        self._penalties = {
+            p.id: p for p in PenaltyTable(self._database).get_all()
+        }
+        for penalty in self._penalties.values():
+            penalty.type_navigation = self._penalty_kinds.get(penalty.type)
+        self._penalty_calculator = PenaltyCalculator(
+            list(self._penalties.values())
+        )
+
+        self._players = {
+            p.id: p for p in PlayerTable(self._database).get_all()
+        }
+        self._seasons = {
+            s.id: s for s in SeasonTable(self._database).get_all()
+        }
+        self._teams = {
+            t.id: t for t in TeamTableAccess(self._database).get_all()
+        }
+        self._catalog_version = catalog_version
+        self._data_version = data_version
@@ -0,0 +1,126 @@
+import json
+
+from database_access import AbstractDatabaseObject
+from view_data_classes import SeasonStanding, PlayerBalance
+
+
+# Games of one season with the stored per-player totals. The season filter
+# is served by IX_Game_SeasonId_Date, the players by IX_GamePlayers_Game_Player
+# and the fines by the PlayerTotals aggregate, so no penalty rows are read.
+_SEASON_GAMES = """SELECT Game.SeasonId, Game.ID AS Game, Game.Date,
+                          GamePlayers.Player,
+                          COALESCE(GamePlayers."Full", 0) AS "Full",
+                          COALESCE(GamePlayers.Clear, 0) AS Clear,
+                          COALESCE(GamePlayers."Full", 0)
+                          + COALESCE(GamePlayers.Clear, 0) AS Result,
+                          COALESCE(GamePlayers.Errors, 0) AS Errors,
+                          COALESCE(PlayerTotals.PenaltySum, 0) AS PenaltySum
+                   FROM Game
+                   INNER JOIN GamePlayers ON GamePlayers.Game = Game.ID
+                   LEFT JOIN PlayerTotals
+                   ON PlayerTotals.GamePlayer = GamePlayers.ID
+                   WHERE Game.SeasonId = ? AND GamePlayers.Played = 1"""
+
+
+class SeasonStandingsView(AbstractDatabaseObject[SeasonStanding]):
+    """Per-player season totals, averages, ranks and running totals."""
+    def __init__(self, database_connection):
+        super().__init__(database_connection)
+        self._table_name = "SeasonGames"
+        self._entity = SeasonStanding
+        self._mapper = self._to_standing
+
+    def _create_select_query(self) -> str:
+        # The running totals are window sums over each player's games; the
+        # second window folds them, in game order, into one JSON array per
+        # player so the standings and the progress come from one statement.
+        return f"""WITH {self._table_name} AS ({_SEASON_GAMES}),
+                   Running AS (
+                       SELECT *,
+                              SUM(Result) OVER player_games AS RunningResult,
+                              ROUND(SUM(PenaltySum) OVER player_games, 2)
+                              AS RunningPenaltySum,
+                              ROW_NUMBER() OVER player_games AS GameNumber
+                       FROM {self._table_name}
+                       WINDOW player_games AS (
+                           PARTITION BY Player ORDER BY Date, Game
+                           ROWS UNBOUNDED PRECEDING
+                       )
+                   ),
+                   Progress AS (
+                       SELECT *,
+                              json_group_array(RunningResult)
+                              OVER player_season AS RunningResults,
+                              json_group_array(RunningPenaltySum)
+                              OVER player_season AS RunningPenaltySums
+                       FROM Running
+                       WINDOW player_season AS (
+                           PARTITION BY Player ORDER BY GameNumber
+                           ROWS BETWEEN UNBOUNDED PRECEDING
+                           AND UNBOUNDED FOLLOWING
+                       )
+                   )
+                   SELECT Progress.SeasonId, Player.ID, Player.Name,
+                          COUNT(*), SUM("Full"), SUM(Clear), SUM(Result),
+                          SUM(Errors), ROUND(SUM(PenaltySum), 2),
+                          AVG(Result), AVG(Errors),
+                          RANK() OVER (ORDER BY SUM(Result) DESC),
+                          RANK() OVER (ORDER BY ROUND(SUM(PenaltySum), 2) DESC),
+                          MAX(RunningResults), MAX(RunningPenaltySums)
+                   FROM Progress
+                   INNER JOIN Player ON Player.ID = Progress.Player
+                   GROUP BY Player.ID
+                   ORDER BY 12, Player.Name"""
+
+    @staticmethod
+    def _to_standing(row: tuple) -> SeasonStanding:
+        return SeasonStanding(
+            *row[:-2],
+            tuple(json.loads(row[-2])),
+            tuple(json.loads(row[-1]))
+        )
+
+    def get_by_season_id(self, season_id: int) -> list[SeasonStanding]:
+        return self._query(self._create_select_query(), (season_id,))
+
+
+class PlayerBalancesView(AbstractDatabaseObject[PlayerBalance]):
+    """Fines against payments per player, for one season or all games."""
+    def __init__(self, database_connection):
+        super().__init__(database_connection)
+        self._table_name = "PlayerTotals"
+        self._entity = PlayerBalance
+
+    def _create_select_query(self) -> str:
+        return f"""SELECT Player.ID, Player.Name, COUNT(*),
+                          ROUND(SUM({self._table_name}.PenaltySum), 2),
+                          ROUND(SUM(COALESCE(GamePlayers.Paid, 0)), 2),
+                          ROUND(SUM({self._table_name}.PenaltySum)
+                                - SUM(COALESCE(GamePlayers.Paid, 0)), 2)
+                   FROM GamePlayers
+                   INNER JOIN {self._table_name}
+                   ON {self._table_name}.GamePlayer = GamePlayers.ID
+                   INNER JOIN Player ON GamePlayers.Player = Player.ID
+                   INNER JOIN Game ON GamePlayers.Game = Game.ID"""
+
+    def get_balances(self, season_id: int = None) -> list[PlayerBalance]:
+        query = self._create_select_query()
+        params = ()
+        if season_id is not None:
+            query += " WHERE Game.SeasonId = ?"
+            params = (season_id,)
+        query += " GROUP BY Player.ID ORDER BY 6 DESC, Player.Name"
+
+        return self._query(query, params)
+
+
+class SeasonStatistics:
+    def __init__(self, database):
+        self._standings_view = SeasonStandingsView(database)
+        self._balances_view = PlayerBalancesView(database)
+
+    def get_standings(self, season_id: int) -> list[SeasonStanding]:
+        return self._standings_view.get_by_season_id(season_id)
+
+    def get_balances(self, season_id: int = None) -> list[PlayerBalance]:
+        return self._balances_view.get_balances(season_id)
@@ -0,0 +1,46 @@
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtWidgets import (
+    QComboBox,
+    QDialogButtonBox,
+    QHBoxLayout,
+    QLabel,
+    QTableView,
+    QVBoxLayout
+)
+
+
+class Ui_SeasonStatisticsDialog:
+    def setupUi(self, Dialog):
+        Dialog.setObjectName("SeasonStatisticsDialog")
+        Dialog.resize(720, 420)
+
+        self.verticalLayout = QVBoxLayout(Dialog)
+
+        self.horizontalLayout = QHBoxLayout()
+        self.seasonLabel = QLabel(Dialog)
+        self.horizontalLayout.addWidget(self.seasonLabel)
+        self.seasonComboBox = QComboBox(Dialog)
+        self.seasonComboBox.setObjectName("seasonComboBox")
+        self.horizontalLayout.addWidget(self.seasonComboBox, 1)
+        self.verticalLayout.addLayout(self.horizontalLayout)
+
+        self.standingsTableView = QTableView(Dialog)
+        self.standingsTableView.setObjectName("standingsTableView")
+        self.verticalLayout.addWidget(self.standingsTableView)
+
+        self.buttonBox = QDialogButtonBox(Dialog)
+        self.buttonBox.setStandardButtons(
+            QDialogButtonBox.StandardButton.Close
+        )
+        self.verticalLayout.addWidget(self.buttonBox)
+        self.buttonBox.rejected.connect(Dialog.reject)
+
+        self.retranslateUi(Dialog)
+
+    def retranslateUi(self, Dialog):
+        Dialog.setWindowTitle(QCoreApplication.translate(
+            "SeasonStatisticsDialog", "Saisonstatistik", None
+        ))
+        self.seasonLabel.setText(QCoreApplication.translate(
+            "SeasonStatisticsDialog", "Saison", None
+        ))
@@ -0,0 +1,51 @@
+import threading
+from collections import OrderedDict
+from view_data_classes import GameSnapshot
+
+
+class GameSnapshotCache:
+    """Bounded, thread-safe LRU cache of GameSnapshot objects.
+
+    Every invalidation bumps a generation counter; a snapshot that was
+    loaded before an invalidation is rejected by ``put`` so a slow reader
+    cannot re-insert stale data.
+    """
+    def __init__(self, capacity: int = 32):
+        self._capacity = capacity
+        self._entries: OrderedDict[int, GameSnapshot] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, game_id: int) -> GameSnapshot | None:
+        with self._lock:
+            snapshot = self._entries.get(game_id)
+            if snapshot is not None:
+                self._entries.move_to_end(game_id)
+            return snapshot
+
+    def __contains__(self, game_id: int) -> bool:
+        with self._lock:
+            return game_id in self._entries
+
+    def put(self, snapshot: GameSnapshot, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+
+            self._entries[snapshot.game_id] = snapshot
+            self._entries.move_to_end(snapshot.game_id)
+
+            while len(self._entries) > self._capacity:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, game_id: int = None) -> None:
+        with self._lock:
+            self._generation += 1
+            if game_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(game_id, None)
@@ -0,0 +1,68 @@
+import time
+
+
+class StartupProfile:
+    """Wall-clock phases of the application start.
+
+    Every ``mark`` closes the phase that began with the previous mark (or
+    with the construction). ``report`` lists the phases and flags those
+    that took longer than their budget.
+    """
+    BUDGETS_MS = {
+        "imports": 400.0,
+        "application": 150.0,
+        "stylesheet": 100.0,
+        "main window": 150.0,
+        "first paint": 100.0,
+        "first data": 200.0,
+    }
+    TOTAL_BUDGET_MS = 1000.0
+
+    def __init__(self, budgets_ms: dict[str, float] = None):
+        self._budgets_ms = self.BUDGETS_MS if budgets_ms is None else budgets_ms
+        self._start = time.perf_counter()
+        self._last = self._start
+        self._phases: list[tuple[str, float]] = []
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self._phases.append((phase, (now - self._last) * 1000))
+        self._last = now
+
+    @property
+    def phases(self) -> list[tuple[str, float]]:
+        return list(self._phases)
+
+    @property
+    def total_ms(self) -> float:
+        return (self._last - self._start) * 1000
+
+    def over_budget(self) -> list[str]:
+        phases = [
+            phase for phase, duration in self._phases
+            if duration > self._budgets_ms.get(phase, float("inf"))
+        ]
+        if self.total_ms > self.TOTAL_BUDGET_MS:
+            phases.append("total")
+        return phases
+
+    def report(self) -> str:
+        over_budget = set(self.over_budget())
+        lines = []
+
+        for phase, duration in self._phases:
+            budget = self._budgets_ms.get(phase)
+            line = f"{phase:<12} {duration:8.1f} ms"
+            if budget is not None:
+                line += f"  (budget {budget:.0f} ms)"
+            if phase in over_budget:
+                line += "  OVER BUDGET"
+            lines.append(line)
+
+        total = f"{'total':<12} {self.total_ms:8.1f} ms  " \
+                f"(budget {self.TOTAL_BUDGET_MS:.0f} ms)"
+        if "total" in over_budget:
+            total += "  OVER BUDGET"
+        lines.append(total)
+
+        return "\n".join(lines)
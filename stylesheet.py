@@ -0,0 +1,107 @@
+import json
+import os
+from importlib.util import find_spec
+from pathlib import Path
+from PySide6.QtCore import QDir, QStandardPaths
+from PySide6.QtGui import QColor, QFontDatabase, QGuiApplication, QPalette
+from PySide6.QtWidgets import QApplication
+
+THEME = "light_blue.xml"
+STYLE = "Fusion"
+FONT_FAMILIES = ("roboto",)
+
+
+def apply_cached_stylesheet(
+    app: QApplication,
+    theme: str = THEME,
+    invert_secondary: bool = False,
+    cache_directory: str = None
+) -> bool:
+    """Applies the qt_material ``theme`` from a stylesheet rendered on an
+    earlier start. qt_material itself (jinja2, icon generation) is only
+    imported when the cache is missing or stale; returns whether the cache
+    was used.
+    """
+    package = Path(find_spec("qt_material").origin).parent
+    directory = Path(cache_directory or _default_cache_directory())
+    stylesheet_path = directory / f"{Path(theme).stem}.qss"
+    metadata_path = directory / f"{Path(theme).stem}.json"
+    key = _cache_key(package, theme, invert_secondary)
+
+    metadata = _read_metadata(metadata_path)
+    hit = metadata.get("key") == key and stylesheet_path.is_file()
+    if hit:
+        stylesheet = stylesheet_path.read_text(encoding="utf-8")
+        primary_color = metadata["primary_color"]
+        _add_fonts(package)
+    else:
+        stylesheet, primary_color = _render(
+            theme, invert_secondary, directory / "icons"
+        )
+        directory.mkdir(parents=True, exist_ok=True)
+        stylesheet_path.write_text(stylesheet, encoding="utf-8")
+        metadata_path.write_text(json.dumps(
+            {"key": key, "primary_color": primary_color}
+        ))
+
+    # What qt_material.apply_stylesheet does besides rendering
+    app.setStyle(STYLE)
+    QDir.addSearchPath("icon", str(directory / "icons"))
+    QDir.addSearchPath("qt_material", str(package / "resources"))
+    _set_text_color(primary_color)
+    app.setStyleSheet(stylesheet)
+
+    return hit
+
+
+def _render(
+    theme: str,
+    invert_secondary: bool,
+    icon_directory: Path
+) -> tuple[str, str]:
+    from qt_material import build_stylesheet, get_theme
+
+    # build_stylesheet also loads the fonts and writes the themed icons
+    stylesheet = build_stylesheet(
+        theme, invert_secondary, parent=str(icon_directory)
+    )
+    if stylesheet is None:
+        raise ValueError(f"Unknown qt_material theme '{theme}'")
+
+    return stylesheet, get_theme(theme, invert_secondary)["primaryColor"]
+
+
+def _cache_key(package: Path, theme: str, invert_secondary: bool) -> str:
+    # The template changes with every qt_material release
+    template = (package / "material.qss.template").stat()
+    return f"{theme}:{invert_secondary}:{template.st_mtime_ns}:{template.st_size}"
+
+
+def _read_metadata(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _add_fonts(package: Path) -> None:
+    for family in FONT_FAMILIES:
+        font_directory = package / "fonts" / family
+        for font in os.listdir(font_directory):
+            if font.endswith(".ttf"):
+                QFontDatabase.addApplicationFont(str(font_directory / font))
+
+
+def _set_text_color(primary_color: str) -> None:
+    palette = QGuiApplication.palette()
+    color = QColor(primary_color)
+    color.setAlpha(92)
+    palette.setColor(QPalette.ColorRole.Text, color)
+    QGuiApplication.setPalette(palette)
+
+
+def _default_cache_directory() -> str:
+    location = QStandardPaths.writableLocation(
+        QStandardPaths.StandardLocation.CacheLocation
+    )
+    return os.path.join(location, "stylesheet")
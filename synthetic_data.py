@@ -0,0 +1,267 @@
+import argparse
+import random
+import sqlite3
+from dataclasses import dataclass, asdict
+from datetime import date, timedelta
+from pathlib import Path
+from database import Database
+from database_access import GameTable, GamePlayerTable, PlayerPenaltiesTable
+from entities import GamePlayers, PlayerPenalties
+
+# The schema template ships next to this module
+TEMPLATE_DATABASE = str(Path(__file__).resolve().parent / "Kegelkasse.db")
+QUANTITY_KIND_ID = 1
+RANGE_KIND_ID = 2
+TEAM_ID = 1
+
+
+@dataclass(frozen=True)
+class SyntheticDataConfig:
+    seasons: int = 3
+    games_per_season: int = 30
+    players: int = 12
+    players_per_game: int = 6
+    penalties: int = 10
+    range_penalties: int = 3
+    seed: int = 1
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def create_database(
+    path: str,
+    config: SyntheticDataConfig = SyntheticDataConfig(),
+    template: str = TEMPLATE_DATABASE
+) -> None:
+    """Creates a database with the schema of ``template`` and random but
+    reproducible content. An existing file at ``path`` is replaced."""
+    for suffix in ("", "-wal", "-shm"):
+        Path(path + suffix).unlink(missing_ok=True)
+
+    _copy_schema(template, path)
+
+    database = Database(path)
+    try:
+        with database.transaction():
+            _SyntheticDataBuilder(database, config).build()
+    finally:
+        database.close()
+
+
+def _copy_schema(template: str, path: str) -> None:
+    uri = Path(template).resolve().as_uri() + "?mode=ro"
+    source = sqlite3.connect(uri, uri=True)
+    target = sqlite3.connect(path)
+
+    try:
+        statements = source.execute(
+            """SELECT sql FROM sqlite_master
+               WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+               ORDER BY CASE type WHEN 'table' THEN 0 ELSE 1 END, rowid"""
+        ).fetchall()
+        schema_version = source.execute("PRAGMA user_version").fetchone()[0]
+
+        with target:
+            for (statement,) in statements:
+                target.execute(statement)
+            target.execute(f"PRAGMA user_version = {int(schema_version)}")
+            # The single CatalogVersion row is data, seeded by migration 7
+            if target.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'CatalogVersion'"
+            ).fetchone():
+                target.execute(
+                    "INSERT INTO CatalogVersion (ID, Version) VALUES (1, 0)"
+                )
+    finally:
+        source.close()
+        target.close()
+
+
+class _SyntheticDataBuilder:
+    def __init__(self, database: Database, config: SyntheticDataConfig):
+        self._database = database
+        self._config = config
+        self._random = random.Random(config.seed)
+        self._game_table = GameTable(database)
+        self._game_player_table = GamePlayerTable(database)
+        self._player_penalty_table = PlayerPenaltiesTable(database)
+
+    def build(self) -> None:
+        self._insert_reference_data()
+        player_ids = self._insert_players()
+        quantity_ids, range_ids = self._insert_penalties()
+
+        for season in range(self._config.seasons):
+            season_id = self._insert_season(season)
+            self._insert_games(season, season_id, player_ids,
+                               quantity_ids, range_ids)
+
+    def _insert_reference_data(self) -> None:
+        self._database.execute_command(
+            """INSERT INTO PenaltyKind (ID, Description, IsRange)
+               VALUES (?, 'Anzahl', 0), (?, 'Bereich', 1)""",
+            (QUANTITY_KIND_ID, RANGE_KIND_ID)
+        )
+        self._database.execute_command(
+            "INSERT INTO Team (ID, TeamName) VALUES (?, 'Synthetik')",
+            (TEAM_ID,)
+        )
+
+    def _insert_players(self) -> list[int]:
+        player_ids = []
+
+        for number in range(1, self._config.players + 1):
+            player_id = self._database.execute_command(
+                "INSERT INTO Player (Name) VALUES (?)", (f"Spieler {number:03d}",)
+            )
+            self._database.execute_command(
+                "INSERT INTO DefaultTeamPlayer (Player, Team) VALUES (?, ?)",
+                (player_id, TEAM_ID)
+            )
+            player_ids.append(player_id)
+
+        return player_ids
+
+    def _insert_penalties(self) -> tuple[list[int], list[int]]:
+        quantity_ids = [
+            self._insert_penalty(
+                f"Strafe {number:02d}",
+                QUANTITY_KIND_ID,
+                self._random.choice((0.1, 0.2, 0.5, 1.0)),
+                None,
+                None
+            )
+            for number in range(1, self._config.penalties + 1)
+        ]
+
+        # Consecutive result bands, the lowest one open to the bottom
+        range_ids = []
+        upper_limit = 200
+        for number in range(1, self._config.range_penalties + 1):
+            lower_limit = None if number == 1 else upper_limit + 1
+            upper_limit += 60
+            range_ids.append(self._insert_penalty(
+                f"Bereich {number:02d}",
+                RANGE_KIND_ID,
+                float(self._config.range_penalties - number + 1),
+                lower_limit,
+                upper_limit
+            ))
+
+        return quantity_ids, range_ids
+
+    def _insert_penalty(
+        self,
+        description: str,
+        kind_id: int,
+        penalty: float,
+        lower_limit: int | None,
+        upper_limit: int | None
+    ) -> int:
+        penalty_id = self._database.execute_command(
+            """INSERT INTO Penalty
+               (Description, PenaltyTypeId, penalty, LowerLimit, UpperLimit)
+               VALUES (?, ?, ?, ?, ?)""",
+            (description, kind_id, penalty, lower_limit, upper_limit)
+        )
+        self._database.execute_command(
+            "INSERT INTO TeamPenalties (Team, Penalty) VALUES (?, ?)",
+            (TEAM_ID, penalty_id)
+        )
+        return penalty_id
+
+    def _insert_season(self, season: int) -> int:
+        year = 2000 + season
+        return self._database.execute_command(
+            "INSERT INTO Seasons (Description) VALUES (?)",
+            (f"{year}/{year + 1}",)
+        )
+
+    def _insert_games(
+        self,
+        season: int,
+        season_id: int,
+        player_ids: list[int],
+        quantity_ids: list[int],
+        range_ids: list[int]
+    ) -> None:
+        first_day = date(2000 + season, 9, 1)
+        players_per_game = min(self._config.players_per_game, len(player_ids))
+
+        for game_day in range(1, self._config.games_per_season + 1):
+            game_date = first_day + timedelta(days=7 * (game_day - 1))
+            game_id = self._game_table.insert(
+                TEAM_ID,
+                game_date.isoformat(),
+                f"Gegner {self._random.randint(1, 40):02d}",
+                game_day,
+                season_id
+            )
+
+            game_players = [
+                self._create_game_player(game_id, player_id)
+                for player_id in sorted(
+                    self._random.sample(player_ids, players_per_game)
+                )
+            ]
+            game_player_ids = self._game_player_table.insert_many(game_players)
+
+            player_penalties = []
+            for game_player_id, game_player in zip(game_player_ids,
+                                                   game_players):
+                player_penalties.extend(
+                    PlayerPenalties(None, game_player_id, penalty_id,
+                                    self._penalty_count(), None)
+                    for penalty_id in quantity_ids
+                )
+                player_penalties.extend(
+                    PlayerPenalties(None, game_player_id, penalty_id,
+                                    game_player.sum_points, None)
+                    for penalty_id in range_ids
+                )
+
+            self._player_penalty_table.insert_many(player_penalties)
+
+    def _create_game_player(self, game_id: int, player_id: int) -> GamePlayers:
+        full = self._random.randint(130, 260)
+        clear = self._random.randint(40, 130)
+        errors = self._random.randint(0, 12)
+        return GamePlayers(None, game_id, player_id, 0, full + clear,
+                           full, clear, errors, True)
+
+    def _penalty_count(self) -> int:
+        # Most penalties are not incurred in a given game
+        if self._random.random() < 0.7:
+            return 0
+        return self._random.randint(1, 4)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Creates a Kegelkasse database filled with synthetic data."
+    )
+    parser.add_argument("path")
+    parser.add_argument("--seasons", type=int, default=3)
+    parser.add_argument("--games-per-season", type=int, default=30)
+    parser.add_argument("--players", type=int, default=12)
+    parser.add_argument("--players-per-game", type=int, default=6)
+    parser.add_argument("--penalties", type=int, default=10)
+    parser.add_argument("--range-penalties", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--template", default=TEMPLATE_DATABASE)
+    arguments = parser.parse_args()
+
+    create_database(
+        arguments.path,
+        SyntheticDataConfig(
+            arguments.seasons,
+            arguments.games_per_season,
+            arguments.players,
+            arguments.players_per_game,
+            arguments.penalties,
+            arguments.range_penalties,
+            arguments.seed
+        ),
+        arguments.template
+    )
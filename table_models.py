@@ -0,0 +1,580 @@
+from typing import Any, Union, TypeVar, Generic
+from collections.abc import Hashable
+from PySide6.QtCore import (
+    QAbstractTableModel,
+    QModelIndex,
+    QPersistentModelIndex,
+    QAbstractListModel
+)
+from PySide6.QtGui import Qt
+from entities import PlayerPenalties, Season, Team
+from calculators import PenaltyCalculator
+from view_data_classes import SumPerPlayer, SeasonStanding
+from query_statistics import StatementStatistics
+from model import PlayerTableModelItem
+from abc import abstractmethod
+
+
+T = TypeVar('T')
+
+
+class ListModel(QAbstractListModel, Generic[T]):
+    def __init__(self, items=None, parent=...):
+        super().__init__(parent)
+        self._items: list[T] = items or []
+        
+    def data(self, index: QModelIndex, role: int = ...) -> Any:
+        if not index.isValid():
+            return None
+        
+        item = self._items[index.row()]
+        
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.get_label(item)
+        elif role == Qt.ItemDataRole.UserRole:
+            return self.get_id(item)
+        
+        return None
+        
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return len(self._items)
+    
+    @abstractmethod
+    def get_label(self, item: T) -> str:
+        pass
+    
+    @abstractmethod
+    def get_id(self, item: T) -> int:
+        pass
+
+
+class SeasonListModel(ListModel[Season]):
+    def __init__(self, items: list[Season] = None, parent=None):
+        super().__init__(items, parent)
+    
+    def get_label(self, item: Season) -> str:
+        return item.name
+    
+    def get_id(self, item: Season) -> int:
+        return item.id
+
+
+class TeamListModel(ListModel[Team]):
+    def __init__(self, items: list[Team] = None, parent=None):
+        super().__init__(items, parent)
+
+    def get_label(self, item: Team) -> str:
+        return item.name
+
+    def get_id(self, item: Team) -> int:
+        return item.id
+
+
+class AbstractTableModel(QAbstractTableModel, Generic[T]):
+    def __init__(self):
+        super().__init__()
+        self._source: list[T] = []
+
+    def get(self, index: int) -> T:
+        return self._source[index]
+
+    def insertRows(self, index, rows, parent=...):
+        if not rows:
+            return False
+
+        position = index.row()
+
+        self.beginInsertRows(parent, position, position + len(rows) - 1)
+        self._source[position:position] = rows
+        self.endInsertRows()
+
+        return True
+
+    def removeRows(self, row, count, parent=...):
+        if row < 0 or count <= 0 or row >= len(self._source):
+            return False
+
+        end_row = min(row + count - 1, len(self._source) - 1)
+        self.beginRemoveRows(QModelIndex(), row, end_row)
+
+        del self._source[row:end_row + 1]
+
+        self.endRemoveRows()
+
+    def remove_all_rows(self):
+        if self._source:
+            self.removeRows(0, len(self._source), QModelIndex())
+
+    def merge_rows(self, rows: list[T]) -> bool:
+        """Brings the model in line with ``rows`` matched by ``row_key``.
+
+        Rows that disappeared are removed, new rows are inserted at their
+        position in ``rows`` and kept rows only emit ``dataChanged`` for the
+        columns that differ. Returns whether rows were inserted or removed.
+        """
+        new_keys = [self.row_key(row) for row in rows]
+        new_by_key = dict(zip(new_keys, rows))
+
+        if len(new_by_key) != len(rows):
+            raise ValueError("merge_rows needs unique row keys")
+
+        kept_keys = [
+            key for key in map(self.row_key, self._source)
+            if key in new_by_key
+        ]
+        if kept_keys != [key for key in new_keys if key in set(kept_keys)]:
+            self.beginResetModel()
+            self._source = list(rows)
+            self.endResetModel()
+            return True
+
+        removed = self._remove_missing_rows(new_by_key)
+        self._update_kept_rows(new_by_key)
+        inserted = self._insert_new_rows(rows, new_keys)
+
+        return removed or inserted
+
+    @abstractmethod
+    def row_key(self, row: T) -> Hashable:
+        pass
+
+    def changed_columns(self, old: T, new: T) -> list[int]:
+        if old == new:
+            return []
+
+        return list(range(self.columnCount()))
+
+    def _remove_missing_rows(self, new_by_key: dict) -> bool:
+        removed = False
+        position = len(self._source) - 1
+
+        # Walk backwards so removing a run does not shift pending positions.
+        while position >= 0:
+            if self.row_key(self._source[position]) in new_by_key:
+                position -= 1
+                continue
+
+            end = position
+            while (
+                position > 0
+                and self.row_key(self._source[position - 1]) not in new_by_key
+            ):
+                position -= 1
+
+            self.removeRows(position, end - position + 1, QModelIndex())
+            removed = True
+            position -= 1
+
+        return removed
+
+    def _update_kept_rows(self, new_by_key: dict) -> None:
+        for position, old in enumerate(self._source):
+            new = new_by_key[self.row_key(old)]
+            columns = self.changed_columns(old, new)
+            self._source[position] = new
+
+            if columns:
+                self.dataChanged.emit(
+                    self.index(position, min(columns)),
+                    self.index(position, max(columns))
+                )
+
+    def _insert_new_rows(self, rows: list[T], new_keys: list) -> bool:
+        existing = {self.row_key(row) for row in self._source}
+        inserted = False
+        position = 0
+
+        while position < len(rows):
+            if new_keys[position] in existing:
+                position += 1
+                continue
+
+            end = position
+            while end < len(rows) and new_keys[end] not in existing:
+                end += 1
+
+            self.insertRows(
+                self.createIndex(position, 0),
+                rows=rows[position:end],
+                parent=QModelIndex()
+            )
+            inserted = True
+            position = end
+
+        return inserted
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return len(self._source)
+  
+
+class SumPerPlayerTablemodel(AbstractTableModel[SumPerPlayer]):
+    PLAYED_COLUMN_INDEX = 5
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 7
+
+    def row_key(self, row: SumPerPlayer) -> int:
+        return row.player_id
+
+    def changed_columns(self, old: SumPerPlayer, new: SumPerPlayer) -> list[int]:
+        return [
+            column for column in range(self.columnCount())
+            if self._display_value(old, column)
+            != self._display_value(new, column)
+        ]
+
+    def data(
+        self,
+        index: Union[QModelIndex, QPersistentModelIndex],
+        role: int = ...
+    ) -> Any:
+        player = self._source[index.row()]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._display_value(player, index.column())
+        if (
+            role == Qt.ItemDataRole.CheckStateRole
+            and index.column() == self.PLAYED_COLUMN_INDEX
+        ):
+            return Qt.CheckState.Checked if True else Qt.CheckState.Unchecked
+
+        return None
+
+    @staticmethod
+    def _display_value(player: SumPerPlayer, column_index: int) -> Any:
+        match column_index:
+            case 0:
+                return player.player_name
+            case 1:
+                return player.full
+            case 2:
+                return player.clear
+            case 3:
+                return player.full + player.clear
+            case 4:
+                return player.errors
+            case 6:
+                return (
+                    f"{player.penalty_sum:.2f} €"
+                )
+
+        return None
+
+    def headerData(
+        self,
+        section: int,
+        orientation: Qt.Orientation,
+        role: int = ...
+    ) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole:
+            if orientation == Qt.Orientation.Horizontal:
+                match section:
+                    case 0:
+                        return "Spieler"
+                    case 1:
+                        return "Volle"
+                    case 2:
+                        return "Abräumen"
+                    case 3:
+                        return "Gesamt"
+                    case 4:
+                        return "Fehler"
+                    case 5:
+                        return "Gespielt"
+                    case 6:
+                        return "Strafe"
+            elif orientation == Qt.Orientation.Vertical:
+                return section + 1
+
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+
+        if index.column() == self.PLAYED_COLUMN_INDEX:
+            flags = flags | Qt.ItemFlag.ItemIsUserCheckable
+
+        return flags
+
+
+class SeasonStandingsTableModel(AbstractTableModel[SeasonStanding]):
+    HEADERS = (
+        "Platz", "Spieler", "Spiele", "Volle", "Abräumen", "Gesamt",
+        "Schnitt", "Fehler", "Strafe"
+    )
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return len(self.HEADERS)
+
+    def row_key(self, row: SeasonStanding) -> int:
+        return row.player_id
+
+    def changed_columns(
+        self,
+        old: SeasonStanding,
+        new: SeasonStanding
+    ) -> list[int]:
+        return [
+            column for column in range(self.columnCount())
+            if self._display_value(old, column)
+            != self._display_value(new, column)
+        ]
+
+    def data(self, index, role=...):
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._display_value(
+                self._source[index.row()], index.column()
+            )
+        elif role == Qt.ItemDataRole.ToolTipRole:
+            return self._running_totals(
+                self._source[index.row()], index.column()
+            )
+
+        return None
+
+    def headerData(self, section, orientation, role=...):
+        if role == Qt.ItemDataRole.DisplayRole:
+            if orientation == Qt.Orientation.Horizontal:
+                return self.HEADERS[section]
+            elif orientation == Qt.Orientation.Vertical:
+                return section + 1
+
+        return None
+
+    @staticmethod
+    def _running_totals(standing: SeasonStanding, column_index: int) -> Any:
+        match column_index:
+            case 5:
+                totals = map(str, standing.running_results)
+            case 8:
+                totals = (f"{total:.2f} €"
+                          for total in standing.running_penalty_sums)
+            case _:
+                return None
+
+        return "Verlauf: " + " → ".join(totals)
+
+    @staticmethod
+    def _display_value(standing: SeasonStanding, column_index: int) -> Any:
+        match column_index:
+            case 0:
+                return standing.result_rank
+            case 1:
+                return standing.player_name
+            case 2:
+                return standing.games
+            case 3:
+                return standing.full
+            case 4:
+                return standing.clear
+            case 5:
+                return standing.result
+            case 6:
+                return f"{standing.average_result:.1f}"
+            case 7:
+                return standing.errors
+            case 8:
+                return f"{standing.penalty_sum:.2f} €"
+
+        return None
+
+
+class QueryStatisticsTableModel(AbstractTableModel[StatementStatistics]):
+    HEADERS = ("Anzahl", "Gesamt", "p50", "p99", "Zeilen", "Anweisung")
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return len(self.HEADERS)
+
+    def row_key(self, row: StatementStatistics) -> str:
+        return row.sql
+
+    def data(self, index, role=...):
+        row = self._source[index.row()]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            match index.column():
+                case 0:
+                    return row.count
+                case 1:
+                    return f"{row.total_ms:.2f} ms"
+                case 2:
+                    return f"{row.p50_ms:.3f} ms"
+                case 3:
+                    return f"{row.p99_ms:.3f} ms"
+                case 4:
+                    return row.rows
+                case 5:
+                    return row.sql
+        if role == Qt.ItemDataRole.ToolTipRole and index.column() == 5:
+            return row.sql
+
+        return None
+
+    def headerData(self, section, orientation, role=...):
+        if role == Qt.ItemDataRole.DisplayRole:
+            if orientation == Qt.Orientation.Horizontal:
+                return self.HEADERS[section]
+            elif orientation == Qt.Orientation.Vertical:
+                return section + 1
+
+        return None
+
+
+class PlayerPenaltiesTableModel(AbstractTableModel[PlayerPenalties]):
+    EDITABLE_COLUMN = 1
+
+    def __init__(self, calculator: PenaltyCalculator):
+        super().__init__()
+        self._calculator = calculator
+
+    def columnCount(self, parent=...):
+        return 3
+
+    def headerData(self, section, orientation, role=...):
+        if role == Qt.ItemDataRole.DisplayRole:
+            if orientation == Qt.Orientation.Horizontal:
+                match section:
+                    case 0:
+                        return "Regel"
+                    case 1:
+                        return "Anzahl"
+                    case 2:
+                        return "Summe"
+            elif orientation == Qt.Orientation.Vertical:
+                return section + 1
+
+    def data(self, index, role=...):
+        row = self._source[index.row()]
+        column_index = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            match column_index:
+                case 0:
+                    return row.penalty_navigation.description
+                case 1:
+                    return row.value
+                case 2:
+                    total = self._calculator.calculate_penalty(
+                        row.penalty, row.value
+                    )
+                    return f"{total:.2f} €"
+
+        return None
+
+    def setData(self, index, value, role=...):
+        new_value = int(value)
+        index_row = index.row()
+        index_column = index.column()
+
+        if index_column == self.EDITABLE_COLUMN:
+            if role in [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole]:
+                self._source[index_row].value = new_value
+                roles = [role]
+                self.dataChanged.emit(index, index, roles)
+                pay_index = self.index(
+                    index_row, index_column + 1, QModelIndex()
+                )
+                self.dataChanged.emit(pay_index, pay_index, roles)
+
+        return True
+
+    def flags(self, index):
+        flags = super().flags(index)
+
+        if index.column() == self.EDITABLE_COLUMN:
+            current_row = self._source[index.row()]
+
+            if not (
+                current_row.penalty_navigation.get_value_by_parent
+                or self._calculator.is_range(current_row.penalty)
+            ):
+                flags = flags | Qt.ItemFlag.ItemIsEditable
+
+        return flags
+
+    def get_rowindex_of_error_row(self) -> int:
+        for index, row in enumerate(self._source):
+            if (
+                row.penalty_navigation.get_value_by_parent
+                and not self._calculator.is_range(row.penalty)
+            ):
+                return index
+
+        return -1
+
+    def set_range_values(self, value: int) -> None:
+        for index_row, row in enumerate(self._source):
+            if self._calculator.is_range(row.penalty) and row.value != value:
+                row.value = value
+                self.dataChanged.emit(
+                    self.index(index_row, self.EDITABLE_COLUMN, QModelIndex()),
+                    self.index(index_row, self.EDITABLE_COLUMN + 1, QModelIndex()),
+                    [Qt.ItemDataRole.DisplayRole]
+                )
+
+
+class PlayerTableModel(AbstractTableModel[PlayerTableModelItem]):
+    def headerData(
+        self,
+        section: int,
+        orientation: Qt.Orientation,
+        role: int = ...
+    ) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole:
+            if orientation == Qt.Orientation.Horizontal:
+                match section:
+                    case 0:
+                        return ""
+                    case 1:
+                        return "Spieler"
+            elif orientation == Qt.Orientation.Vertical:
+                return section + 1
+
+        return None
+
+    def columnCount(self, parent=...):
+        return 2
+    
+    def data(
+        self,
+        index: Union[QModelIndex, QPersistentModelIndex],
+        role: int = ...
+    ) -> Any:
+        row = self._source[index.row()]
+        column_index = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column_index == 1:
+                return row.player_name
+        
+        if (
+            role == Qt.ItemDataRole.CheckStateRole
+            and column_index == 0
+        ):
+            return Qt.CheckState.Checked if row.is_playing else Qt.CheckState.Unchecked
+
+        return None
+    
+    def setData(self, index, value, role=...):
+        if not index.isValid() or index.column() != 0:
+            return False
+        
+        if role in [Qt.ItemDataRole.CheckStateRole, Qt.ItemDataRole.DisplayRole]:
+            row = self._source[index.row()]
+            row.is_playing = (value == Qt.CheckState.Checked.value)
+            self.dataChanged.emit(index, index, [role])
+            return True
+        
+        return False
+    
+    def flags(self, index: QModelIndex):
+        flags = super().flags(index)
+        
+        if index.column() == 0:
+            flags = flags | Qt.ItemFlag.ItemIsUserCheckable
+
+        return flags
+    
+    @property
+    def is_any_player_selected(self) -> bool:
+        return any(item.is_playing for item in self._source)
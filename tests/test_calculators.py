@@ -0,0 +1,225 @@
+import os
+import re
+import tempfile
+import unittest
+from batch_calculator import recompute_penalty_totals
+from calculators import PenaltyCalculator, RangeCalculator
+from database import Database
+from database_access import PenaltyKindTable, PenaltyTable
+from entities import Penalty, PenaltyKind
+from migrations import MIGRATIONS, backfill_aggregates
+from synthetic_data import RANGE_KIND_ID, SyntheticDataConfig, create_database
+
+QUANTITY = PenaltyKind(1, "Anzahl", False)
+RANGE = PenaltyKind(2, "Stufe", True)
+
+
+def penalty(id, amount, lower=None, upper=None, kind=RANGE) -> Penalty:
+    return Penalty(id, f"Strafe {id}", kind.id, amount, lower, upper, False,
+                   kind)
+
+
+class RangeCalculatorTest(unittest.TestCase):
+    def setUp(self):
+        self.under_300 = penalty(1, 1.0, upper=299)
+        self.under_250 = penalty(2, 2.0, upper=249)
+        self.band = penalty(3, 0.5, lower=240, upper=259)
+        self.from_500 = penalty(4, 3.0, lower=500)
+        self.from_600 = penalty(5, 4.0, lower=600)
+        self.calculator = RangeCalculator([
+            self.under_300, self.under_250, self.band, self.from_500,
+            self.from_600, penalty(6, 9.0, kind=QUANTITY)
+        ])
+
+    def test_charges_only_the_narrowest_tier(self):
+        cases = {
+            200: self.under_250, 249: self.under_250, 250: self.band,
+            260: self.under_300, 299: self.under_300, 550: self.from_500,
+            600: self.from_600
+        }
+        for value, tier in cases.items():
+            with self.subTest(value=value):
+                self.assertEqual(self.calculator.calculate(value), tier.penalty)
+                for rule in (self.under_300, self.under_250, self.band,
+                             self.from_500, self.from_600):
+                    self.assertEqual(
+                        self.calculator.calculate_penalty(rule.id, value),
+                        rule.penalty if rule is tier else 0.0
+                    )
+
+    def test_limits_are_inclusive(self):
+        self.assertEqual(self.calculator.calculate(259), 0.5)
+        self.assertEqual(self.calculator.calculate(260), 1.0)
+        self.assertEqual(self.calculator.calculate(499), 0.0)
+        self.assertEqual(self.calculator.calculate(500), 3.0)
+
+    def test_unrecorded_and_uncovered_values_are_free(self):
+        self.assertEqual(self.calculator.calculate(0), 0.0)
+        self.assertEqual(self.calculator.calculate(-5), 0.0)
+        self.assertEqual(self.calculator.calculate(300), 0.0)
+        self.assertEqual(self.calculator.calculate_penalty(6, 100), 0.0)
+
+    def test_equal_tiers_charge_the_lowest_id(self):
+        calculator = RangeCalculator([
+            penalty(8, 2.0, upper=100), penalty(7, 1.0, upper=100)
+        ])
+        self.assertEqual(calculator.calculate(50), 1.0)
+        self.assertEqual(calculator.calculate_penalty(8, 50), 0.0)
+
+    def test_calculate_many_matches_calculate(self):
+        values = list(range(-1, 700, 7))
+        self.assertEqual(
+            self.calculator.calculate_many(values),
+            [self.calculator.calculate(value) for value in values]
+        )
+
+    def test_without_range_penalties(self):
+        calculator = RangeCalculator([penalty(6, 9.0, kind=QUANTITY)])
+        self.assertEqual(calculator.calculate(250), 0.0)
+
+
+class PenaltyTotalsTest(unittest.TestCase):
+    """The trigger-maintained PlayerTotals follow the same tier rule."""
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "totals.db")
+        create_database(path, SyntheticDataConfig(seasons=1, games_per_season=4))
+
+        self.database = Database(path, reader_count=0)
+        self.addCleanup(self.database.close)
+
+    def add_tier(self, description, amount, lower, upper) -> None:
+        self.database.execute_command(
+            """INSERT INTO Penalty (Description, PenaltyTypeId, penalty,
+                                    LowerLimit, UpperLimit, GetsValueByParent)
+               VALUES (?, ?, ?, ?, ?, 0)""",
+            (description, RANGE_KIND_ID, amount, lower, upper)
+        )
+        self.database.execute_command(
+            """INSERT INTO PlayerPenalties (GamePlayer, Penalty, Value)
+               SELECT ID, last_insert_rowid(),
+                      COALESCE("Full", 0) + COALESCE(Clear, 0)
+               FROM GamePlayers"""
+        )
+
+    def expected_totals(self) -> dict[int, float]:
+        kinds = {k.id: k for k in PenaltyKindTable(self.database).get_all()}
+        penalties = PenaltyTable(self.database).get_all()
+        for p in penalties:
+            p.type_navigation = kinds[p.type]
+        calculator = PenaltyCalculator(penalties)
+
+        expected = {}
+        for game_player, penalty_id, value in self.database.execute_query(
+            "SELECT GamePlayer, Penalty, Value FROM PlayerPenalties"
+        ):
+            expected[game_player] = expected.get(game_player, 0.0) + (
+                calculator.calculate_penalty(penalty_id, value)
+            )
+        return expected
+
+    def stored_totals(self) -> dict[int, float]:
+        return dict(self.database.execute_query(
+            "SELECT GamePlayer, PenaltySum FROM PlayerTotals"
+        ))
+
+    def assert_totals_match(self, stored: dict, expected: dict) -> None:
+        for game_player, total in expected.items():
+            self.assertAlmostEqual(stored[game_player], total, places=2)
+
+    def assert_totals_match_calculator(self) -> None:
+        self.assert_totals_match(self.stored_totals(), self.expected_totals())
+
+    def test_overlapping_tiers(self):
+        with self.database.transaction():
+            self.add_tier("unter 300", 1.0, None, 299)
+            self.add_tier("unter 250", 2.0, None, 249)
+        self.assert_totals_match_calculator()
+
+        with self.database.transaction():
+            self.database.execute_command(
+                "UPDATE Penalty SET UpperLimit = 199 "
+                "WHERE Description = 'unter 250'"
+            )
+        self.assert_totals_match_calculator()
+
+        with self.database.transaction():
+            self.database.execute_command(
+                "DELETE FROM PlayerPenalties WHERE Penalty IN ("
+                "SELECT ID FROM Penalty WHERE Description = 'unter 250')"
+            )
+            self.database.execute_command(
+                "DELETE FROM Penalty WHERE Description = 'unter 250'"
+            )
+        self.assert_totals_match_calculator()
+
+
+    def test_every_totals_path_charges_the_narrowest_tier(self):
+        with self.database.transaction():
+            self.add_tier("unter 300", 1.0, None, 299)
+            self.add_tier("unter 250", 2.0, None, 249)
+        expected = self.expected_totals()
+        self.assert_totals_match(self.stored_totals(), expected)
+
+        # The full recompute of the latest migration
+        recompute = MIGRATIONS[-1].statements[-1]
+        with self.database.transaction():
+            self.database.execute_command(
+                "UPDATE PlayerTotals SET PenaltySum = -1"
+            )
+            self.database.execute_command(recompute)
+        self.assert_totals_match(self.stored_totals(), expected)
+
+        # The back-fill of deferred imports
+        with self.database.transaction():
+            self.database.execute_command("DELETE FROM PlayerTotals")
+            self.database.execute_command("DELETE FROM GameTotals")
+            for statement in backfill_aggregates():
+                self.database.execute_command(
+                    statement,
+                    {"first_game": 0, "first_game_player": 0}
+                    if ":" in statement else ()
+                )
+        self.assert_totals_match(self.stored_totals(), expected)
+
+        batch = recompute_penalty_totals(self.database).per_game_player
+        self.assert_totals_match(batch.as_dict(), expected)
+
+    def test_no_totals_statement_uses_another_tier_rule(self):
+        def normalize(sql: str) -> str:
+            return " ".join(sql.split())
+
+        # The tier clause every current PlayerTotals computation contains
+        tier_rule = normalize(
+            "AND NOT EXISTS ( SELECT 1 FROM Penalty o "
+            "INNER JOIN PenaltyKind ok ON o.PenaltyTypeId = ok.ID "
+            "WHERE ok.IsRange AND o.ID <> p.ID"
+        )
+        writes_totals = re.compile(
+            r"(UPDATE PlayerTotals SET PenaltySum|INSERT INTO PlayerTotals)"
+        )
+
+        statements = [
+            (name, sql) for name, sql in self.database.execute_query(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'trigger'"
+            )
+        ]
+        statements += [
+            ("backfill_aggregates", sql) for sql in backfill_aggregates()
+        ]
+        statements += [
+            (f"migration {MIGRATIONS[-1].version}", sql)
+            for sql in MIGRATIONS[-1].statements
+        ]
+
+        checked = 0
+        for name, sql in statements:
+            sql = normalize(sql)
+            if writes_totals.search(sql) and "PlayerPenalties" in sql:
+                checked += 1
+                self.assertIn(tier_rule, sql, name)
+        self.assertGreater(checked, 0)
+
+if __name__ == "__main__":
+    unittest.main()
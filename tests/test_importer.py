@@ -0,0 +1,196 @@
+import os
+import tempfile
+import unittest
+from calculators import PenaltyCalculator
+from database import Database
+from database_access import PenaltyKindTable, PenaltyTable
+from importer import GameImporter, ImportedGame, ImportedPlayer, ImportValidationError
+from synthetic_data import (
+    RANGE_KIND_ID,
+    SyntheticDataConfig,
+    TEAM_ID,
+    create_database
+)
+
+
+class GameImporterTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "import.db")
+        create_database(path, SyntheticDataConfig(seasons=1, games_per_season=2))
+
+        self.database = Database(path, reader_count=0)
+        self.addCleanup(self.database.close)
+
+    def game(self, **changes) -> ImportedGame:
+        player = ImportedPlayer(
+            "Spieler 001", 120, 45, 3, {"Strafe 01": 2}, line=2
+        )
+        game = ImportedGame("2001-05-01", "Gegner", 1, "2000/2001", [player], 1)
+        for name, value in changes.items():
+            setattr(game, name, value)
+        return game
+
+    def count_games(self) -> int:
+        return self.database.execute_single_query("SELECT COUNT(*) FROM Game")[0]
+
+    def assert_rejected(self, importer: GameImporter, game: ImportedGame,
+                        message: str) -> None:
+        games = self.count_games()
+        with self.assertRaises(ImportValidationError) as context:
+            importer.import_games([game])
+        self.assertTrue(
+            any(message in error for error in context.exception.errors),
+            context.exception.errors
+        )
+        self.assertEqual(self.count_games(), games)
+
+    def test_imports_valid_game(self):
+        games = self.count_games()
+        report = GameImporter(self.database, TEAM_ID).import_games([self.game()])
+
+        self.assertEqual(report.games, 1)
+        self.assertEqual(report.game_players, 1)
+        self.assertEqual(self.count_games(), games + 1)
+
+    def test_rejects_unknown_team(self):
+        self.assert_rejected(
+            GameImporter(self.database, 999), self.game(), "unknown team 999"
+        )
+
+    def test_rejects_bool_team(self):
+        # True == 1, which would otherwise pass for team 1
+        self.assert_rejected(
+            GameImporter(self.database, True), self.game(), "unknown team True"
+        )
+
+    def test_rejects_bool_counts(self):
+        game = self.game()
+        game.players[0].errors = True
+        game.players[0].penalties = {"Strafe 01": False}
+        importer = GameImporter(self.database, TEAM_ID)
+
+        self.assert_rejected(importer, game, "invalid errors 'True'")
+        self.assert_rejected(importer, game, "invalid count 'False'")
+
+    def test_rejects_bool_gameday(self):
+        self.assert_rejected(
+            GameImporter(self.database, TEAM_ID), self.game(gameday=True),
+            "invalid gameday 'True'"
+        )
+
+    def test_rejects_unknown_references(self):
+        game = self.game(season="1999/2000")
+        game.players[0].name = "Niemand"
+        importer = GameImporter(self.database, TEAM_ID)
+
+        self.assert_rejected(importer, game, "unknown season '1999/2000'")
+        self.assert_rejected(importer, game, "unknown player 'Niemand'")
+
+    def test_rejects_derived_penalty(self):
+        game = self.game()
+        game.players[0].penalties = {"Bereich 01": 1}
+
+        self.assert_rejected(
+            GameImporter(self.database, TEAM_ID), game, "is derived"
+        )
+
+
+class DeferredImportTest(unittest.TestCase):
+    """A deferred import back-fills the same totals the triggers keep."""
+    # "Bereich 01" (up to 260) overlaps both; only the narrowest is charged
+    TIERS = (("unter 300", 1.0, 299), ("unter 250", 2.0, 249))
+    RESULTS = (150, 200, 249, 260, 299, 320)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def import_into(self, name: str, defer: bool) -> Database:
+        path = os.path.join(self.directory, name)
+        create_database(path, SyntheticDataConfig(seasons=1, games_per_season=2))
+        database = Database(path, reader_count=0)
+        self.addCleanup(database.close)
+
+        with database.transaction():
+            for description, amount, upper in self.TIERS:
+                database.execute_command(
+                    """INSERT INTO Penalty (Description, PenaltyTypeId,
+                                            penalty, UpperLimit,
+                                            GetsValueByParent)
+                       VALUES (?, ?, ?, ?, 0)""",
+                    (description, RANGE_KIND_ID, amount, upper)
+                )
+
+        players = [
+            ImportedPlayer(f"Spieler {number:03d}", result - 60, 60, 2,
+                           {"Strafe 01": number}, line=number)
+            for number, result in enumerate(self.RESULTS, start=1)
+        ]
+        games = [
+            ImportedGame("2001-05-01", "Gegner", 1, "2000/2001", players, 1),
+            ImportedGame("2001-05-08", "Gegner", 2, "2000/2001",
+                         players[::2], 2)
+        ]
+        GameImporter(database, TEAM_ID, defer_maintenance=defer).import_games(
+            games
+        )
+        return database
+
+    @staticmethod
+    def totals(database: Database) -> tuple[dict, dict, dict]:
+        return tuple(
+            dict(database.execute_query(
+                f"SELECT {key}, PenaltySum FROM {table} ORDER BY {key}"
+            ))
+            for table, key in (("PlayerTotals", "GamePlayer"),
+                               ("GameTotals", "Game"),
+                               ("TeamTotals", "Team"))
+        )
+
+    def expected_player_totals(self, database: Database) -> dict:
+        kinds = {k.id: k for k in PenaltyKindTable(database).get_all()}
+        penalties = PenaltyTable(database).get_all()
+        for p in penalties:
+            p.type_navigation = kinds[p.type]
+        calculator = PenaltyCalculator(penalties)
+
+        expected = {}
+        for game_player, penalty_id, value in database.execute_query(
+            "SELECT GamePlayer, Penalty, Value FROM PlayerPenalties"
+        ):
+            expected[game_player] = expected.get(game_player, 0.0) + (
+                calculator.calculate_penalty(penalty_id, value)
+            )
+        return expected
+
+    def test_deferred_totals_match_the_triggers(self):
+        deferred = self.import_into("deferred.db", True)
+        immediate = self.import_into("immediate.db", False)
+        deferred_totals = self.totals(deferred)
+
+        for stored, maintained in zip(deferred_totals, self.totals(immediate)):
+            self.assertEqual(stored.keys(), maintained.keys())
+            for key in stored:
+                self.assertAlmostEqual(stored[key], maintained[key], places=2)
+
+        player_totals, game_totals, team_totals = deferred_totals
+        for game_player, total in self.expected_player_totals(deferred).items():
+            self.assertAlmostEqual(player_totals[game_player], total, places=2)
+
+        game_sums = dict(deferred.execute_query(
+            """SELECT gp.Game, SUM(pt.PenaltySum) FROM GamePlayers gp
+               INNER JOIN PlayerTotals pt ON pt.GamePlayer = gp.ID
+               GROUP BY gp.Game"""
+        ))
+        for game, total in game_sums.items():
+            self.assertAlmostEqual(game_totals[game], total, places=2)
+        self.assertAlmostEqual(
+            team_totals[TEAM_ID], sum(game_totals.values()), places=2
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
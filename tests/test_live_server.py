@@ -0,0 +1,268 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+from clubs import Club
+from live_server import WEBSOCKET_GUID, LiveScoringServer
+from model import AsyncMainWindowModel
+from synthetic_data import SyntheticDataConfig, create_database
+
+CONFIG = SyntheticDataConfig(seasons=1, games_per_season=2)
+
+
+async def http(
+    port: int,
+    method: str,
+    path: str,
+    body: dict = None,
+    headers: dict = None
+) -> tuple[int, object]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = json.dumps(body).encode() if body is not None else b""
+    head = {
+        "Host": "localhost",
+        "Content-Length": str(len(data)),
+        "Connection": "close",
+        **(headers or {})
+    }
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\n".encode()
+        + "".join(f"{k}: {v}\r\n" for k, v in head.items()).encode()
+        + b"\r\n" + data
+    )
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+
+    status_line, _, payload = response.partition(b"\r\n\r\n")
+    return int(status_line.split()[1]), json.loads(payload)
+
+
+async def websocket(
+    port: int
+) -> tuple[asyncio.StreamReader, asyncio.StreamWriter, bytes, bytes]:
+    """Opens /ws; returns the streams, the response head and the expected
+    Sec-WebSocket-Accept value."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write((
+        "GET /ws HTTP/1.1\r\nHost: localhost\r\n"
+        "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+    ).encode())
+    head = await reader.readuntil(b"\r\n\r\n")
+    accept = base64.b64encode(
+        hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()
+    )
+    return reader, writer, head, accept
+
+
+async def receive(reader: asyncio.StreamReader) -> tuple[int, bytes]:
+    first, second = await asyncio.wait_for(reader.readexactly(2), 5)
+    length = second & 0x7F
+    if length == 126:
+        length = int.from_bytes(await reader.readexactly(2), "big")
+    return first & 0x0F, await reader.readexactly(length)
+
+
+def masked(opcode: int, payload: bytes) -> bytes:
+    mask = os.urandom(4)
+    return (
+        bytes([0x80 | opcode, 0x80 | len(payload)]) + mask
+        + bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+    )
+
+
+class LiveScoringServerTest(unittest.IsolatedAsyncioTestCase):
+    token = None
+
+    async def asyncSetUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        clubs = []
+        for name in ("heim", "gast"):
+            path = os.path.join(directory.name, f"{name}.db")
+            create_database(path, CONFIG)
+            clubs.append(Club(name, path))
+
+        self.model = AsyncMainWindowModel(
+            clubs, os.path.join(directory.name, "backups")
+        )
+        self.server = LiveScoringServer(self.model, port=0, token=self.token)
+        await self.server.start()
+        self.port = self.server.port
+
+        status, self.last_game = await self.get("/api/games/last")
+        self.assertEqual(status, 200)
+        self.game_id = self.last_game["game"]["id"]
+        self.player_ids = [p["player_id"] for p in self.last_game["players"]]
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        self.model.close()
+
+    def get(self, path: str, **kwargs):
+        return http(self.port, "GET", path, **kwargs)
+
+    def patch(self, player_id: int, body: dict, club: str = "heim"):
+        return http(
+            self.port,
+            "PATCH",
+            f"/api/games/{self.game_id}/players/{player_id}",
+            {"club": club, **body}
+        )
+
+
+class LiveScoringApiTest(LiveScoringServerTest):
+    async def test_get_game(self):
+        self.assertEqual(self.last_game["club"], "heim")
+        self.assertEqual(len(self.player_ids), CONFIG.players_per_game)
+
+        status, game = await self.get(f"/api/games/{self.game_id}")
+        self.assertEqual(status, 200)
+        self.assertEqual(game, self.last_game)
+
+        status, _ = await self.get("/api/games/999999")
+        self.assertEqual(status, 404)
+
+    async def test_get_penalties(self):
+        status, penalties = await self.get("/api/penalties")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            len(penalties), CONFIG.penalties + CONFIG.range_penalties
+        )
+        self.assertEqual(
+            sum(p["is_range"] for p in penalties), CONFIG.range_penalties
+        )
+
+    async def test_get_game_player(self):
+        player_id = self.player_ids[0]
+        status, game_player = await self.get(
+            f"/api/games/{self.game_id}/players/{player_id}"
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(game_player["club"], "heim")
+        self.assertEqual(game_player["player"], player_id)
+        self.assertEqual(
+            game_player["total"], game_player["full"] + game_player["clear"]
+        )
+        self.assertAlmostEqual(
+            game_player["penalty_sum"],
+            sum(p["amount"] for p in game_player["penalties"])
+        )
+
+    async def test_concurrent_patches_share_one_transaction(self):
+        batches = []
+        apply_edits = self.model.apply_game_player_edits
+
+        async def counting(edits, club=None):
+            batches.append(len(edits))
+            return await apply_edits(edits, club)
+
+        self.model.apply_game_player_edits = counting
+
+        responses = await asyncio.gather(*(
+            self.patch(player_id, {"full": 150 + i, "clear": 50, "errors": 1})
+            for i, player_id in enumerate(self.player_ids)
+        ))
+
+        self.assertEqual([status for status, _ in responses],
+                         [200] * len(self.player_ids))
+        self.assertEqual(batches, [len(self.player_ids)])
+        for i, (_, game_player) in enumerate(responses):
+            self.assertEqual(game_player["total"], 200 + i)
+            self.assertEqual(game_player["errors"], 1)
+
+        _, game = await self.get(f"/api/games/{self.game_id}")
+        self.assertEqual(
+            game["result"]["totalResult"],
+            sum(200 + i for i in range(len(self.player_ids)))
+        )
+
+    async def test_rejects_negative_value(self):
+        status, error = await self.patch(self.player_ids[0], {"full": -1})
+
+        self.assertEqual(status, 400)
+        self.assertEqual(error["error"], "Invalid value -1")
+
+    async def test_rejects_unknown_player(self):
+        status, _ = await self.patch(999999, {"full": 10})
+
+        self.assertEqual(status, 404)
+
+    async def test_rejects_edit_for_another_club(self):
+        await self.model.switch_club("gast")
+
+        status, error = await self.patch(self.player_ids[0], {"full": 10})
+
+        self.assertEqual(status, 409)
+        self.assertIn("gast", error["error"])
+
+    async def test_websocket_pushes_changes(self):
+        reader, writer, head, accept = await websocket(self.port)
+        self.addAsyncCleanup(writer.wait_closed)
+        self.addCleanup(writer.close)
+
+        self.assertTrue(head.startswith(b"HTTP/1.1 101 "))
+        self.assertIn(b"Sec-WebSocket-Accept: " + accept, head)
+        opcode, hello = await receive(reader)
+        self.assertEqual(opcode, 0x1)
+        self.assertEqual(json.loads(hello), {"type": "hello", "club": "heim"})
+
+        status, _ = await self.patch(self.player_ids[0], {"errors": 7})
+        self.assertEqual(status, 200)
+
+        opcode, message = await receive(reader)
+        self.assertEqual(opcode, 0x1)
+        self.assertEqual(json.loads(message), {
+            "type": "games_changed", "club": "heim",
+            "game_ids": [self.game_id]
+        })
+
+        writer.write(masked(0x9, b"ping"))
+        self.assertEqual(await receive(reader), (0xA, b"ping"))
+        writer.write(masked(0x8, (1000).to_bytes(2, "big")))
+        self.assertEqual(
+            await receive(reader), (0x8, (1000).to_bytes(2, "big"))
+        )
+
+
+class LiveScoringTokenTest(LiveScoringServerTest):
+    token = "geheim"
+
+    def get(self, path: str, **kwargs):
+        kwargs.setdefault("headers", {"Authorization": f"Bearer {self.token}"})
+        return super().get(path, **kwargs)
+
+    async def test_requires_token(self):
+        status, _ = await self.get("/api/penalties", headers={})
+        self.assertEqual(status, 401)
+
+        status, _ = await self.get(
+            "/api/penalties", headers={"Authorization": "Bearer falsch"}
+        )
+        self.assertEqual(status, 401)
+
+        status, _ = await self.get(f"/api/penalties?token={self.token}",
+                                   headers={})
+        self.assertEqual(status, 200)
+
+    async def test_websocket_requires_token(self):
+        reader, writer, head, _ = await websocket(self.port)
+        writer.close()
+
+        self.assertTrue(head.startswith(b"HTTP/1.1 401 "))
+
+    def test_network_host_requires_token(self):
+        with self.assertRaises(ValueError):
+            LiveScoringServer(self.model, host="0.0.0.0")
+
+
+if __name__ == "__main__":
+    unittest.main()
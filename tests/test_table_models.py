@@ -0,0 +1,141 @@
+import unittest
+from dataclasses import dataclass, replace
+from PySide6.QtCore import QCoreApplication, QModelIndex
+from PySide6.QtGui import Qt
+from table_models import AbstractTableModel, SeasonStandingsTableModel
+from view_data_classes import SeasonStanding
+
+
+def setUpModule():
+    global application
+    application = QCoreApplication.instance() or QCoreApplication([])
+
+
+@dataclass
+class Row:
+    key: int
+    value: str
+
+
+class RowTableModel(AbstractTableModel[Row]):
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 2
+
+    def row_key(self, row: Row) -> int:
+        return row.key
+
+
+class MergeRowsTest(unittest.TestCase):
+    def setUp(self):
+        self.model = RowTableModel()
+        self.model.merge_rows([Row(key, str(key)) for key in range(1, 7)])
+        self.events = []
+
+        self.model.rowsInserted.connect(
+            lambda parent, first, last: self.events.append(
+                ("inserted", first, last)
+            )
+        )
+        self.model.rowsRemoved.connect(
+            lambda parent, first, last: self.events.append(
+                ("removed", first, last)
+            )
+        )
+        self.model.dataChanged.connect(
+            lambda top_left, bottom_right, roles: self.events.append(
+                ("changed", top_left.row(), bottom_right.row())
+            )
+        )
+        self.model.modelReset.connect(lambda: self.events.append(("reset",)))
+
+    def keys(self) -> list[int]:
+        return [
+            self.model.get(row).key for row in range(self.model.rowCount())
+        ]
+
+    def test_changed_rows_only_emit_data_changed(self):
+        rows = [Row(key, str(key)) for key in range(1, 7)]
+        rows[2] = Row(3, "drei")
+
+        self.assertFalse(self.model.merge_rows(rows))
+        self.assertEqual(self.events, [("changed", 2, 2)])
+        self.assertEqual(self.model.get(2).value, "drei")
+
+    def test_unchanged_rows_emit_nothing(self):
+        rows = [Row(key, str(key)) for key in range(1, 7)]
+
+        self.assertFalse(self.model.merge_rows(rows))
+        self.assertEqual(self.events, [])
+
+    def test_removes_runs_of_missing_rows(self):
+        rows = [Row(key, str(key)) for key in (1, 4, 6)]
+
+        self.assertTrue(self.model.merge_rows(rows))
+        self.assertEqual(self.keys(), [1, 4, 6])
+        self.assertEqual(self.events, [("removed", 4, 4), ("removed", 1, 2)])
+
+    def test_inserts_new_rows_at_their_position(self):
+        rows = [Row(key, str(key)) for key in (0, 1, 2, 3, 10, 11, 4, 5, 6, 7)]
+
+        self.assertTrue(self.model.merge_rows(rows))
+        self.assertEqual(self.keys(), [0, 1, 2, 3, 10, 11, 4, 5, 6, 7])
+        self.assertEqual(
+            self.events,
+            [("inserted", 0, 0), ("inserted", 4, 5), ("inserted", 9, 9)]
+        )
+
+    def test_removes_updates_and_inserts_together(self):
+        rows = [Row(1, "eins"), Row(3, "3"), Row(8, "8"), Row(6, "6")]
+
+        self.assertTrue(self.model.merge_rows(rows))
+        self.assertEqual(self.keys(), [1, 3, 8, 6])
+        self.assertIn(("changed", 0, 0), self.events)
+        self.assertEqual(self.model.get(0).value, "eins")
+
+    def test_reordered_rows_reset_the_model(self):
+        rows = [Row(key, str(key)) for key in (2, 1, 3, 4, 5, 6)]
+
+        self.assertTrue(self.model.merge_rows(rows))
+        self.assertEqual(self.events, [("reset",)])
+        self.assertEqual(self.keys(), [2, 1, 3, 4, 5, 6])
+
+    def test_rejects_duplicate_keys(self):
+        with self.assertRaises(ValueError):
+            self.model.merge_rows([Row(1, "a"), Row(1, "b")])
+        self.assertEqual(self.keys(), [1, 2, 3, 4, 5, 6])
+
+    def test_merging_nothing_removes_everything(self):
+        self.assertTrue(self.model.merge_rows([]))
+        self.assertEqual(self.model.rowCount(), 0)
+
+
+class SeasonStandingsTableModelTest(unittest.TestCase):
+    def setUp(self):
+        self.standing = SeasonStanding(
+            1, 7, "Spieler 007", 2, 300, 120, 420, 5, 1.5, 210.0, 2.5, 1, 2,
+            (200, 420), (0.5, 1.5)
+        )
+        self.model = SeasonStandingsTableModel()
+        self.model.merge_rows([self.standing])
+
+    def test_changed_columns_follow_the_display_values(self):
+        new = replace(self.standing, average_result=210.04, errors=6)
+
+        self.assertEqual(self.model.changed_columns(self.standing, new), [7])
+
+    def test_running_totals_are_shown_as_tooltip(self):
+        tooltip = Qt.ItemDataRole.ToolTipRole
+
+        self.assertEqual(
+            self.model.data(self.model.index(0, 5), tooltip),
+            "Verlauf: 200 → 420"
+        )
+        self.assertEqual(
+            self.model.data(self.model.index(0, 8), tooltip),
+            "Verlauf: 0.50 € → 1.50 €"
+        )
+        self.assertIsNone(self.model.data(self.model.index(0, 1), tooltip))
+
+
+if __name__ == "__main__":
+    unittest.main()
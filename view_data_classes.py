@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class SumPerPlayer:
     game_id: int
     date: str
@@ -16,22 +16,69 @@ class SumPerPlayer:
     result: int
 
 
-@dataclass
+@dataclass(slots=True)
 class SumPerTeam:
     team_name: str
     penalty_sum: float
 
 
-@dataclass
+@dataclass(slots=True)
 class SumPerGame:
     game_id: int
     penalty_sum: float
 
 
-@dataclass
+@dataclass(slots=True)
 class ResultOfGame:
     id: int
     totalFull: int
     totalClear: int
     totalResult: int
     totalErrors: int
+
+
+@dataclass(slots=True)
+class GameSnapshot:
+    game_id: int
+    sum_per_player: list[SumPerPlayer]
+    result: ResultOfGame
+    penalty_sum: SumPerGame
+
+
+@dataclass(slots=True)
+class SeasonStanding:
+    season_id: int
+    player_id: int
+    player_name: str
+    games: int
+    full: int
+    clear: int
+    result: int
+    errors: int
+    penalty_sum: float
+    average_result: float
+    average_errors: float
+    result_rank: int
+    penalty_rank: int
+    # Totals after each of the player's games, in game order
+    running_results: tuple[int, ...]
+    running_penalty_sums: tuple[float, ...]
+
+
+@dataclass(slots=True)
+class PlayerBalance:
+    player_id: int
+    player_name: str
+    games: int
+    penalty_sum: float
+    paid: float
+    open_balance: float
+
+
+@dataclass(slots=True)
+class ClubTeamSum:
+    club: str
+    team_id: int
+    team_name: str
+    games: int
+    penalty_sum: float